@@ -0,0 +1,283 @@
+#! /usr/bin/env python3
+"""Compare the storage layouts of the iset_data table.
+
+Loads the same generated data into a copy of iset_data with each storage
+layout, then reports the size of each table, the time taken to insert
+the rows, the speed of the range scans used by the API and the InnoDB
+buffer pool hit rate during the scans.
+
+The tables are created in the configured test database and dropped
+afterwards. Set the INFOSET_CONFIGDIR environment variable to a directory
+with a test configuration first. The buffer pool hit rate is measured
+for the whole server, so run the script while the server is otherwise
+idle. Use more data than the innodb_buffer_pool_size to measure the hit
+rate of tables that don't fit in memory.
+
+"""
+
+# Standard imports
+import sys
+import os
+import time
+import random
+import argparse
+
+# Try to create a working PYTHONPATH
+script_directory = os.path.dirname(os.path.realpath(__file__))
+bin_directory = os.path.abspath(os.path.join(script_directory, os.pardir))
+root_directory = os.path.abspath(os.path.join(bin_directory, os.pardir))
+if script_directory.endswith('/infoset-ng/bin/tools') is True:
+    sys.path.append(root_directory)
+else:
+    print(
+        'This script is not installed in the "infoset-ng/bin/tools" '
+        'directory. Please fix.')
+    sys.exit(2)
+
+# PIP3 imports
+from sqlalchemy import text
+
+# Infoset-ng imports
+try:
+    from infoset.utils import configuration
+except:
+    print('You need to set your PYTHONPATH to include the infoset library')
+    sys.exit(2)
+from infoset.db import TEST_ENGINE
+from infoset.db import data_storage
+from infoset.db.db_orm import BASE
+
+# Layouts compared, as tuples of the storage layout and compression
+LAYOUTS = [('standard', False), ('compact', False), ('compact', True)]
+
+# Number of rows inserted by each statement
+INSERT_BATCH = 10000
+
+
+def _arguments():
+    """Get the command line arguments.
+
+    Args:
+        None
+
+    Returns:
+        result: argparse namespace
+
+    """
+    # Process arguments
+    parser = argparse.ArgumentParser(
+        description='Compare the storage layouts of the iset_data table.')
+    parser.add_argument(
+        '--datapoints', type=int, default=1000,
+        help='Number of datapoints.')
+    parser.add_argument(
+        '--days', type=int, default=7,
+        help='Number of days of data for each datapoint.')
+    parser.add_argument(
+        '--scans', type=int, default=500,
+        help='Number of single day range scans of random datapoints.')
+    result = parser.parse_args()
+    return result
+
+
+def _table(storage, compression):
+    """Get the name of the table of a layout.
+
+    Args:
+        storage: Storage layout
+        compression: True if compressed
+
+    Returns:
+        result: Name of the table
+
+    """
+    # Return
+    result = 'iset_data_benchmark_{}'.format(storage)
+    if compression is True:
+        result = '{}_compressed'.format(result)
+    return result
+
+
+def _rows(datapoints, stop, days, interval):
+    """Generate rows of data.
+
+    Args:
+        datapoints: Number of datapoints
+        stop: Timestamp of the last row of each datapoint
+        days: Number of days of data for each datapoint
+        interval: Number of seconds between rows
+
+    Returns:
+        None. Yields dicts of rows
+
+    """
+    # Initialize key variables
+    generator = random.Random(0)
+    start = stop - (days * 86400)
+
+    # Generate the rows
+    for idx_datapoint in range(1, datapoints + 1):
+        value = generator.uniform(0, 1000000)
+        for timestamp in range(start, stop + 1, interval):
+            value = max(value + generator.uniform(-100, 100), 0)
+            yield {
+                'idx_datapoint': idx_datapoint,
+                'timestamp': timestamp,
+                'value': round(value, 4)}
+
+
+def _buffer_pool(connection):
+    """Get the InnoDB buffer pool read counters of the server.
+
+    Args:
+        connection: SQLAlchemy connection
+
+    Returns:
+        result: Tuple of the number of logical reads and the number of
+            reads that had to be read from disk
+
+    """
+    # Return
+    status = dict(connection.execute(text(
+        'SHOW GLOBAL STATUS LIKE \'Innodb_buffer_pool_read%\'')).fetchall())
+    result = (
+        int(status['Innodb_buffer_pool_read_requests']),
+        int(status['Innodb_buffer_pool_reads']))
+    return result
+
+
+def _benchmark(connection, table, args, stop, interval):
+    """Measure a table.
+
+    Args:
+        connection: SQLAlchemy connection
+        table: Name of the table
+        args: argparse namespace
+        stop: Timestamp of the last row of each datapoint
+        interval: Number of seconds between rows
+
+    Returns:
+        result: Dict of measurements
+
+    """
+    # Initialize key variables
+    generator = random.Random(1)
+    insert = text(
+        'INSERT INTO {} (idx_datapoint, timestamp, value) '
+        'VALUES (:idx_datapoint, :timestamp, :value)'.format(table))
+    scan = text(
+        'SELECT timestamp, value FROM {} WHERE idx_datapoint = :idx_datapoint '
+        'AND timestamp >= :start AND timestamp <= :stop'.format(table))
+    recent = text(
+        'SELECT value, idx_datapoint, timestamp FROM {} '
+        'WHERE timestamp >= :start AND timestamp <= :stop '
+        'ORDER BY idx_datapoint, timestamp'.format(table))
+    result = {'scanned': 0}
+
+    # Insert the rows
+    start = time.time()
+    batch = []
+    for row in _rows(args.datapoints, stop, args.days, interval):
+        batch.append(row)
+        if len(batch) == INSERT_BATCH:
+            with connection.begin():
+                connection.execute(insert, batch)
+            batch = []
+    if bool(batch) is True:
+        with connection.begin():
+            connection.execute(insert, batch)
+    result['insert_seconds'] = time.time() - start
+    result.update(data_storage.size(connection, table))
+
+    # Scan a day of data of random datapoints, as the API does
+    (requests_before, reads_before) = _buffer_pool(connection)
+    start = time.time()
+    for _ in range(args.scans):
+        first = stop - generator.randint(1, args.days) * 86400
+        rows = connection.execute(
+            scan, idx_datapoint=generator.randint(1, args.datapoints),
+            start=first, stop=first + 86400)
+        values = {item[0]: float(item[1]) for item in rows}
+        result['scanned'] += len(values)
+    result['scan_seconds'] = time.time() - start
+
+    # Scan the most recent data of all datapoints, as the API does for
+    # last contacts
+    start = time.time()
+    rows = connection.execute(recent, start=stop - 3600, stop=stop)
+    values = [float(item[0]) for item in rows]
+    result['recent_seconds'] = time.time() - start
+    (requests_after, reads_after) = _buffer_pool(connection)
+
+    # Calculate the hit rate
+    requests = requests_after - requests_before
+    reads = reads_after - reads_before
+    if bool(requests) is True:
+        result['hit_rate'] = 1 - (reads / requests)
+    else:
+        result['hit_rate'] = 1
+    result['disk_reads'] = reads
+
+    # Return
+    return result
+
+
+def main():
+    """Compare the storage layouts.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    args = _arguments()
+    config = configuration.Config()
+    interval = config.interval()
+    stop = int(time.time() // interval) * interval
+    results = []
+
+    # Only use a test database
+    if TEST_ENGINE is None:
+        print(
+            'The configured database is not a test database. Set the '
+            'INFOSET_CONFIGDIR environment variable to a directory with a '
+            'test configuration.')
+        sys.exit(2)
+    BASE.metadata.create_all(TEST_ENGINE)
+
+    # Measure each layout
+    with TEST_ENGINE.connect() as connection:
+        for (storage, compression) in LAYOUTS:
+            table = _table(storage, compression)
+            print('Measuring {}.'.format(table))
+            connection.execute(text('DROP TABLE IF EXISTS {}'.format(table)))
+            data_storage.create(connection, table, storage, compression)
+            try:
+                results.append(
+                    (table, _benchmark(
+                        connection, table, args, stop, interval)))
+            finally:
+                connection.execute(text('DROP TABLE {}'.format(table)))
+
+    # Print the results
+    print('')
+    print('{:<40} {:>12} {:>10} {:>10} {:>14} {:>14} {:>10} {:>9}'.format(
+        'Table', 'Rows', 'MiB', 'Bytes/row', 'Inserts/s', 'Scanned/s',
+        'Recent ms', 'Hit rate'))
+    for (table, item) in results:
+        rows = max(item['rows'], 1)
+        total = item['data_bytes'] + item['index_bytes']
+        print(
+            '{:<40} {:>12} {:>10.1f} {:>10.1f} {:>14.0f} {:>14.0f} '
+            '{:>10.1f} {:>9.2%}'.format(
+                table, item['rows'], total / 1048576, total / rows,
+                rows / max(item['insert_seconds'], 0.001),
+                item['scanned'] / max(item['scan_seconds'], 0.001),
+                item['recent_seconds'] * 1000, item['hit_rate']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+#! /usr/bin/env python3
+"""Audit the query plans of the queries issued by infoset/db.
+
+Populates the configured test database, runs the functions of the
+infoset.db modules while recording every SELECT statement they issue, then
+runs EXPLAIN on each statement and flags full table and index scans.
+
+The test database is dropped and recreated. Set the INFOSET_CONFIGDIR
+environment variable to a directory with a test configuration first.
+
+"""
+
+# Standard imports
+import sys
+import os
+from collections import namedtuple
+
+# Try to create a working PYTHONPATH
+script_directory = os.path.dirname(os.path.realpath(__file__))
+bin_directory = os.path.abspath(os.path.join(script_directory, os.pardir))
+root_directory = os.path.abspath(os.path.join(bin_directory, os.pardir))
+if script_directory.endswith('/infoset-ng/bin/tools') is True:
+    sys.path.append(root_directory)
+else:
+    print(
+        'This script is not installed in the "infoset-ng/bin/tools" '
+        'directory. Please fix.')
+    sys.exit(2)
+
+# PIP3 imports
+from sqlalchemy import event
+
+# Infoset-ng imports
+try:
+    from infoset.utils import configuration
+except:
+    print('You need to set your PYTHONPATH to include the infoset library')
+    sys.exit(2)
+from infoset.test import unittest_setup_db
+from infoset.db import TEST_ENGINE
+from infoset.db import db_agent
+from infoset.db import db_agentname
+from infoset.db import db_billcode
+from infoset.db import db_configuration
+from infoset.db import db_data
+from infoset.db import db_datapoint
+from infoset.db import db_department
+from infoset.db import db_device
+from infoset.db import db_deviceagent
+from infoset.db import db_multitable
+
+# EXPLAIN "type" values that read every row of a table or index
+FULL_SCANS = {
+    'ALL': 'full table scan',
+    'index': 'full index scan'
+}
+
+Statement = namedtuple('Statement', 'caller sql parameters')
+
+
+class _Recorder(object):
+    """Record the SELECT statements sent to the database."""
+
+    def __init__(self):
+        """Method initializing the class.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.caller = None
+        self.statements = []
+
+    def record(self, conn, cursor, statement, parameters, context,
+               executemany):
+        """Record a statement. Used as a 'before_cursor_execute' listener.
+
+        Args:
+            conn: SQLAlchemy connection
+            cursor: DBAPI cursor
+            statement: SQL statement
+            parameters: Statement parameters
+            context: Execution context
+            executemany: True if executemany() is being used
+
+        Returns:
+            None
+
+        """
+        # Only SELECT statements can be explained
+        if statement.lstrip().upper().startswith('SELECT') is True:
+            self.statements.append(
+                Statement(
+                    caller=self.caller, sql=statement,
+                    parameters=parameters))
+
+
+def _callers(data):
+    """Get the infoset.db functions to audit.
+
+    Args:
+        data: unittest_setup_db.TestData object
+
+    Returns:
+        result: List of (name, function) tuples
+
+    """
+    # Initialize key variables
+    config = configuration.Config()
+    ts_start = data.timestamp() - 3600
+
+    # Return
+    result = [
+        ('db_agent.id_agent_exists',
+         lambda: db_agent.id_agent_exists(data.id_agent())),
+        ('db_agent.idx_agent_exists',
+         lambda: db_agent.idx_agent_exists(data.idx_agent())),
+        ('db_agent.get_all_agents',
+         db_agent.get_all_agents),
+        ('db_agent.get_all_agents(after, limit)',
+         lambda: db_agent.get_all_agents(after=0, limit=10)),
+        ('db_agentname.name_exists',
+         lambda: db_agentname.name_exists(data.agent())),
+        ('db_agentname.idx_agentname_exists',
+         lambda: db_agentname.idx_agentname_exists(data.idx_agentname())),
+        ('db_agentname.get_all_names',
+         db_agentname.get_all_names),
+        ('db_billcode.code_exists',
+         lambda: db_billcode.code_exists(data.billcode_code())),
+        ('db_billcode.idx_billcode_exists',
+         lambda: db_billcode.idx_billcode_exists(data.idx_billcode())),
+        ('db_configuration.config_key_exists',
+         lambda: db_configuration.config_key_exists('version')),
+        ('db_data.GetIDXData',
+         lambda: db_data.GetIDXData(
+             config, data.idx_datapoint(), start=ts_start).everything()),
+        ('db_data.last_contacts',
+         lambda: db_data.last_contacts(ts_start)),
+        ('db_data.last_contacts_by_device',
+         lambda: db_data.last_contacts_by_device(
+             data.idx_deviceagent(), ts_start)),
+        ('db_datapoint.id_datapoint_exists',
+         lambda: db_datapoint.id_datapoint_exists(data.id_datapoint())),
+        ('db_datapoint.idx_datapoint_exists',
+         lambda: db_datapoint.idx_datapoint_exists(data.idx_datapoint())),
+        ('db_datapoint.listing',
+         lambda: db_datapoint.listing(data.idx_deviceagent())),
+        ('db_datapoint.listing(base_type)',
+         lambda: db_datapoint.listing(data.idx_deviceagent(), base_type=1)),
+        ('db_department.code_exists',
+         lambda: db_department.code_exists(data.department_code())),
+        ('db_department.idx_department_exists',
+         lambda: db_department.idx_department_exists(
+             data.idx_department())),
+        ('db_device.devicename_exists',
+         lambda: db_device.devicename_exists(data.devicename())),
+        ('db_device.idx_device_exists',
+         lambda: db_device.idx_device_exists(data.idx_device())),
+        ('db_device.all_devices',
+         db_device.all_devices),
+        ('db_deviceagent.GetIDXDeviceAgent',
+         lambda: db_deviceagent.GetIDXDeviceAgent(
+             data.idx_deviceagent()).everything()),
+        ('db_deviceagent.device_agent_exists',
+         lambda: db_deviceagent.device_agent_exists(
+             data.idx_device(), data.idx_agent())),
+        ('db_deviceagent.all_device_indices',
+         db_deviceagent.all_device_indices),
+        ('db_deviceagent.device_indices',
+         lambda: db_deviceagent.device_indices(data.idx_agent())),
+        ('db_deviceagent.agent_indices',
+         lambda: db_deviceagent.agent_indices(data.idx_device())),
+        ('db_deviceagent.get_all_device_agents',
+         db_deviceagent.get_all_device_agents),
+        ('db_multitable.datapoint_summary_list',
+         db_multitable.datapoint_summary_list)
+    ]
+    return result
+
+
+def _explain(statement):
+    """Run EXPLAIN on a statement.
+
+    Args:
+        statement: Statement namedtuple
+
+    Returns:
+        result: List of dicts, one per row of EXPLAIN output
+
+    """
+    # Initialize key variables
+    result = []
+    connection = TEST_ENGINE.raw_connection()
+
+    # Run the query
+    try:
+        cursor = connection.cursor()
+        cursor.execute(
+            'EXPLAIN {}'.format(statement.sql), statement.parameters)
+        columns = [item[0] for item in cursor.description]
+        for row in cursor.fetchall():
+            result.append(dict(zip(columns, row)))
+        cursor.close()
+    finally:
+        connection.close()
+
+    # Return
+    return result
+
+
+def main():
+    """Audit the query plans.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    recorder = _Recorder()
+    flagged = 0
+
+    # Populate the test database
+    data = unittest_setup_db.TestData()
+
+    # Record the statements issued by each function
+    event.listen(TEST_ENGINE, 'before_cursor_execute', recorder.record)
+    for (name, function) in _callers(data):
+        recorder.caller = name
+        function()
+    event.remove(TEST_ENGINE, 'before_cursor_execute', recorder.record)
+
+    # Explain each statement
+    for statement in recorder.statements:
+        for row in _explain(statement):
+            if row.get('type') not in FULL_SCANS:
+                continue
+            flagged += 1
+            print(
+                '{}: {} of {} (possible_keys: {}, key: {})\n    {}\n'.format(
+                    statement.caller, FULL_SCANS[row['type']],
+                    row.get('table'), row.get('possible_keys'),
+                    row.get('key'), ' '.join(statement.sql.split())))
+
+    # Summary
+    print(
+        '{} statements explained, {} full scans flagged.'.format(
+            len(recorder.statements), flagged))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+#! /usr/bin/env python3
+"""Measure the throughput and latency of the infoset-ng API.
+
+Simulates a number of concurrent dashboard clients repeatedly requesting
+API URLs, then reports the number of requests served per second and
+response time percentiles. Run it against the API once with each
+'api_worker_class' to compare the worker models on the same server.
+
+"""
+
+# Standard imports
+import sys
+import os
+import time
+import argparse
+import threading
+
+# PIP3 imports
+import requests
+
+# Try to create a working PYTHONPATH
+script_directory = os.path.dirname(os.path.realpath(__file__))
+bin_directory = os.path.abspath(os.path.join(script_directory, os.pardir))
+root_directory = os.path.abspath(os.path.join(bin_directory, os.pardir))
+if script_directory.endswith('/infoset-ng/bin/tools') is True:
+    sys.path.append(root_directory)
+else:
+    print(
+        'This script is not installed in the "infoset-ng/bin/tools" '
+        'directory. Please fix.')
+    sys.exit(2)
+
+# Infoset-ng imports
+try:
+    from infoset.utils import configuration
+except:
+    print('You need to set your PYTHONPATH to include the infoset library')
+    sys.exit(2)
+from infoset.constants import API_PREFIX
+
+# Routes requested when none are specified on the command line
+ROUTES = [
+    '{}/agents'.format(API_PREFIX),
+    '{}/devices'.format(API_PREFIX),
+    '{}/lastcontacts'.format(API_PREFIX),
+    '{}/datapoints/all/summarylist'.format(API_PREFIX)
+]
+
+
+class _Client(threading.Thread):
+    """Dashboard client repeatedly requesting URLs."""
+
+    def __init__(self, urls, stop, timeout=30):
+        """Method initializing the class.
+
+        Args:
+            urls: List of URLs to request
+            stop: Time after which no more requests are made
+            timeout: Timeout of each request in seconds
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.urls = urls
+        self.stop = stop
+        self.timeout = timeout
+        self.latencies = []
+        self.errors = 0
+
+    def run(self):
+        """Request URLs until the stop time.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        session = requests.Session()
+        count = 0
+
+        # Request URLs
+        while time.time() < self.stop:
+            url = self.urls[count % len(self.urls)]
+            count += 1
+            start = time.time()
+            try:
+                response = session.get(url, timeout=self.timeout)
+                response.content
+                if response.ok is False:
+                    self.errors += 1
+                    continue
+            except requests.exceptions.RequestException:
+                self.errors += 1
+                continue
+            self.latencies.append(time.time() - start)
+
+
+def _percentile(values, percent):
+    """Get a percentile of a sorted list of values.
+
+    Args:
+        values: Sorted list of values
+        percent: Percentile to get
+
+    Returns:
+        result: Value
+
+    """
+    # Initialize key variables
+    result = 0
+
+    # Get value
+    if bool(values) is True:
+        index = int(round((len(values) - 1) * percent / 100))
+        result = values[index]
+    return result
+
+
+def _arguments():
+    """Get the command line arguments.
+
+    Args:
+        None
+
+    Returns:
+        result: argparse namespace
+
+    """
+    # Initialize key variables
+    config = configuration.Config()
+    address = config.listen_address()
+    if address == '0.0.0.0':
+        address = 'localhost'
+
+    # Process arguments
+    parser = argparse.ArgumentParser(
+        description='Measure the throughput and latency of the API.')
+    parser.add_argument(
+        '--server', type=str,
+        default='http://{}:{}'.format(address, config.bind_port()),
+        help='Base URL of the API server.')
+    parser.add_argument(
+        '--clients', type=int, default=100,
+        help='Number of concurrent clients.')
+    parser.add_argument(
+        '--duration', type=int, default=60,
+        help='Number of seconds to run the test.')
+    parser.add_argument(
+        '--route', type=str, action='append',
+        help='API route to request. Can be used more than once.')
+    result = parser.parse_args()
+    return result
+
+
+def main():
+    """Run the load test.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    args = _arguments()
+    routes = args.route or ROUTES
+    urls = ['{}{}'.format(args.server.rstrip('/'), route) for route in routes]
+    stop = time.time() + args.duration
+    latencies = []
+    errors = 0
+
+    # Start the clients
+    clients = [_Client(urls, stop) for _ in range(args.clients)]
+    start = time.time()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.time() - start
+
+    # Summarize
+    for client in clients:
+        latencies.extend(client.latencies)
+        errors += client.errors
+    latencies.sort()
+    print('Clients:             {}'.format(args.clients))
+    print('Requests:            {}'.format(len(latencies)))
+    print('Errors:              {}'.format(errors))
+    print('Requests per second: {:.1f}'.format(len(latencies) / elapsed))
+    for percent in [50, 95, 99, 100]:
+        print('Latency p{:<3}        {:.1f} ms'.format(
+            percent, _percentile(latencies, percent) * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+#! /usr/bin/env python3
+"""Convert the iset_data table to the configured storage layout.
+
+Set the db_storage and db_compression configuration parameters, stop the
+ingester, then run this script. The rows of iset_data are copied to a new
+table with the configured layout, which then replaces iset_data. The
+original table is kept as iset_data_previous unless --drop is used.
+
+Agents can keep posting data while the ingester is stopped. Their data
+waits in the ingest cache directory until the ingester is started again.
+
+"""
+
+# Standard imports
+import sys
+import os
+import time
+import argparse
+
+# Try to create a working PYTHONPATH
+script_directory = os.path.dirname(os.path.realpath(__file__))
+bin_directory = os.path.abspath(os.path.join(script_directory, os.pardir))
+root_directory = os.path.abspath(os.path.join(bin_directory, os.pardir))
+if script_directory.endswith('/infoset-ng/bin/tools') is True:
+    sys.path.append(root_directory)
+else:
+    print(
+        'This script is not installed in the "infoset-ng/bin/tools" '
+        'directory. Please fix.')
+    sys.exit(2)
+
+# Infoset-ng imports
+try:
+    from infoset.utils import configuration
+except:
+    print('You need to set your PYTHONPATH to include the infoset library')
+    sys.exit(2)
+from infoset.db import ENGINE
+from infoset.db import data_storage
+
+
+def _arguments():
+    """Get the command line arguments.
+
+    Args:
+        None
+
+    Returns:
+        result: argparse namespace
+
+    """
+    # Process arguments
+    parser = argparse.ArgumentParser(
+        description=(
+            'Convert the iset_data table to the storage layout set by the '
+            'db_storage and db_compression configuration parameters. Stop '
+            'the ingester first.'))
+    parser.add_argument(
+        '--batch-size', type=int, default=data_storage.BATCH_SIZE,
+        help='Number of rows copied in each transaction.')
+    parser.add_argument(
+        '--drop', action='store_true',
+        help='Drop the original table after the migration.')
+    result = parser.parse_args()
+    return result
+
+
+def main():
+    """Migrate the iset_data table.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    args = _arguments()
+    config = configuration.Config()
+    storage = config.db_storage()
+    compression = config.db_compression()
+    start = time.time()
+
+    def progress(count):
+        """Print the number of rows copied.
+
+        Args:
+            count: Number of rows copied
+
+        Returns:
+            None
+
+        """
+        elapsed = max(time.time() - start, 0.001)
+        print('{} rows copied ({:.0f} rows per second)'.format(
+            count, count / elapsed))
+
+    # Show the size of the table before the migration
+    with ENGINE.connect() as connection:
+        before = data_storage.size(connection, 'iset_data')
+
+    # Migrate
+    print('Converting iset_data to the {} storage layout{}.'.format(
+        storage, ' with compression' if compression is True else ''))
+    result = data_storage.migrate(
+        ENGINE, storage, compression, batch_size=args.batch_size,
+        drop=args.drop, progress=progress)
+    if result is None:
+        print('iset_data already has this storage layout.')
+        sys.exit(0)
+
+    # Show the new size of the table
+    with ENGINE.connect() as connection:
+        after = data_storage.size(connection, 'iset_data')
+    print('Size before: {:.1f} MiB'.format(
+        (before['data_bytes'] + before['index_bytes']) / 1048576))
+    print('Size after:  {:.1f} MiB'.format(
+        (after['data_bytes'] + after['index_bytes']) / 1048576))
+    if args.drop is False:
+        print(
+            'The original table was kept as {0}. Drop it with '
+            '"DROP TABLE {0}" once you no longer need it.'.format(
+                data_storage.PREVIOUS_TABLE))
+
+
+if __name__ == '__main__':
+    main()
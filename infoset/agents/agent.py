@@ -32,7 +32,11 @@ from infoset.utils import general
 from infoset.utils import daemon
 from infoset.utils import configuration
 from infoset.utils.daemon import Daemon
+from infoset.db import reset_pool
+from infoset.db import db
+from infoset.db import db_multitable
 from infoset.api import API
+from infoset.reference import replay
 
 
 class Agent(object):
@@ -151,6 +155,10 @@ class AgentAPI(Agent):
         # http://docs.gunicorn.org/en/stable/settings.html
         #
         ######################################################################
+        worker_class = config.api_worker_class()
+        workers = config.api_workers()
+        if workers is None:
+            workers = _number_of_workers(worker_class)
         options = {
             'bind': '%s:%s' % (config.listen_address(), config.bind_port()),
             'accesslog': config.web_log_file(),
@@ -158,7 +166,15 @@ class AgentAPI(Agent):
             'capture_output': True,
             'pidfile': self.pidfile_child,
             'loglevel': config.log_level(),
-            'workers': _number_of_workers(),
+            'workers': workers,
+            'worker_class': worker_class,
+            'worker_connections': config.api_worker_connections(),
+            'threads': config.api_threads(),
+            'keepalive': config.api_keepalive(),
+            'max_requests': config.api_max_requests(),
+            'max_requests_jitter': config.api_max_requests_jitter(),
+            'preload_app': config.api_preload_app(),
+            'post_fork': _post_fork,
         }
 
         # Log so that user running the script from the CLI knows that something
@@ -190,13 +206,14 @@ class AgentReferenceSample(object):
         post:
     """
 
-    def __init__(self, config, devicename):
+    def __init__(self, config, devicename, id_agent=None):
         """Method initializing the class.
 
         Args:
             config: ConfigAgent configuration object
             agent_name: Name of agent
             devicename: Devicename that the agent applies to
+            id_agent: ID of the agent. Created by get_id_agent() if None
 
         Returns:
             None
@@ -205,7 +222,8 @@ class AgentReferenceSample(object):
         # Initialize key variables
         self.data = defaultdict(lambda: defaultdict(dict))
         agent_name = config.agent_name()
-        id_agent = get_id_agent(config)
+        if id_agent is None:
+            id_agent = get_id_agent(config)
 
         # Add timestamp
         self.data['timestamp'] = general.normalized_timestamp()
@@ -375,6 +393,26 @@ class AgentReferenceSample(object):
         # Return
         return self.data
 
+    def reset(self, timestamp=None):
+        """Clear the polled data so that the object can poll again.
+
+        Args:
+            timestamp: Timestamp of the next poll. The current normalized
+                timestamp if None
+
+        Returns:
+            None
+
+        """
+        # Clear the data
+        self.data.pop('timeseries', None)
+        self.data.pop('timefixed', None)
+
+        # Update the timestamp
+        if timestamp is None:
+            timestamp = general.normalized_timestamp()
+        self.data['timestamp'] = timestamp
+
     def post(self, save=True, data=None):
         """Post data to central server.
 
@@ -434,53 +472,33 @@ class AgentReferenceSample(object):
     def purge(self):
         """Purge data from cache by posting to central server.
 
+        The cached files are posted in timestamp order, many files per
+        request. Each file is deleted once the API accepts it.
+
         Args:
             None
 
         Returns:
-            success: "True: if successful
+            result: Number of cache files posted
 
         """
         # Initialize key variables
         id_agent = self.data['id_agent']
+        devicehash = general.hashstring(self.data['devicename'], sha=1)
+        url = self.url.rsplit('/', 1)[0]
+
+        # Post the files of this agent and device
+        suffix = ('%s_%s.json') % (id_agent, devicehash)
+        replayer = replay.Replay(url, self.cache_dir, suffix=suffix)
+        result = replayer.run()
 
-        # Add files in cache directory to list
-        filenames = [filename for filename in os.listdir(
-            self.cache_dir) if os.path.isfile(
-                os.path.join(self.cache_dir, filename))]
-
-        # Read cache file
-        for filename in filenames:
-            # Only post files for our own UID value
-            if id_agent not in filename:
-                continue
-
-            # Get the full filepath for the cache file and post
-            filepath = os.path.join(self.cache_dir, filename)
-            with open(filepath, 'r') as f_handle:
-                try:
-                    data = json.load(f_handle)
-                except:
-                    # Log removal
-                    log_message = (
-                        'Error reading previously cached agent data file %s '
-                        'for agent %s. May be corrupted.'
-                        '') % (filepath, self.name())
-                    log.log2die(1064, log_message)
-
-            # Post file
-            success = self.post(save=False, data=data)
-
-            # Delete file if successful
-            if success is True:
-                os.remove(filepath)
-
-                # Log removal
-                log_message = (
-                    'Purging cache file %s after successfully '
-                    'contacting server %s'
-                    '') % (filepath, self.url)
-                log.log2info(1029, log_message)
+        # Log
+        if result > 0:
+            log_message = (
+                'Purged %s cache files after successfully contacting server '
+                '%s') % (result, url)
+            log.log2info(1029, log_message)
+        return result
 
 
 def get_id_agent(config):
@@ -747,13 +765,85 @@ class StandaloneApplication(BaseApplication):
             self.cfg.set(key.lower(), value)
 
     def load(self):
-        """Run the Flask application throught the Gunicorn WSGI."""
+        """Run the Flask application throught the Gunicorn WSGI.
+
+        This is done once in the Gunicorn master process before workers are
+        forked if "preload_app" is set, otherwise once in each worker.
+
+        """
+        _warmup(close=self.cfg.preload_app)
         return self.application
 
 
-def _number_of_workers():
-    """Get the number of CPU cores on this server."""
-    return (multiprocessing.cpu_count() * 2) + 1
+def _warmup(close=False):
+    """Prepare the API to serve its first requests quickly.
+
+    Opens a database connection and reads the datapoint summary snapshot
+    so that this isn't done while the first requests wait.
+
+    Args:
+        close: Close the database connections afterwards. Used in the
+            Gunicorn master process so that workers don't inherit them
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    start = time.time()
+    config = configuration.cached()
+
+    # Open a database connection
+    if db.connectivity() is False:
+        log_message = (
+            'Unable to connect to the database while starting the API')
+        log.log2warning(1149, log_message)
+    else:
+        # Prime the summary caches
+        db_multitable.datapoint_summary_snapshot(config)
+
+    # Discard connections
+    if close is True:
+        reset_pool(close=True)
+
+    # Log
+    log_message = (
+        'API warmup completed in {:.3f} seconds'.format(time.time() - start))
+    log.log2debug(1150, log_message)
+
+
+def _post_fork(server, worker):
+    """Reset per process resources in a newly forked Gunicorn worker.
+
+    Args:
+        server: Gunicorn arbiter
+        worker: Gunicorn worker
+
+    Returns:
+        None
+
+    """
+    # Don't use database connections opened by the master process
+    reset_pool()
+
+
+def _number_of_workers(worker_class='sync'):
+    """Get the number of Gunicorn workers to start on this server.
+
+    Args:
+        worker_class: Gunicorn worker class
+
+    Returns:
+        result: Number of workers
+
+    """
+    # Asynchronous workers handle many requests each, so one per CPU core
+    # is enough. This also limits the number of database connection pools
+    if worker_class == 'sync':
+        result = (multiprocessing.cpu_count() * 2) + 1
+    else:
+        result = multiprocessing.cpu_count()
+    return result
 
 
 def agent_sleep(agent_name, seconds=300):
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""Poll many devices concurrently from a single agent process.
+
+Subclass Scheduler and override its poll method to collect the data of a
+device. Each interval, the Scheduler polls every device using a pool of
+threads and posts the data to the API's batch receive route, many devices
+per request. Data that can't be posted is kept in a backlog and posted
+first when the API can be contacted again.
+
+The polls are spread over the first part of the interval, each device
+always starting at the same offset, so that devices aren't all contacted
+at once. Polls that take too long are abandoned, and a device whose
+previous poll is still running is not polled again until it finishes.
+
+"""
+
+# Standard libraries
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# pip3 libraries
+import requests
+
+# infoset libraries
+from infoset.agents.agent import Agent
+from infoset.agents.agent import AgentReferenceSample
+from infoset.agents.agent import agent_sleep
+from infoset.reference import backlog
+from infoset.reference import replay
+from infoset.reference import reference
+from infoset.utils import general
+from infoset.utils import log
+
+# Default number of devices polled at the same time
+WORKERS = 32
+
+# Default fraction of the interval over which the start of polls is spread
+JITTER = 0.5
+
+# Default fraction of the interval that each poll may take
+TIMEOUT = 0.4
+
+
+class Scheduler(Agent):
+    """Poll devices concurrently and post their data in batches."""
+
+    def __init__(self, config, devicenames, workers=WORKERS, jitter=JITTER,
+                 timeout=None, batch_size=replay.BATCH_SIZE):
+        """Method initializing the class.
+
+        Args:
+            config: ConfigAgent configuration object
+            devicenames: List of devicenames to poll
+            workers: Number of devices polled at the same time
+            jitter: Fraction of the interval over which the start of polls
+                is spread
+            timeout: Number of seconds each poll may take. A fraction
+                TIMEOUT of the interval if None
+            batch_size: Number of devices whose data is posted in each
+                request
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        Agent.__init__(self, config.agent_name())
+        self.config = config
+        self.devicenames = list(devicenames)
+        self.workers = workers
+        self.jitter = min(max(jitter, 0), 1)
+        self.batch_size = batch_size
+        interval = config.interval()
+        if timeout is None:
+            timeout = interval * TIMEOUT
+        self.timeout = timeout
+        self._samples = {}
+        self._running = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+
+        # Data that can't be posted is kept in this backlog
+        self.id_agent = self.get_id_agent()
+        self._backlog = backlog.Backlog(
+            os.path.join(config.agent_cache_directory(), self.id_agent))
+
+        # Construct the URL of the API's batch receive route
+        if config.api_server_https() is True:
+            prefix = 'https://'
+        else:
+            prefix = 'http://'
+        self.url = (
+            '%s%s:%s/%s/receive') % (
+                prefix, config.api_server_name(),
+                config.api_server_port(), config.api_server_uri())
+
+        # Create a session that keeps connections to the API open
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=1)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+    def get_id_agent(self):
+        """Get the permanent ID of the agent.
+
+        The ID is created the first time and stored in the id_agent file
+        of the agent. Override this method to supply an ID of your own.
+
+        Args:
+            None
+
+        Returns:
+            result: ID of the agent
+
+        """
+        # Return
+        result = reference.get_id_agent(self.config.agent_name())
+        return result
+
+    def poll(self, devicename, sample):
+        """Placeholder method. Collect the data of a device.
+
+        Use the populate methods of the sample to add the data. Raise an
+        exception if the device can't be polled.
+
+        Args:
+            devicename: Devicename
+            sample: AgentReferenceSample object for the device
+
+        Returns:
+            None
+
+        """
+        # Do nothing
+        pass
+
+    def query(self):
+        """Poll all devices and wait for the next interval.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Poll
+        self.cycle()
+
+        # Sleep until the start of the next interval
+        interval = self.config.interval()
+        agent_sleep(self.name(), interval - (time.time() % interval))
+
+    def cycle(self):
+        """Poll all devices once and post their data.
+
+        Args:
+            None
+
+        Returns:
+            result: Number of devices whose data was polled
+
+        """
+        # Initialize key variables
+        interval = self.config.interval()
+        start = time.time()
+        timestamp = general.normalized_timestamp()
+        futures = {}
+
+        # Start each poll at the offset of its device
+        for (offset, devicename) in sorted(
+                (self._offset(devicename, interval), devicename)
+                for devicename in self.devicenames):
+            # Don't poll devices whose previous poll is still running
+            with self._lock:
+                if devicename in self._running:
+                    log_message = (
+                        'Agent "%s" skipped device %s. Its previous poll is '
+                        'still running.') % (self.name(), devicename)
+                    log.log2warning(1164, log_message)
+                    continue
+                self._running.add(devicename)
+
+            # Wait for the offset
+            delay = start + offset - time.time()
+            if delay > 0:
+                time.sleep(delay)
+
+            # Poll
+            sample = self._sample(devicename, timestamp)
+            future = self._executor.submit(self._poll, devicename, sample)
+            futures[future] = sample
+
+        # Wait for the polls, abandoning those that take too long
+        deadline = min(
+            start + (interval * self.jitter) + self.timeout,
+            start + interval)
+        (done, not_done) = wait(
+            futures, timeout=max(deadline - time.time(), 0))
+        for future in not_done:
+            log_message = (
+                'Agent "%s" poll of device %s timed out after %s seconds.'
+                '') % (
+                    self.name(), futures[future].data['devicename'],
+                    self.timeout)
+            log.log2warning(1165, log_message)
+
+        # Post the data collected
+        samples = [
+            futures[future].polled_data() for future in done
+            if future.result() is True]
+        samples = [
+            data for data in samples
+            if 'timeseries' in data or 'timefixed' in data]
+        self._post(samples)
+
+        # Detect polling that doesn't keep up with the interval
+        duration = time.time() - start
+        if duration > interval:
+            log_message = (
+                'Agent "%s" took %.1f seconds to poll %s devices, longer '
+                'than the %s second interval.'
+                '') % (self.name(), duration, len(self.devicenames), interval)
+            log.log2warning(1166, log_message)
+
+        # Return
+        result = len(samples)
+        return result
+
+    def _poll(self, devicename, sample):
+        """Poll a device in a worker thread.
+
+        Args:
+            devicename: Devicename
+            sample: AgentReferenceSample object for the device
+
+        Returns:
+            success: True if the device was polled
+
+        """
+        # Poll
+        success = False
+        try:
+            self.poll(devicename, sample)
+            success = True
+        except Exception as exception:
+            log_message = (
+                'Agent "%s" failed to poll device %s: %s'
+                '') % (self.name(), devicename, exception)
+            log.log2warning(1167, log_message)
+        finally:
+            with self._lock:
+                self._running.discard(devicename)
+
+        # Return
+        return success
+
+    def _post(self, samples):
+        """Post data to the API in batches.
+
+        Args:
+            samples: List of agent data
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        replayer = replay.Replay(
+            self.url, self._backlog.directory, batch_size=self.batch_size,
+            rate=0, session=self._session)
+
+        # Post the backlog first so that the data is posted in order
+        if self._backlog.size() > 0:
+            replayer.run_backlog(self._backlog)
+        posted = self._backlog.size() == 0
+
+        # Post the data, adding it to the backlog if this fails
+        for start in range(0, len(samples), self.batch_size):
+            batch = samples[start:start + self.batch_size]
+            if posted is True:
+                posted = replayer.post(batch) == 200
+            if posted is False:
+                for data in batch:
+                    self._backlog.put(data)
+
+    def _sample(self, devicename, timestamp):
+        """Get an empty AgentReferenceSample object for a device.
+
+        Args:
+            devicename: Devicename
+            timestamp: Timestamp of the poll
+
+        Returns:
+            result: AgentReferenceSample object
+
+        """
+        # Reuse the object created for the previous poll
+        result = self._samples.get(devicename)
+        if result is None:
+            result = AgentReferenceSample(
+                self.config, devicename, id_agent=self.id_agent)
+            self._samples[devicename] = result
+        result.reset(timestamp)
+        return result
+
+    def _offset(self, devicename, interval):
+        """Get the number of seconds into each interval to poll a device.
+
+        Args:
+            devicename: Devicename
+            interval: Interval
+
+        Returns:
+            result: Offset
+
+        """
+        # The offset of a device is always the same
+        fraction = int(general.hashstring(devicename)[:8], 16) / 0xffffffff
+        result = fraction * self.jitter * interval
+        return result
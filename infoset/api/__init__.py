@@ -13,13 +13,23 @@ CONFIG = configuration.Config()
 #############################################################################
 #############################################################################
 
-# Configure the cache
+# Configure the cache. Entries are invalidated by the ingester's generation
+# counters so they can be kept longer than the polling interval. Each
+# process keeps its own copy of recently used entries in front of memcached
 CACHE = Cache(config={
-    'CACHE_TYPE': 'memcached',
-    'CACHE_DEFAULT_TIMEOUT': CONFIG.interval()})
+    'CACHE_TYPE': 'infoset.utils.memory.TieredCache',
+    'CACHE_MEMCACHED_SERVERS': ['{}:{}'.format(
+        CONFIG.memcached_hostname(), CONFIG.memcached_port())],
+    'CACHE_LOCAL_SIZE': CONFIG.api_local_cache_size(),
+    'CACHE_LOCAL_TIMEOUT': CONFIG.api_local_cache_timeout(),
+    'CACHE_DEFAULT_TIMEOUT': CONFIG.api_cache_timeout()})
 
 # Define the global URL prefix
 from infoset.constants import API_PREFIX
+from infoset.utils import memory
+from infoset.utils import metrics
+from infoset.api import request_metrics
+from infoset.utils import responses
 
 # Import API Blueprints
 from infoset.api.post import POST
@@ -34,6 +44,17 @@ from infoset.api.resources.deviceagents import DEVICEAGENTS
 # Setup API and intialize the cache
 API = Flask(__name__)
 CACHE.init_app(API)
+API.teardown_request(memory.release_locks)
+
+# Time requests. This must be the first before_request function, as the
+# others may respond to the request
+metrics.configure(CONFIG.metrics_directory())
+API.before_request(request_metrics.before_request)
+API.after_request(request_metrics.after_request)
+
+# Compress responses and answer conditional requests
+API.before_request(responses.not_modified)
+API.after_request(responses.finalize)
 
 # Register Blueprints
 API.register_blueprint(POST, url_prefix=API_PREFIX)
@@ -1,13 +1,19 @@
 """infoset-ng database API. Posting Routes."""
 
 # Standard imports
-import json
+import os
+import tempfile
 
 # Flask imports
-from flask import Blueprint, request, abort
+from flask import Blueprint, Response, request, abort, jsonify
 
 # Infoset-ng imports
 from infoset.utils import general
+from infoset.utils import streaming
+from infoset.utils import payload
+from infoset.cache import delta
+from infoset.cache import spool
+from infoset.cache import validate
 from infoset.api import CONFIG
 
 
@@ -26,41 +32,242 @@ def receive(id_agent):
         Text response of Received
 
     """
-    # Initialize key variables
-    found_count = 0
-
-    # Read configuration
-    cache_dir = CONFIG.ingest_cache_directory()
+    # Stop accepting posts if the ingester is too far behind
+    _check_spool()
 
-    # Get JSON from incoming agent POST
-    data = request.json
+    # Get the data from the incoming agent POST
+    (body, payload_format) = _body()
+    try:
+        data = payload.loads(body, payload_format)
+    except ValueError:
+        abort(400)
 
     # Make sure all the important keys are available
-    keys = ['timestamp', 'id_agent', 'devicename']
-    for key in keys:
-        if key in data:
-            found_count += 1
+    keys = _keys(data)
+
+    # Do processing. The data is saved as it was received
+    _spool([(keys, body, payload_format)])
+
+    # Return
+    return 'OK'
+
+
+@POST.route('/receive', methods=['POST'])
+def receive_batch():
+    """Function for handling /infoset/api/v1.0/receive route.
+
+    Accepts many agent posts in one request, either as a list or as
+    newline delimited JSON with one post per line. The posts may be for
+    any number of agents, devices and timestamps. Nothing is saved unless
+    every post is valid.
+
+    Args:
+        None
+
+    Returns:
+        Text response of Received
+
+    """
+    # Stop accepting posts if the ingester is too far behind
+    _check_spool()
+
+    # Get the posts
+    (body, payload_format) = _body()
+    try:
+        if payload_format == 'ndjson':
+            payload_format = 'json'
+            items = [
+                payload.loads(line) for line in body.splitlines()
+                if bool(line.strip()) is True]
+        else:
+            items = payload.loads(body, payload_format)
+    except ValueError:
+        abort(400)
+
+    # Make sure all the important keys are available in all the posts
+    if isinstance(items, list) is False or bool(items) is False:
+        abort(404)
+    keys = [_keys(data) for data in items]
 
     # Do processing
-    if found_count == 3:
-        # Extract key values from posting
-        try:
-            timestamp = int(data['timestamp'])
-        except:
-            abort(404)
-        id_agent = data['id_agent']
-        devicename = data['devicename']
+    _spool([(
+        keys[position], payload.dumps(data, payload_format),
+        payload_format) for (position, data) in enumerate(items)])
 
-        # Create a hash of the devicename
-        device_hash = general.hashstring(devicename, sha=1)
-        json_path = (
-            '%s/%s_%s_%s.json') % (cache_dir, timestamp, id_agent, device_hash)
+    # Return
+    return 'OK'
 
-        with open(json_path, "w+") as temp_file:
-            json.dump(data, temp_file)
 
-        # Return
-        return 'OK'
+@POST.route('/schemas', methods=['POST'])
+def register():
+    """Function for handling /infoset/api/v1.0/schemas route.
 
-    else:
+    Saves the schema of an agent post so that the agent can send delta
+    posts that only contain datapoint values.
+
+    Args:
+        None
+
+    Returns:
+        JSON response with the schema_id and number of datapoints
+
+    """
+    # Get the data from the incoming agent POST
+    (body, payload_format) = _body()
+    try:
+        data = payload.loads(body, payload_format)
+    except ValueError:
+        abort(400)
+
+    # Save the schema
+    if _valid(data) is False:
         abort(404)
+    schema = delta.register(data)
+    if schema is None:
+        abort(404)
+
+    # Return
+    return jsonify({
+        'schema_id': schema['schema_id'],
+        'datapoints': len(schema['datapoints'])})
+
+
+def _body():
+    """Get the body of the current request.
+
+    Args:
+        None
+
+    Returns:
+        result: Tuple of the decompressed body and its format. The format
+            is 'ndjson' for newline delimited JSON
+
+    """
+    # Get the format
+    if request.mimetype == streaming.MIMETYPES['ndjson']:
+        payload_format = 'ndjson'
+    else:
+        payload_format = payload.format_of_mimetype(request.mimetype)
+        if payload_format is None:
+            abort(415)
+        if payload.available(payload_format) is False:
+            abort(415)
+
+    # Decompress
+    try:
+        body = payload.decompress(
+            request.get_data(), request.headers.get('Content-Encoding'))
+    except ValueError:
+        abort(400)
+
+    # Return
+    result = (body, payload_format)
+    return result
+
+
+def _keys(data):
+    """Get the keys needed to save a post, aborting if it's invalid.
+
+    Args:
+        data: Agent post or delta post
+
+    Returns:
+        result: Dict with the timestamp, id_agent and devicename of the post
+
+    """
+    # Delta posts must match a registered schema
+    if delta.is_delta(data) is True:
+        schema = delta.get(data[0])
+        if schema is None:
+            abort(409)
+        if delta.valid(data, schema) is False:
+            abort(404)
+        result = delta.keys(data, schema)
+
+    # Check regular posts
+    else:
+        if _valid(data) is False:
+            abort(404)
+        result = data
+
+    # Return
+    return result
+
+
+def _valid(data):
+    """Determine whether a post can be ingested.
+
+    Args:
+        data: Agent post
+
+    Returns:
+        valid: True if valid
+
+    """
+    # Return
+    valid = validate.valid_structure(data)
+    return valid
+
+
+def _check_spool():
+    """Stop accepting posts while the ingester is too far behind.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    """
+    # Ask the agent to try again later
+    if spool.full(CONFIG) is True:
+        response = Response(
+            'The ingester is busy. Try again later.\n', status=503,
+            headers={'Retry-After': str(CONFIG.api_spool_retry_after())})
+        abort(response)
+
+
+def _spool(items):
+    """Save agent posts to the ingest cache directory as one unit.
+
+    Each post is first written to a temporary file that the ingester
+    ignores. The files are only renamed to their final names after all of
+    them have been written, so the ingester never reads a partial file.
+
+    Args:
+        items: List of tuples of the keys of valid agent posts, the
+            encoded post and its format
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    cache_dir = CONFIG.ingest_cache_directory()
+    renames = []
+
+    # Write the temporary files
+    try:
+        for (keys, body, payload_format) in items:
+            # Create a hash of the devicename
+            device_hash = general.hashstring(keys['devicename'], sha=1)
+            filepath = ('%s/%s_%s_%s.%s') % (
+                cache_dir, int(keys['timestamp']), keys['id_agent'],
+                device_hash, payload_format)
+
+            # Write the data
+            (handle, temporary) = tempfile.mkstemp(
+                dir=cache_dir, prefix='.receive_', suffix='.tmp')
+            renames.append((temporary, filepath))
+            with os.fdopen(handle, 'wb') as temp_file:
+                temp_file.write(body)
+            os.chmod(temporary, 0o644)
+    except:
+        for (temporary, _) in renames:
+            if os.path.exists(temporary) is True:
+                os.remove(temporary)
+        raise
+
+    # Make the files visible to the ingester
+    for (temporary, filepath) in renames:
+        os.replace(temporary, filepath)
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Flask hooks adding API requests to the Prometheus metrics.
+
+Kept apart from infoset.utils.metrics so that the ingester can record
+metrics without importing Flask.
+
+"""
+
+# Standard libraries
+import time
+
+# PIP3 libraries
+from flask import g, request
+
+# Infoset libraries
+from infoset.utils import metrics
+
+
+def before_request():
+    """Note the time a request started.
+
+    Used as a Flask before_request function.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    """
+    # Note the time
+    g.infoset_request_start = time.time()
+
+
+def after_request(response):
+    """Add the duration of a request to the histogram of its route.
+
+    Used as a Flask after_request function.
+
+    Args:
+        response: Flask Response object
+
+    Returns:
+        response: Flask Response object
+
+    """
+    # Initialize key variables
+    start = g.get('infoset_request_start')
+    if start is None:
+        return response
+
+    # Unknown URLs are counted together so they can't create many series
+    if request.url_rule is None:
+        route = 'unmatched'
+    else:
+        route = request.url_rule.rule
+
+    # Record the duration
+    metrics.observe(
+        'infoset_api_request_duration_seconds', time.time() - start,
+        labels={
+            'route': route, 'method': request.method,
+            'status': response.status_code})
+    metrics.write()
+
+    # Return
+    return response
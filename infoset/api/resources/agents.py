@@ -9,6 +9,7 @@ from flask import Blueprint, jsonify, request
 from infoset.db import db_agent
 from infoset.utils import general
 from infoset.utils import memory
+from infoset.utils import streaming
 from infoset.api import CACHE
 
 # Define the AGENTS global variable
@@ -36,7 +37,7 @@ def agents(idx_agent):
 
 
 @AGENTS.route('/agents')
-@CACHE.cached(key_prefix=memory.flask_cache_key)
+@CACHE.cached(key_prefix=memory.flask_cache_key, unless=streaming.requested)
 def agents_query():
     """Get Agent data from the DB by id_agent value.
 
@@ -49,13 +50,19 @@ def agents_query():
     """
     # Initialize key variables
     id_agent = request.args.get('id_agent')
+    after = general.integerize(request.args.get('after'))
+    limit = general.integerize(request.args.get('limit'))
 
     if bool(id_agent) is True:
         # Process id_datapoint request
         query = db_agent.GetIDAgent(id_agent)
         data = [query.everything()]
+    elif streaming.requested() is True:
+        # Stream all agents without loading them into memory
+        return streaming.response(
+            db_agent.get_all_agents_iterator(after=after, limit=limit))
     else:
-        data = db_agent.get_all_agents()
+        data = db_agent.get_all_agents(after=after, limit=limit)
 
     # Return
     return jsonify(data)
@@ -9,6 +9,7 @@ from flask import Blueprint, jsonify, request, abort
 # Infoset-ng imports
 from infoset.utils import general
 from infoset.utils import memory
+from infoset.utils import streaming
 from infoset.db import db_datapoint
 from infoset.db import db_multitable
 from infoset.db import db_data
@@ -54,6 +55,8 @@ def datapoints_query():
     id_datapoint = request.args.get('id_datapoint')
     idx_deviceagent = request.args.get('idx_deviceagent')
     base_type = request.args.get('base_type')
+    after = general.integerize(request.args.get('after'))
+    limit = general.integerize(request.args.get('limit'))
 
     if bool(id_datapoint) is True:
         query = db_datapoint.GetIDDatapoint(id_datapoint)
@@ -63,7 +66,8 @@ def datapoints_query():
 
     elif bool(idx_deviceagent) is True:
         data = db_datapoint.listing(
-            general.integerize(idx_deviceagent), base_type=base_type)
+            general.integerize(idx_deviceagent), base_type=base_type,
+            after=after, limit=limit)
 
     else:
         abort(404)
@@ -141,7 +145,7 @@ def db_datapoint_summary():
 
 
 @DATAPOINTS.route('/datapoints/all/summarylist')
-@CACHE.cached(key_prefix=memory.flask_cache_key)
+@CACHE.cached(key_prefix=memory.flask_cache_key, unless=streaming.requested)
 def db_datapoint_summary_list():
     """Get Datapoint summary data from the DB as a list of dicts.
 
@@ -152,8 +156,18 @@ def db_datapoint_summary_list():
         Home Page
 
     """
+    # Initialize key variables
+    after = general.integerize(request.args.get('after'))
+    limit = general.integerize(request.args.get('limit'))
+
+    # Stream all rows without loading them into memory
+    if streaming.requested() is True:
+        return streaming.response(
+            db_multitable.datapoint_summary_list_iterator(
+                after=after, limit=limit))
+
     # Get data
-    data = db_multitable.datapoint_summary_list()
+    data = db_multitable.datapoint_summary_list(after=after, limit=limit)
 
     # Return
     return jsonify(data)
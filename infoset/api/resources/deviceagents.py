@@ -1,10 +1,13 @@
 """infoset-ng database API. DeviceAgent table."""
 
 # Flask imports
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 
 # Infoset-ng imports
 from infoset.db import db_deviceagent
+from infoset.utils import general
+from infoset.utils import memory
+from infoset.utils import streaming
 from infoset.api import CACHE
 
 
@@ -13,7 +16,7 @@ DEVICEAGENTS = Blueprint('DEVICEAGENTS', __name__)
 
 
 @DEVICEAGENTS.route('/deviceagents/<int:value>')
-@CACHE.cached()
+@CACHE.cached(key_prefix=memory.flask_cache_key)
 def deviceagents_query(value):
     """Get DeviceAgent data from the DB by idx value.
 
@@ -36,7 +39,7 @@ def deviceagents_query(value):
 
 
 @DEVICEAGENTS.route('/deviceagents')
-@CACHE.cached()
+@CACHE.cached(key_prefix=memory.flask_cache_key, unless=streaming.requested)
 def deviceagents():
     """Get all DeviceAgent data from the DB.
 
@@ -47,8 +50,18 @@ def deviceagents():
         Agent data
 
     """
+    # Initialize key variables
+    after = general.integerize(request.args.get('after'))
+    limit = general.integerize(request.args.get('limit'))
+
+    # Stream all rows without loading them into memory
+    if streaming.requested() is True:
+        return streaming.response(
+            db_deviceagent.get_all_device_agents_iterator(
+                after=after, limit=limit))
+
     # Get data
-    data = db_deviceagent.get_all_device_agents()
+    data = db_deviceagent.get_all_device_agents(after=after, limit=limit)
 
     # Return
     return jsonify(data)
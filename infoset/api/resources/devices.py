@@ -3,19 +3,44 @@
 # Standard imports
 
 # Flask imports
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 
 # Infoset-ng imports
 from infoset.db import db_device
 from infoset.db import db_deviceagent
+from infoset.utils import general
+from infoset.utils import memory
 from infoset.api import CACHE
 
 # Define the DEVICES global variable
 DEVICES = Blueprint('DEVICES', __name__)
 
 
+@DEVICES.route('/devices')
+@CACHE.cached(key_prefix=memory.flask_cache_key)
+def db_getdevices():
+    """Get data on all enabled devices from the DB.
+
+    Args:
+        None
+
+    Returns:
+        data: JSON data for devices ordered by idx_device
+
+    """
+    # Initialize key variables
+    after = general.integerize(request.args.get('after'))
+    limit = general.integerize(request.args.get('limit'))
+
+    # Get data
+    data = db_device.all_devices(after=after, limit=limit)
+
+    # Return
+    return jsonify(data)
+
+
 @DEVICES.route('/devices/<int:value>')
-@CACHE.cached()
+@CACHE.cached(key_prefix=memory.flask_cache_key)
 def db_getidxdevice(value):
     """Get device data from the DB by idx value.
 
@@ -38,7 +63,7 @@ def db_getidxdevice(value):
 
 
 @DEVICES.route('/devices/<int:value>/agents')
-@CACHE.cached()
+@CACHE.cached(key_prefix=memory.flask_cache_key)
 def db_deviceagent_agentindices(value):
     """Get all agent indices from the DB.
 
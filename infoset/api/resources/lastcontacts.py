@@ -9,6 +9,8 @@ from flask import Blueprint, jsonify, request
 
 # Infoset-ng imports
 from infoset.utils import general
+from infoset.utils import memory
+from infoset.utils import streaming
 from infoset.db import db_agent
 from infoset.db import db_data
 from infoset.db import db_device
@@ -21,7 +23,7 @@ LASTCONTACTS = Blueprint('LASTCONTACTS', __name__)
 
 
 @LASTCONTACTS.route('/lastcontacts')
-@CACHE.cached()
+@CACHE.cached(key_prefix=memory.flask_cache_key, unless=streaming.requested)
 def lastcontacts():
     """Get last contact data from the DB.
 
@@ -37,6 +39,10 @@ def lastcontacts():
     timestamp = general.integerize(request.args.get('ts_start'))
     ts_start = _ts_start(secondsago, timestamp)
 
+    # Stream all rows without loading them into memory
+    if streaming.requested() is True:
+        return streaming.response(db_data.last_contacts_iterator(ts_start))
+
     # Get data
     data = db_data.last_contacts(ts_start)
 
@@ -45,7 +51,7 @@ def lastcontacts():
 
 
 @LASTCONTACTS.route('/lastcontacts/id_agents')
-@CACHE.cached()
+@CACHE.cached(key_prefix=memory.flask_cache_key)
 def id_agents():
     """Get last contact data from the DB.
 
@@ -67,11 +73,17 @@ def id_agents():
     ts_start = _ts_start(secondsago, timestamp)
 
     # Get the agent ids assigned to each datapoint
-    mapping = db_multitable.datapoint_summary()
+    mapping = db_multitable.datapoint_summary_snapshot(CONFIG)
 
     # Get the contacts
     contacts = db_data.last_contacts(ts_start)
 
+    # Use the database if datapoints were added after the snapshot
+    for contact in contacts:
+        if contact['idx_datapoint'] not in mapping:
+            mapping = db_multitable.datapoint_summary()
+            break
+
     # Store the contacts according to id_agent and agent_label
     for contact in contacts:
         # Track last contacts for each agent_label of each id_agent
@@ -109,7 +121,7 @@ def id_agents():
 
 
 @LASTCONTACTS.route('/lastcontacts/deviceagents/<int:value>')
-@CACHE.cached()
+@CACHE.cached(key_prefix=memory.flask_cache_key)
 def deviceagents(value):
     """Get last contact data from the DB.
 
@@ -139,7 +151,7 @@ def deviceagents(value):
 @LASTCONTACTS.route(
     '/lastcontacts/devicenames/<string:devicename>/'
     'id_agents/<string:id_agent>')
-@CACHE.cached()
+@CACHE.cached(key_prefix=memory.flask_cache_key)
 def devicename_agents(devicename, id_agent):
     """Get last contact data from the DB.
 
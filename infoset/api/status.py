@@ -1,7 +1,18 @@
 """infoset-ng database API. Get Version."""
 
+# Standard imports
+import time
+
 # Flask imports
-from flask import Blueprint
+from flask import Blueprint, Response, jsonify
+
+# Infoset-ng imports
+from infoset.utils import memory
+from infoset.utils import metrics
+from infoset.cache import spool
+from infoset.db import pool_metrics
+from infoset.cache import timing
+from infoset.api import CONFIG
 
 # Define the STATUS global variable
 STATUS = Blueprint('STATUS', __name__)
@@ -20,3 +31,136 @@ def index():
     """
     # Return
     return 'Infoset API v1.0 Operational.\n'
+
+
+@STATUS.route('/status/cache')
+def cache():
+    """Get the API cache hit and miss counters.
+
+    Args:
+        None
+
+    Returns:
+        data: JSON data of the counters
+
+    """
+    # Get data
+    data = memory.Cache(CONFIG).statistics()
+
+    # Return
+    return jsonify(data)
+
+
+@STATUS.route('/status/pool')
+def pool():
+    """Get the database connection pool statistics of all processes.
+
+    Args:
+        None
+
+    Returns:
+        data: JSON data of the statistics
+
+    """
+    # Include the current state of this process
+    pool_metrics.write(force=True)
+
+    # Get data
+    data = pool_metrics.statistics(CONFIG.pool_statistics_directory())
+
+    # Return
+    return jsonify(data)
+
+
+@STATUS.route('/status/ingester')
+def ingester():
+    """Get the timings of the stages of the ingester.
+
+    Args:
+        None
+
+    Returns:
+        data: JSON data of the timings of the most recent ingest cycle and
+            the totals of all cycles
+
+    """
+    # Get data
+    data = timing.read(CONFIG.ingest_statistics_directory())
+    data['buckets'] = timing.BUCKETS
+
+    # Return
+    return jsonify(data)
+
+
+@STATUS.route('/metrics')
+def prometheus():
+    """Get the metrics of the API and ingester in the Prometheus format.
+
+    Args:
+        None
+
+    Returns:
+        Response with the metrics
+
+    """
+    # Include the current state of this process
+    metrics.write(force=True)
+    pool_metrics.write(force=True)
+
+    # Get the requests and queries of all processes
+    data = metrics.collect(CONFIG.metrics_directory())
+    counters = data['counters']
+    histograms = data['histograms']
+    gauges = {}
+
+    # Add the API cache counters
+    statistics = memory.Cache(CONFIG).statistics()
+    for name in memory.STATISTICS:
+        counters[metrics.series(
+            'infoset_api_cache_requests_total',
+            {'result': name})] = statistics[name]
+    gauges['infoset_api_cache_hit_ratio'] = statistics['hit_rate']
+
+    # Add the database connections
+    totals = pool_metrics.statistics(
+        CONFIG.pool_statistics_directory())['totals']
+    for state in ['checked_out', 'checked_in', 'overflow', 'limit']:
+        gauges[metrics.series(
+            'infoset_db_pool_connections', {'state': state})] = totals[state]
+    counters['infoset_db_pool_checkout_timeouts_total'] = totals[
+        'checkout_timeouts']
+
+    # Add the cache files waiting to be ingested. Listing a large directory
+    # for every scrape would be expensive, so a recent measurement is used
+    usage = spool.cached_usage(CONFIG.ingest_cache_directory())
+    gauges['infoset_spool_files'] = usage['files']
+    gauges['infoset_spool_bytes'] = usage['bytes']
+    if usage['oldest'] is None:
+        gauges['infoset_ingest_lag_seconds'] = 0
+    else:
+        gauges['infoset_ingest_lag_seconds'] = max(
+            time.time() - usage['oldest'], 0)
+
+    # Add the work done by the ingester
+    ingested = timing.read(CONFIG.ingest_statistics_directory())
+    totals = ingested['totals']
+    counters['infoset_ingest_cycles_total'] = totals['cycles']
+    counters['infoset_ingest_files_total'] = totals['files']
+    counters['infoset_ingest_datapoints_total'] = totals['datapoints']
+    cycle = ingested['last_cycle']
+    if cycle is None or bool(cycle['duration']) is False:
+        gauges['infoset_ingest_datapoints_per_second'] = 0
+    else:
+        gauges['infoset_ingest_datapoints_per_second'] = (
+            cycle['datapoints'] / cycle['duration'])
+    for (stage, item) in totals['stages'].items():
+        histogram = dict(item, limits=timing.BUCKETS)
+        histogram['sum'] = histogram.pop('seconds')
+        histograms[metrics.series(
+            'infoset_ingest_stage_duration_seconds',
+            {'stage': stage})] = histogram
+
+    # Return
+    return Response(
+        metrics.render(counters, histograms, gauges),
+        content_type='text/plain; version=0.0.4')
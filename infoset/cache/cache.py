@@ -7,7 +7,6 @@ import time
 import shutil
 from collections import defaultdict
 from multiprocessing import Pool
-import re
 import pymysql
 
 # PIP libraries
@@ -21,10 +20,15 @@ from infoset.db import db_agent
 from infoset.db import db_agentname
 from infoset.db import db_device
 from infoset.db import db_deviceagent
+from infoset.db import db_multitable
 from infoset.utils import configuration
 from infoset.utils import general
 from infoset.utils import log
+from infoset.utils import memory
+from infoset.utils import metrics
+from infoset.utils import payload
 from infoset.cache import drain
+from infoset.cache import timing
 from infoset.utils import daemon
 
 
@@ -74,6 +78,8 @@ class _ProcessAgentCache(object):
         self.config = config
         self.metadata = metadata
         self.ingester_agent_name = ingester_agent_name
+        self.files = 0
+        self.datapoints = 0
 
     def process(self):
         """Update the database using threads."""
@@ -153,6 +159,8 @@ class _ProcessAgentCache(object):
             # Upadate and note success
             (success, datapoints_processed) = self._do_update(
                 agent_data, ingests)
+            self.files = len(ingests)
+            self.datapoints = datapoints_processed
 
             # Log duration of activity
             duration = time.time() - start_ts
@@ -180,15 +188,16 @@ class _ProcessAgentCache(object):
         max_timestamp = agent_data['max_timestamp']
 
         # Add datapoints to the database
-        db_prepare = _PrepareDatabase(agent_data)
-        db_prepare.add_datapoints()
+        with timing.stage('prepare_database'):
+            db_prepare = _PrepareDatabase(agent_data)
+            db_prepare.add_datapoints()
 
-        # Get the latest datapoints
-        datapoints = db_prepare.get_datapoints()
+            # Get the latest datapoints
+            datapoints = db_prepare.get_datapoints()
 
-        # Get the assigned index values for the device and agent
-        idx_device = db_prepare.idx_device()
-        idx_agent = db_prepare.idx_agent()
+            # Get the assigned index values for the device and agent
+            idx_device = db_prepare.idx_device()
+            idx_agent = db_prepare.idx_agent()
 
         # Update database with data
         db_update = _UpdateDB(agent_data, datapoints)
@@ -206,17 +215,23 @@ class _ProcessAgentCache(object):
         #####################################################################
 
         # Update database table timestamps
-        update_timestamps = _UpdateLastTimestamp(
-            idx_device, idx_agent, max_timestamp)
-        update_timestamps.deviceagent()
-        update_timestamps.datapoint()
+        with timing.stage('update_timestamps'):
+            update_timestamps = _UpdateLastTimestamp(
+                idx_device, idx_agent, max_timestamp)
+            update_timestamps.deviceagent()
+            update_timestamps.datapoint()
+
+            # Invalidate cached API responses that use the updated data
+            _increment_generations(
+                self.config, db_prepare.idx_deviceagent(), datapoints)
 
         # Purge source files. Only done after complete
         # success of database updates. If not we could lose data in the
         # event of an ingester crash. Ingester would re-read the files
         # and process the non-duplicates, while deleting the duplicates.
-        for ingest in ingests:
-            ingest.purge()
+        with timing.stage('purge'):
+            for ingest in ingests:
+                ingest.purge()
 
         # Return
         return (success, len(datapoints))
@@ -253,6 +268,20 @@ class _PrepareDatabase(object):
         self._idx_deviceagent = db_deviceagent.GetDeviceAgent(
             self._idx_device, self._idx_agent).idx_deviceagent()
 
+    def idx_deviceagent(self):
+        """Get the DeviceAgent index of the agent data.
+
+        Args:
+            None
+
+        Returns:
+            result: idx_deviceagent value
+
+        """
+        # Return
+        result = self._idx_deviceagent
+        return result
+
     def idx_agent(self):
         """Insert new agent into database if necessary.
 
@@ -508,10 +537,12 @@ class _UpdateDB(object):
         outcomes = []
 
         # Update timeseries data
-        outcomes.append(self._update_timeseries())
+        with timing.stage('insert_timeseries'):
+            outcomes.append(self._update_timeseries())
 
         # Update timefixed data
-        outcomes.append(self._update_timefixed())
+        with timing.stage('update_timefixed'):
+            outcomes.append(self._update_timefixed())
 
         # Determine success
         if False in outcomes:
@@ -723,6 +754,29 @@ class _UpdateLastTimestamp(object):
         database.commit(session, 1057)
 
 
+def _increment_generations(config, idx_deviceagent, datapoints):
+    """Increment the generation counters used in API cache keys.
+
+    Args:
+        config: Config object
+        idx_deviceagent: Index of the updated DeviceAgent
+        datapoints: Dict of updated datapoint data keyed by datapoint ID
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    keys = [memory.generation_key('deviceagent', idx_deviceagent)]
+
+    # Add the key of every datapoint
+    for item in datapoints.values():
+        keys.append(memory.generation_key('datapoint', item['idx_datapoint']))
+
+    # Update memcached with a single write however many datapoints changed
+    memory.Cache(config).stamp(keys)
+
+
 def validate_cache_files(config):
     """Create metadata for cache files with valid names.
 
@@ -746,8 +800,8 @@ def validate_cache_files(config):
     cache_dir = config.ingest_cache_directory()
 
     # Filenames must start with a numeric timestamp and #
-    # end with a hex string. This will be tested later
-    regex = re.compile(r'^\d+_[0-9a-f]+_[0-9a-f]+.json')
+    # end with a hex string and format. This will be tested later
+    regex = payload.CACHE_FILENAME
 
     # Add files in cache directory to list
     all_filenames = [filename for filename in os.listdir(
@@ -819,12 +873,27 @@ def _process(config, metadata, ingester_agent_name):
         ingester_agent_name: Ingester's agent name
 
     Returns:
-        Nothing
+        result: Tuple of the number of files and datapoints processed, and
+            the timings of the ingest stages
 
     """
+    # Profile the processing if configured
+    directory = None
+    if config.ingest_profile() is True:
+        directory = config.ingest_profile_directory()
+    (name, _) = os.path.basename(metadata[0]['filepath']).split('.')
+
     # Start processing
     data = _ProcessAgentCache(config, metadata, ingester_agent_name)
-    data.process()
+    with timing.profile(directory, name):
+        data.process()
+
+    # Save the database query metrics of this process
+    metrics.write(force=True)
+
+    # Return
+    result = (data.files, data.datapoints, timing.collect())
+    return result
 
 
 def process(config, ingester_agent_name):
@@ -855,7 +924,9 @@ def process(config, ingester_agent_name):
         return
 
     # Get meta data on files
+    start = time.time()
     id_agent_metadata = validate_cache_files(config)
+    scan = time.time() - start
 
     # Spawn processes only if we have files to process
     if bool(id_agent_metadata.keys()) is True:
@@ -891,12 +962,30 @@ def process(config, ingester_agent_name):
         with Pool(processes=pool_size) as pool:
 
             # Create sub processes from the pool
-            pool.map(_wrapper_process, argument_list)
+            results = pool.map(_wrapper_process, argument_list)
 
         # Return if lock file is present
         if os.path.exists(lockfile) is True:
             os.remove(lockfile)
 
+        # Save the timings of the ingest stages
+        timing.record('scan', scan)
+        cycle = {
+            'timestamp': int(start),
+            'duration': time.time() - start,
+            'agents': len(results),
+            'files': sum(files for (files, _, _) in results),
+            'datapoints': sum(count for (_, count, _) in results),
+            'stages': timing.collect()
+        }
+        for (_, _, timings) in results:
+            timing.merge(cycle['stages'], timings)
+        timing.write(config.ingest_statistics_directory(), cycle)
+        metrics.write(force=True)
+
+    # Add new datapoints to the snapshot used by the API
+    db_multitable.update_datapoint_summary_snapshot(config)
+
 
 def main():
     """Ingest data if this file is run from the CLI.
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""Delta posts that only contain datapoint values.
+
+Agents register the labels, indexes, sources, descriptions and base_types
+of their data once. The API saves this schema in a file named after its
+schema_id, a hash of its contents. The agent then posts
+[schema_id, timestamp, values] lists where the values are in the order of
+the schema's datapoints. The ingester expands delta posts using the schema
+and the datapoint IDs already stored in it.
+
+The order of the datapoints is the order of the agent labels of the
+'timeseries' data, followed by those of the 'timefixed' data, each sorted
+by agent label. The datapoints of each label are in the order of the
+label's 'data' list.
+
+"""
+
+# Standard libraries
+import os
+import json
+import tempfile
+import threading
+from collections import OrderedDict
+
+# Infoset libraries
+from infoset.utils import configuration
+from infoset.utils import general
+
+# Types of data in posts, in the order used by schemas
+DATA_TYPES = ['timeseries', 'timefixed']
+
+# Number of schemas kept in memory by each process
+CACHE_SIZE = 1000
+
+# Schemas recently used by this process, keyed by schema_id
+_SCHEMAS = OrderedDict()
+_LOCK = threading.Lock()
+
+
+def id_datapoint(id_agent, label, index, agent_name, devicename):
+    """Create a unique DID from ingested data.
+
+    Args:
+        id_agent: Identifier of device that created the cache data file
+        label: Label of the data
+        index: Index of the data
+        agent_name: Name of agent
+        devicename: Devicename
+
+    Returns:
+        result: Datapoint ID
+
+    """
+    # Return
+    prehash = ('%s%s%s%s%s') % (id_agent, label, index, agent_name, devicename)
+    result = general.hashstring(prehash)
+    return result
+
+
+def is_delta(data):
+    """Determine whether a post is a delta post.
+
+    Args:
+        data: Agent post
+
+    Returns:
+        result: True if a delta post
+
+    """
+    # Return
+    result = (
+        isinstance(data, list) and len(data) == 3 and
+        isinstance(data[0], str))
+    return result
+
+
+def datapoints(data):
+    """Get the datapoints of a post in the order used by schemas.
+
+    Args:
+        data: Agent post
+
+    Returns:
+        result: List of (data_type, agent_label, base_type, description,
+            index, value, source) tuples
+
+    """
+    # Initialize key variables
+    result = []
+
+    # Process each data type
+    for data_type in DATA_TYPES:
+        if data_type not in data:
+            continue
+        for agent_label, label_dict in sorted(data[data_type].items()):
+            for (index, value, source) in label_dict['data']:
+                result.append((
+                    data_type, agent_label, label_dict['base_type'],
+                    label_dict['description'], index, value, source))
+
+    # Return
+    return result
+
+
+def create(data):
+    """Create the schema of a post.
+
+    Agents can use this to find the schema_id of their data without
+    contacting the API.
+
+    Args:
+        data: Agent post
+
+    Returns:
+        result: Schema without datapoint IDs. None if the post doesn't
+            have the keys needed
+
+    """
+    # Initialize key variables
+    result = None
+
+    # Create the schema
+    try:
+        schema = {
+            'id_agent': data['id_agent'],
+            'agent': data['agent'],
+            'devicename': data['devicename'],
+            'datapoints': [
+                [data_type, agent_label, base_type, description, index,
+                 source] for (
+                     data_type, agent_label, base_type, description, index,
+                     _, source) in datapoints(data)]
+        }
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return result
+    if bool(schema['datapoints']) is False:
+        return result
+
+    # Return
+    schema['schema_id'] = general.hashstring(
+        json.dumps(schema, sort_keys=True), sha=1)
+    result = schema
+    return result
+
+
+def register(data):
+    """Save the schema of a post.
+
+    Args:
+        data: Agent post
+
+    Returns:
+        result: Schema. None if the post doesn't have the keys needed
+
+    """
+    # Initialize key variables
+    result = create(data)
+    if result is None:
+        return result
+
+    # Add the datapoint IDs so that the ingester doesn't need to create them
+    for item in result['datapoints']:
+        item.append(id_datapoint(
+            result['id_agent'], item[1], item[4], result['agent'],
+            result['devicename']))
+
+    # Save the schema if it isn't already saved
+    filepath = _filepath(result['schema_id'])
+    if os.path.isfile(filepath) is False:
+        directory = os.path.dirname(filepath)
+        (handle, temporary) = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(handle, 'w') as f_handle:
+            json.dump(result, f_handle)
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, filepath)
+
+    # Return
+    return result
+
+
+def get(schema_id):
+    """Get a schema.
+
+    Args:
+        schema_id: Schema ID
+
+    Returns:
+        result: Schema. None if not found
+
+    """
+    # Initialize key variables
+    result = None
+
+    # Only alphanumeric schema IDs are valid
+    if isinstance(schema_id, str) is False or schema_id.isalnum() is False:
+        return result
+
+    # Get the schema from memory
+    with _LOCK:
+        result = _SCHEMAS.get(schema_id)
+        if result is not None:
+            _SCHEMAS.move_to_end(schema_id)
+            return result
+
+    # Read the schema file
+    try:
+        with open(_filepath(schema_id), 'r') as f_handle:
+            result = json.load(f_handle)
+    except (OSError, ValueError):
+        return result
+
+    # Keep the schema in memory
+    with _LOCK:
+        _SCHEMAS[schema_id] = result
+        while len(_SCHEMAS) > CACHE_SIZE:
+            _SCHEMAS.popitem(last=False)
+    return result
+
+
+def valid(data, schema):
+    """Determine whether a delta post matches its schema.
+
+    Uses the same checks of the timestamp and timeseries values as the
+    ingester uses for regular posts.
+
+    Args:
+        data: Delta post
+        schema: Schema of the delta post
+
+    Returns:
+        result: True if valid
+
+    """
+    # Initialize key variables
+    result = False
+    (_, timestamp, values) = data
+
+    # Check the timestamp and number of values
+    if isinstance(timestamp, int) is True and isinstance(values, list) is True:
+        if len(values) == len(schema['datapoints']):
+            result = general.validate_timestamp(timestamp)
+
+    # Timeseries values must be numeric
+    if result is True:
+        for (item, value) in zip(schema['datapoints'], values):
+            if item[0] == 'timeseries':
+                try:
+                    float(value)
+                except (TypeError, ValueError):
+                    result = False
+                    break
+
+    # Return
+    return result
+
+
+def keys(data, schema):
+    """Get the main keys of a delta post.
+
+    Args:
+        data: Delta post
+        schema: Schema of the delta post
+
+    Returns:
+        result: Dict with the timestamp, id_agent, agent and devicename
+            of the post
+
+    """
+    # Return
+    result = {
+        'timestamp': int(data[1]),
+        'id_agent': schema['id_agent'],
+        'agent': schema['agent'],
+        'devicename': schema['devicename']
+    }
+    return result
+
+
+def expand(data):
+    """Convert a delta post into a regular post.
+
+    Args:
+        data: Delta post
+
+    Returns:
+        result: Tuple of the post and a dict of datapoint IDs keyed by
+            data type and agent label. Each is a list in the order of the
+            agent label's data. (None, None) if the schema isn't found or
+            doesn't match the post
+
+    """
+    # Initialize key variables
+    result = (None, None)
+    schema = get(data[0])
+    if schema is None or valid(data, schema) is False:
+        return result
+    information = keys(data, schema)
+    id_datapoints = {}
+
+    # Add the values
+    for (item, value) in zip(schema['datapoints'], data[2]):
+        (data_type, agent_label, base_type, description, index, source,
+         did) = item
+        labels = information.setdefault(data_type, {})
+        if agent_label not in labels:
+            labels[agent_label] = {
+                'base_type': base_type,
+                'description': description,
+                'data': []
+            }
+            id_datapoints.setdefault(data_type, {})[agent_label] = []
+        labels[agent_label]['data'].append([index, value, source])
+        id_datapoints[data_type][agent_label].append(did)
+
+    # Return
+    result = (information, id_datapoints)
+    return result
+
+
+def _filepath(schema_id):
+    """Get the path of a schema file.
+
+    Args:
+        schema_id: Schema ID
+
+    Returns:
+        result: Path
+
+    """
+    # Return
+    directory = configuration.cached().ingest_schema_directory()
+    result = os.path.join(directory, '{}.json'.format(schema_id))
+    return result
@@ -3,12 +3,14 @@
 
 # Standard libraries
 import os
+import time
 from collections import defaultdict
 
 # Infoset libraries
 from infoset.utils import log
-from infoset.utils import general
 from infoset.cache import validate
+from infoset.cache import delta
+from infoset.cache import timing
 
 
 class Drain(object):
@@ -53,6 +55,7 @@ class Drain(object):
         # Ingest data
         validator = validate.ValidateCache(filename)
         information = validator.getinfo()
+        id_datapoints = validator.id_datapoints()
 
         # Log if data is bad
         if information is False:
@@ -65,6 +68,8 @@ class Drain(object):
 
         # Process validated data
         if self.validated is True:
+            start = time.time()
+
             # Get main keys
             self.agent_meta = _main_keys(information)
             timestamp = self.agent_meta['timestamp']
@@ -87,16 +92,23 @@ class Drain(object):
                     if base_type not in self._information[data_type]:
                         self._information[data_type][base_type] = []
 
+                    # Datapoint IDs of delta posts come from their schema
+                    schema_ids = id_datapoints.get(
+                        data_type, {}).get(agent_label)
+
                     # Process the data associated with the agent_label
-                    for datapoint in label_dict['data']:
+                    for position, datapoint in enumerate(label_dict['data']):
                         # Create a unique, unchangeable id_datapoint for data
                         index = datapoint[0]
                         value = datapoint[1]
                         source = datapoint[2]
-                        id_datapoint = _id_datapoint(
-                            id_agent, agent_label, index,
-                            self.agent_meta['agent'],
-                            self.agent_meta['devicename'])
+                        if schema_ids is None:
+                            id_datapoint = _id_datapoint(
+                                id_agent, agent_label, index,
+                                self.agent_meta['agent'],
+                                self.agent_meta['devicename'])
+                        else:
+                            id_datapoint = schema_ids[position]
 
                         # Convert values to float if this is
                         # data that could be charted
@@ -121,6 +133,9 @@ class Drain(object):
                              'base_type': base_type}
                         )
 
+            # Record the time taken
+            timing.record('drain', time.time() - start)
+
     def valid(self):
         """Determine whether data is valid.
 
@@ -394,9 +409,8 @@ def _id_datapoint(id_agent, label, index, agent_name, devicename):
 
     """
     # Initialize key variables
-    prehash = ('%s%s%s%s%s') % (id_agent, label, index, agent_name, devicename)
-    result = general.hashstring(prehash)
-    id_datapoint = result
+    id_datapoint = delta.id_datapoint(
+        id_agent, label, index, agent_name, devicename)
 
     # Return
     return id_datapoint
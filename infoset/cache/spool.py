@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Measure the posts waiting in the ingest cache directory.
+
+The API stops accepting posts when the ingester falls too far behind, so
+that the ingest cache directory can't fill the disk of the ingest server.
+
+"""
+
+# Standard libraries
+import os
+import time
+import threading
+
+# Infoset libraries
+from infoset.utils import payload
+
+# Minimum number of seconds between measurements of the spool by each
+# process. Listing a large directory for every post would be expensive
+CHECK_INTERVAL = 5
+
+# Most recent measurement of this process
+_LOCK = threading.Lock()
+_USAGE = {'checked': 0, 'files': 0, 'bytes': 0, 'oldest': None}
+
+
+def usage(directory):
+    """Measure the cache files in a directory.
+
+    Args:
+        directory: Ingest cache directory
+
+    Returns:
+        result: Dict with these keys:
+            files: Number of cache files
+            bytes: Total size of the cache files
+            oldest: Timestamp of the oldest cache file. None if there
+                are no files
+
+    """
+    # Initialize key variables
+    result = {'files': 0, 'bytes': 0, 'oldest': None}
+
+    # Measure the files
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if payload.CACHE_FILENAME.match(entry.name) is None:
+                continue
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                # The ingester deleted the file
+                continue
+            result['files'] += 1
+            result['bytes'] += size
+            timestamp = int(entry.name.split('_')[0])
+            if result['oldest'] is None or timestamp < result['oldest']:
+                result['oldest'] = timestamp
+
+    # Return
+    return result
+
+
+def cached_usage(directory):
+    """Measure the cache files in a directory at most every CHECK_INTERVAL.
+
+    Args:
+        directory: Ingest cache directory
+
+    Returns:
+        result: Dict with the keys returned by usage()
+
+    """
+    # Initialize key variables
+    now = time.time()
+
+    # Measure the spool if the last measurement is too old
+    with _LOCK:
+        if now - _USAGE['checked'] >= CHECK_INTERVAL:
+            _USAGE.update(usage(directory))
+            _USAGE['checked'] = now
+        result = {
+            key: value for (key, value) in _USAGE.items()
+            if key != 'checked'}
+
+    # Return
+    return result
+
+
+def full(config):
+    """Determine whether the spool has reached its configured limits.
+
+    Args:
+        config: Configuration object
+
+    Returns:
+        result: True if full
+
+    """
+    # Initialize key variables
+    max_files = config.api_spool_max_files()
+    max_bytes = config.api_spool_max_bytes()
+
+    # There is nothing to measure without limits
+    if max_files <= 0 and max_bytes <= 0:
+        return False
+
+    # Measure the spool
+    measurement = cached_usage(config.ingest_cache_directory())
+
+    # Return
+    result = (
+        (max_files > 0 and measurement['files'] >= max_files) or
+        (max_bytes > 0 and measurement['bytes'] >= max_bytes))
+    return result
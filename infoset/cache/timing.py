@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""Time each stage of the ingest pipeline.
+
+Each ingester process records the duration of every stage it runs. The
+worker processes return their timings to the ingester with the results of
+their work, and the ingester writes the combined timings of each cycle,
+together with totals since the ingester started, to a statistics file.
+
+"""
+
+# Standard libraries
+import os
+import json
+import time
+import tempfile
+import threading
+import cProfile
+from contextlib import contextmanager
+
+# Infoset libraries
+from infoset.utils import log
+
+# Stages of the ingest pipeline, in order
+STAGES = [
+    'scan', 'read', 'validate_keys', 'validate_structure',
+    'validate_duplicates', 'drain', 'prepare_database', 'insert_timeseries',
+    'update_timefixed', 'update_timestamps', 'purge']
+
+# Upper bounds in seconds of the buckets of the histogram of each stage.
+# The last bucket counts everything slower
+BUCKETS = [0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 60]
+
+# Name of the statistics file
+FILENAME = 'stats.json'
+
+# Timings recorded by this process since they were last collected
+_LOCK = threading.Lock()
+_TIMINGS = {}
+
+
+def empty():
+    """Create empty timings.
+
+    Args:
+        None
+
+    Returns:
+        result: Dict keyed by stage. Each value is a dict with these keys:
+            count: Number of times the stage ran
+            seconds: Total duration
+            max: Longest duration
+            buckets: Histogram of durations. One count per item of
+                BUCKETS, followed by the count of slower durations
+
+    """
+    # Return
+    result = {
+        stage: {
+            'count': 0, 'seconds': 0, 'max': 0,
+            'buckets': [0] * (len(BUCKETS) + 1)}
+        for stage in STAGES}
+    return result
+
+
+def record(stage, seconds):
+    """Record the duration of a stage.
+
+    Args:
+        stage: Stage
+        seconds: Duration
+
+    Returns:
+        None
+
+    """
+    # Find the bucket
+    bucket = len(BUCKETS)
+    for (position, limit) in enumerate(BUCKETS):
+        if seconds <= limit:
+            bucket = position
+            break
+
+    # Record
+    with _LOCK:
+        if bool(_TIMINGS) is False:
+            _TIMINGS.update(empty())
+        timing = _TIMINGS[stage]
+        timing['count'] += 1
+        timing['seconds'] += seconds
+        timing['max'] = max(timing['max'], seconds)
+        timing['buckets'][bucket] += 1
+
+
+@contextmanager
+def stage(name):
+    """Record the duration of the code run in a with statement.
+
+    Args:
+        name: Stage
+
+    Returns:
+        None
+
+    """
+    # Time the code
+    start = time.time()
+    try:
+        yield
+    finally:
+        record(name, time.time() - start)
+
+
+def collect():
+    """Get the timings recorded by this process and start new ones.
+
+    Args:
+        None
+
+    Returns:
+        result: Timings
+
+    """
+    # Return
+    with _LOCK:
+        result = dict(_TIMINGS) or empty()
+        _TIMINGS.clear()
+    return result
+
+
+def merge(timings, other):
+    """Add timings to other timings.
+
+    Args:
+        timings: Timings to update
+        other: Timings to add
+
+    Returns:
+        None
+
+    """
+    # Add each stage
+    for (name, timing) in other.items():
+        if name not in timings:
+            continue
+        total = timings[name]
+        total['count'] += timing['count']
+        total['seconds'] += timing['seconds']
+        total['max'] = max(total['max'], timing['max'])
+        total['buckets'] = [
+            sum(counts) for counts in zip(
+                total['buckets'], timing['buckets'])]
+
+
+def write(directory, cycle):
+    """Add the statistics of an ingest cycle to the statistics file.
+
+    Args:
+        directory: Directory containing the statistics file
+        cycle: Dict of the cycle's statistics with these keys:
+            timestamp: Time the cycle started
+            duration: Duration of the cycle
+            agents: Number of agents processed
+            files: Number of cache files processed
+            datapoints: Number of datapoints processed
+            stages: Timings
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    filepath = os.path.join(directory, FILENAME)
+    data = read(directory)
+
+    # Add the cycle to the totals
+    totals = data['totals']
+    totals['cycles'] += 1
+    for key in ['duration', 'agents', 'files', 'datapoints']:
+        totals[key] += cycle[key]
+    merge(totals['stages'], cycle['stages'])
+    data['last_cycle'] = cycle
+
+    # Write the file. Readers never see a partially written file
+    try:
+        (handle, temporary) = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(handle, 'w') as f_handle:
+            json.dump(data, f_handle)
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, filepath)
+    except OSError as exception:
+        log_message = (
+            'Unable to write ingest statistics file {}: {}'
+            ''.format(filepath, exception))
+        log.log2debug(1168, log_message)
+
+
+def read(directory):
+    """Read the statistics file.
+
+    Args:
+        directory: Directory containing the statistics file
+
+    Returns:
+        result: Dict with these keys:
+            last_cycle: Statistics of the most recent cycle. None if there
+                hasn't been one
+            totals: Sums of the statistics of all cycles, with the number
+                of cycles
+
+    """
+    # Read the file
+    try:
+        with open(os.path.join(directory, FILENAME), 'r') as f_handle:
+            result = json.load(f_handle)
+    except (OSError, ValueError):
+        result = {
+            'last_cycle': None,
+            'totals': {
+                'cycles': 0, 'duration': 0, 'agents': 0, 'files': 0,
+                'datapoints': 0, 'stages': empty()}
+        }
+
+    # Return
+    return result
+
+
+@contextmanager
+def profile(directory, name):
+    """Profile the code run in a with statement using cProfile.
+
+    Args:
+        directory: Directory in which to save the profile. Nothing is
+            profiled if None
+        name: Name of the profile file, without its .prof extension
+
+    Returns:
+        None
+
+    """
+    # Don't profile
+    if directory is None:
+        yield
+        return
+
+    # Profile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(
+            os.path.join(directory, '{}.prof'.format(name)))
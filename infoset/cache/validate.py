@@ -3,13 +3,14 @@
 
 # Standard libraries
 import os
-import re
-import json
 import time
 
 # Infoset libraries
 from infoset.utils import log
 from infoset.utils import general
+from infoset.utils import payload
+from infoset.cache import delta
+from infoset.cache import timing
 from infoset.db import db_deviceagent
 from infoset.db import db_agent
 from infoset.db import db_device
@@ -49,6 +50,7 @@ class ValidateCache(object):
         # Initialize key variables
         self._valid = True
         self.information = {}
+        self._id_datapoints = {}
         _data = {}
         self.filepath = filepath
 
@@ -58,6 +60,7 @@ class ValidateCache(object):
             check = _CheckFile(self.filepath)
             if check.valid() is True:
                 self.information = check.contents()
+                self._id_datapoints = check.id_datapoints()
             else:
                 self._valid = False
         else:
@@ -90,6 +93,21 @@ class ValidateCache(object):
             data = self.information
         return data
 
+    def id_datapoints(self):
+        """Provide the datapoint IDs of delta posts.
+
+        Args:
+            None
+
+        Returns:
+            data: Dict of lists of datapoint IDs keyed by data type and
+                agent label. Empty if the file doesn't contain a delta post
+
+        """
+        # Return
+        data = self._id_datapoints
+        return data
+
     def valid(self):
         """Master method that defines whether data is OK.
 
@@ -106,13 +124,15 @@ class ValidateCache(object):
 
         # Check timeseries and timefixed data in the data
         if len(valid_list) == valid_list.count(True):
-            check = _CheckData(self.information)
-            valid_list.append(check.valid())
+            with timing.stage('validate_structure'):
+                check = _CheckData(self.information)
+                valid_list.append(check.valid())
 
         # Check if data to be validated is already in the database
         if len(valid_list) == valid_list.count(True):
-            check = _CheckDuplicates(self.information)
-            valid_list.append(check.valid())
+            with timing.stage('validate_duplicates'):
+                check = _CheckDuplicates(self.information)
+                valid_list.append(check.valid())
 
         # Do final check
         if len(valid_list) == valid_list.count(True):
@@ -598,11 +618,24 @@ class _CheckFile(object):
         self.filepath = filepath
         self.data = None
         self._valid = False
+        self._id_datapoints = {}
         name_ok = _valid_filename(filepath)
 
         # Read data from file
         if name_ok is True:
+            start = time.time()
             self.data = _read_data_from_file(filepath)
+
+            # Expand delta posts using their schema
+            is_delta = delta.is_delta(self.data)
+            if is_delta is True:
+                (self.data, self._id_datapoints) = delta.expand(self.data)
+            timing.record('read', time.time() - start)
+            if is_delta is True and self.data is None:
+                log_message = (
+                    'File %s contains a delta post without a matching '
+                    'schema.') % (filepath)
+                log.log2warning(1153, log_message)
         else:
             # Log status
             log_message = (
@@ -611,10 +644,11 @@ class _CheckFile(object):
             log.log2warning(1026, log_message)
 
         # Check main keys in data.
-        contents = _CheckMainKeys(self.data)
-        if contents.valid() is True:
-            if name_ok is True:
-                self._valid = True
+        with timing.stage('validate_keys'):
+            contents = _CheckMainKeys(self.data)
+            if contents.valid() is True:
+                if name_ok is True:
+                    self._valid = True
 
     def _keys_in_filename(self):
         """Validate main keys contained in the file are in the filename.
@@ -699,6 +733,20 @@ class _CheckFile(object):
             log.log2warning(1001, log_message)
         return valid
 
+    def id_datapoints(self):
+        """Return the datapoint IDs of a delta post.
+
+        Args:
+            None
+
+        Returns:
+            self._id_datapoints: Dict of lists of datapoint IDs keyed by
+                data type and agent label
+
+        """
+        # Return
+        return self._id_datapoints
+
     def contents(self):
         """Return contents of file.
 
@@ -713,6 +761,38 @@ class _CheckFile(object):
         return self.data
 
 
+def valid_structure(data):
+    """Check an agent post without reading the database.
+
+    Uses the same checks as the ingester, except for the check for data
+    that is already in the database.
+
+    Args:
+        data: Agent post
+
+    Returns:
+        valid: True if valid
+
+    """
+    # Initialize key variables
+    valid = False
+
+    # Check the keys and data. Posts may have any structure
+    try:
+        if _CheckMainKeys(data).valid() is True:
+            if _CheckData(data).valid() is True:
+                # The ingester only reads files whose names it can parse
+                filename = ('%s_%s_0.json') % (
+                    data['timestamp'], data['id_agent'])
+                if _valid_filename(filename) is True:
+                    valid = general.validate_timestamp(data['timestamp'])
+    except (AttributeError, IndexError, KeyError, TypeError):
+        valid = False
+
+    # Return
+    return valid
+
+
 def _valid_filename(filepath):
     """Check if the filename in the filepath is valid.
 
@@ -727,8 +807,8 @@ def _valid_filename(filepath):
     valid = False
 
     # Filenames must start with a numeric timestamp and #
-    # end with a hex string. This will be tested later
-    regex = re.compile(r'^\d+_[0-9a-f]+_[0-9a-f]+.json')
+    # end with a hex string and format. This will be tested later
+    regex = payload.CACHE_FILENAME
 
     # Try reading file if filename format is OK
     filename = os.path.basename(filepath)
@@ -754,12 +834,11 @@ def _read_data_from_file(filepath):
 
     # Ingest data
     try:
-        with open(filepath, 'r') as f_handle:
-            data = json.load(f_handle)
+        data = payload.load(filepath)
     except:
         # Log status
         log_message = (
-            'File %s does not contain JSON data, does not exist, '
+            'File %s does not contain valid data, does not exist, '
             'or is unreadable.') % (filepath)
         log.log2warning(1006, log_message)
 
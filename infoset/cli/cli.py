@@ -173,6 +173,26 @@ class _Show(object):
         # Parse "show ingester status", return object used for parser
         _Status(subparsers, width=width)
 
+        # Parse "show ingester stats", return object used for parser
+        _Stats(subparsers, width=width)
+
+    def pool(self, width=80):
+        """Process 'show pool' CLI commands.
+
+        Args:
+            width: Width of the help text string to STDIO before wrapping
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.subcommand.add_parser(
+            'pool',
+            help=textwrap.fill(
+                'Show database connection pool statistics.', width=width)
+        )
+
     def configuration(self, width=80):
         """Process 'show configuration' CLI commands.
 
@@ -472,6 +492,19 @@ class _Logs(object):
         )
 
 
+class _Stats(object):
+    """Class processes CLI 'show ingester stats' option."""
+
+    def __init__(self, subparsers, width=80):
+        """Function for intializing the class."""
+        # Initialize key variables
+        subparsers.add_parser(
+            'stats',
+            help=textwrap.fill(
+                'Time taken by each stage of ingesting data', width=width)
+        )
+
+
 class _Status(object):
     """Class processes CLI 'show status' option."""
 
@@ -13,6 +13,8 @@ from pprint import pprint
 from infoset.utils import configuration
 from infoset.utils import input_output
 from infoset.utils import general
+from infoset.db import pool_metrics
+from infoset.cache import timing
 from infoset.agents.agent import Agent, AgentAPI, AgentDaemon
 from infoset.constants import (
     API_EXECUTABLE, API_GUNICORN_AGENT, INGESTER_EXECUTABLE)
@@ -39,6 +41,8 @@ def run(args):
         ingester(args)
     elif args.qualifier == 'configuration':
         _configuration()
+    elif args.qualifier == 'pool':
+        _pool()
 
     # Show help if there are no matches
     general.cli_help()
@@ -66,6 +70,40 @@ def _configuration():
     sys.exit(0)
 
 
+def _pool():
+    """Process 'show pool' commands.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    """
+    # Get statistics
+    config = configuration.Config()
+    data = pool_metrics.statistics(config.pool_statistics_directory())
+
+    # Print the statistics of each process
+    print('')
+    for item in data['processes']:
+        print(
+            '{:<20} PID {:<8} size {:<4} in use {:<4} overflow {:<4} '
+            'limit {:<4} checkouts {}'.format(
+                item['process'], item['pid'], item['size'],
+                item['checked_out'], item['overflow'], item['limit'],
+                item['checkouts']))
+
+    # Print the totals
+    print('\nTotals:')
+    pprint(data['totals'], indent=2)
+    print(
+        '\n# Compare "limit" with the MySQL max_connections setting\n')
+
+    # Done
+    sys.exit(0)
+
+
 def api(args):
     """Process 'show api' commands.
 
@@ -135,5 +173,59 @@ def ingester(args):
         # Done
         sys.exit(0)
 
+    elif args.subqualifier == 'stats':
+        # Get statistics
+        config = configuration.Config()
+        data = timing.read(config.ingest_statistics_directory())
+
+        # Print the statistics
+        if data['last_cycle'] is not None:
+            _stages('Most recent cycle', data['last_cycle'])
+        _stages(
+            'All {} cycles'.format(data['totals']['cycles']), data['totals'])
+        print('')
+
+        # Done
+        sys.exit(0)
+
     # Show help if there are no matches
     general.cli_help()
+
+
+def _stages(title, data):
+    """Print the timings of the ingest stages.
+
+    Args:
+        title: Title
+        data: Dict of statistics from the ingest statistics file
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    total = sum(item['seconds'] for item in data['stages'].values())
+
+    # Print the summary
+    print(
+        '\n{}: {} agents, {} files, {} datapoints in {:.3f} seconds\n'
+        ''.format(
+            title, data['agents'], data['files'], data['datapoints'],
+            data['duration']))
+    print(
+        '{:<20} {:>10} {:>12} {:>12} {:>12} {:>8}'.format(
+            'Stage', 'Count', 'Seconds', 'Average ms', 'Max ms', 'Share'))
+
+    # Print each stage
+    for stage in timing.STAGES:
+        item = data['stages'][stage]
+        average = 0
+        share = 0
+        if bool(item['count']) is True:
+            average = item['seconds'] / item['count']
+        if bool(total) is True:
+            share = item['seconds'] / total
+        print(
+            '{:<20} {:>10} {:>12.3f} {:>12.3f} {:>12.3f} {:>8.1%}'.format(
+                stage, item['count'], item['seconds'], average * 1000,
+                item['max'] * 1000, share))
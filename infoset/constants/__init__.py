@@ -1,5 +1,22 @@
+# PIP3 libraries
+from sqlalchemy.dialects.mysql import BIGINT, DOUBLE, INTEGER, NUMERIC
+
 SITE_PREFIX = '/infoset'
 API_PREFIX = '{}/api/v1'.format(SITE_PREFIX)
 API_EXECUTABLE = 'infoset-ng-api'
 API_GUNICORN_AGENT = 'infoset-ng-gunicorn'
 INGESTER_EXECUTABLE = 'infoset-ng-ingester'
+
+# Column types of the iset_data table for each storage layout. 'compact'
+# rows are less than half the size, and values are read without being
+# converted from Decimal
+DATA_STORAGES = {
+    'standard': {
+        'timestamp': BIGINT(unsigned=True),
+        'value': NUMERIC(40, 10)
+    },
+    'compact': {
+        'timestamp': INTEGER(unsigned=True),
+        'value': DOUBLE(asdecimal=False)
+    }
+}
@@ -17,14 +17,20 @@ from sqlalchemy import exc
 from infoset.utils import configuration
 from infoset.utils import log
 from infoset.db import db_orm
+from infoset.db import pool_metrics
+from infoset.utils import metrics
 
 #############################################################################
 # Setup a global pool for database connections
 #############################################################################
 POOL = None
 URL = None
+ENGINE = None
 TEST_ENGINE = None
 
+# Number of rows fetched per database round trip when streaming results
+YIELD_PER = 1000
+
 
 def main():
     """Process agent data.
@@ -40,6 +46,7 @@ def main():
     use_mysql = True
     global POOL
     global URL
+    global ENGINE
     global TEST_ENGINE
 
     # Get configuration
@@ -59,11 +66,20 @@ def main():
         db_engine = create_engine(
             URL, echo=False,
             encoding='utf8',
+            poolclass=pool_metrics.TimedQueuePool,
             max_overflow=max_overflow,
-            pool_size=pool_size, pool_recycle=600)
+            pool_size=pool_size,
+            pool_timeout=config.sqlalchemy_pool_timeout(),
+            pool_recycle=config.sqlalchemy_pool_recycle(),
+            pool_pre_ping=config.sqlalchemy_pool_pre_ping())
 
         # Fix for multiprocessing
         _add_engine_pidguard(db_engine)
+        pool_metrics.add_engine_metrics(
+            db_engine, config.pool_statistics_directory())
+        metrics.configure(config.metrics_directory())
+        metrics.add_engine_metrics(db_engine)
+        ENGINE = db_engine
 
         POOL = sessionmaker(
             autoflush=True,
@@ -83,6 +99,32 @@ def main():
         TEST_ENGINE = db_engine
 
 
+def reset_pool(close=False):
+    """Discard the pooled database connections.
+
+    Call this in a child process immediately after a fork so that it
+    doesn't share connections with its parent. The connections are then
+    left open for the parent. Call it with close=True in the parent before
+    forking to close the connections it no longer needs.
+
+    Args:
+        close: Close the connections if True
+
+    Returns:
+        None
+
+    """
+    # Nothing to do without a pool
+    if ENGINE is None:
+        return
+
+    # Discard connections
+    if close is True:
+        ENGINE.dispose()
+    else:
+        ENGINE.pool = ENGINE.pool.recreate()
+
+
 def _add_engine_pidguard(engine):
     """Add multiprocessing guards.
 
@@ -145,6 +187,7 @@ def _add_engine_pidguard(engine):
                 '') % (
                     connection_record.info['pid'], pid)
             log.log2debug(1079, log_message)
+            pool_metrics.record('pid_discards')
 
             connection_record.connection = connection_proxy.connection = None
             raise exc.DisconnectionError(
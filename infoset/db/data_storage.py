@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""Manage the storage layout of the iset_data table.
+
+The layout of the table is selected with the db_storage and
+db_compression configuration parameters when the database is setup.
+migrate() converts the table of an existing database to the configured
+layout by copying its rows to a new table in primary key order, then
+swapping the tables.
+
+"""
+
+# Standard libraries
+import time
+
+# PIP3 libraries
+from sqlalchemy import text
+
+# Infoset libraries
+from infoset.constants import DATA_STORAGES
+from infoset.utils import log
+
+# Number of rows copied in each transaction by migrate()
+BATCH_SIZE = 50000
+
+# Name of the table to which migrate() copies the rows of iset_data
+MIGRATION_TABLE = 'iset_data_migration'
+
+# Name given to the original iset_data table by migrate()
+PREVIOUS_TABLE = 'iset_data_previous'
+
+# Largest timestamp an INT UNSIGNED column can store
+MAX_COMPACT_TIMESTAMP = 4294967295
+
+
+def layout(connection, table='iset_data'):
+    """Get the storage layout of a table.
+
+    Args:
+        connection: SQLAlchemy connection
+        table: Name of the table
+
+    Returns:
+        result: Tuple of the storage layout and True if the table is
+            compressed. None if the table doesn't exist
+
+    """
+    # Get the type of the value column
+    data_type = connection.execute(text(
+        'SELECT DATA_TYPE FROM information_schema.COLUMNS '
+        'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table '
+        'AND COLUMN_NAME = \'value\''), table=table).scalar()
+    if data_type is None:
+        return None
+
+    # Get the row format
+    row_format = connection.execute(text(
+        'SELECT ROW_FORMAT FROM information_schema.TABLES '
+        'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table'),
+        table=table).scalar()
+
+    # Return
+    if data_type.lower() == 'double':
+        storage = 'compact'
+    else:
+        storage = 'standard'
+    result = (storage, str(row_format).lower() == 'compressed')
+    return result
+
+
+def create(connection, table, storage, compression):
+    """Create an empty copy of the iset_data table with a storage layout.
+
+    The copy has the indexes of iset_data, but not its foreign key.
+
+    Args:
+        connection: SQLAlchemy connection
+        table: Name of the table to create
+        storage: Storage layout
+        compression: Compress the table if True
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    dialect = connection.dialect
+    types = DATA_STORAGES[storage]
+    if compression is True:
+        options = 'ROW_FORMAT=COMPRESSED, KEY_BLOCK_SIZE=8'
+    else:
+        options = 'ROW_FORMAT=DEFAULT, KEY_BLOCK_SIZE=0'
+
+    # Create the table. Changing the columns of an empty table is instant
+    connection.execute(text('CREATE TABLE {} LIKE iset_data'.format(table)))
+    connection.execute(text(
+        'ALTER TABLE {} '
+        'MODIFY timestamp {} NOT NULL, '
+        'MODIFY value {} NULL DEFAULT NULL, {}'.format(
+            table, types['timestamp'].compile(dialect=dialect),
+            types['value'].compile(dialect=dialect), options)))
+
+
+def size(connection, table):
+    """Get the size of a table.
+
+    Args:
+        connection: SQLAlchemy connection
+        table: Name of the table
+
+    Returns:
+        result: Dict with these keys:
+            rows: Estimated number of rows
+            data_bytes: Size of the rows
+            index_bytes: Size of the secondary indexes
+
+    """
+    # Update the statistics of the table
+    connection.execute(text('ANALYZE TABLE {}'.format(table))).fetchall()
+
+    # Return
+    row = connection.execute(text(
+        'SELECT TABLE_ROWS, DATA_LENGTH, INDEX_LENGTH '
+        'FROM information_schema.TABLES '
+        'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table'),
+        table=table).fetchone()
+    result = {
+        'rows': int(row[0] or 0),
+        'data_bytes': int(row[1] or 0),
+        'index_bytes': int(row[2] or 0)
+    }
+    return result
+
+
+def copy(connection, source, destination, batch_size=BATCH_SIZE,
+         progress=None):
+    """Copy the rows of a table in primary key order.
+
+    Each batch continues from the last row copied, so every batch is a
+    range scan of the primary key of the source table.
+
+    Args:
+        connection: SQLAlchemy connection
+        source: Name of the table to copy
+        destination: Name of the table to copy to
+        batch_size: Number of rows copied in each transaction
+        progress: Function called with the number of rows copied after
+            each batch
+
+    Returns:
+        result: Number of rows copied
+
+    """
+    # Initialize key variables
+    result = 0
+    (idx_datapoint, timestamp) = (0, -1)
+    insert = text(
+        'INSERT INTO {} (idx_datapoint, timestamp, value) '
+        'SELECT idx_datapoint, timestamp, value FROM {} '
+        'WHERE idx_datapoint > :idx_datapoint OR '
+        '(idx_datapoint = :idx_datapoint AND timestamp > :timestamp) '
+        'ORDER BY idx_datapoint, timestamp LIMIT :limit'.format(
+            destination, source))
+    last = text(
+        'SELECT idx_datapoint, timestamp FROM {} '
+        'ORDER BY idx_datapoint DESC, timestamp DESC LIMIT 1'.format(
+            destination))
+
+    # Copy the rows
+    while True:
+        with connection.begin():
+            count = connection.execute(
+                insert, idx_datapoint=idx_datapoint, timestamp=timestamp,
+                limit=batch_size).rowcount
+        if bool(count) is False:
+            break
+        result += count
+        (idx_datapoint, timestamp) = connection.execute(last).fetchone()
+        if progress is not None:
+            progress(result)
+
+    # Return
+    return result
+
+
+def migrate(engine, storage, compression, batch_size=BATCH_SIZE, drop=False,
+            progress=None):
+    """Convert the iset_data table to a storage layout.
+
+    The ingester must be stopped, as rows added while the table is copied
+    would be lost. The API can keep running.
+
+    Args:
+        engine: SQLAlchemy engine
+        storage: Storage layout
+        compression: Compress the table if True
+        batch_size: Number of rows copied in each transaction
+        drop: Drop the original table after the migration if True. It is
+            kept as PREVIOUS_TABLE otherwise
+        progress: Function called with the number of rows copied after
+            each batch
+
+    Returns:
+        result: Number of rows copied. None if the table already has the
+            layout
+
+    """
+    # Initialize key variables
+    result = None
+    start = time.time()
+    if compression is True:
+        description = '{} compressed'.format(storage)
+    else:
+        description = storage
+
+    with engine.connect() as connection:
+        # Nothing to do if the table already has the layout
+        current = layout(connection)
+        if current is None:
+            log.log2die(1176, 'Table iset_data does not exist.')
+        if current == (storage, compression):
+            return result
+
+        # Don't overwrite the table kept by a previous migration
+        if layout(connection, table=PREVIOUS_TABLE) is not None:
+            log_message = (
+                'Table {0} exists. It was kept by a previous migration of '
+                'iset_data. Drop it with "DROP TABLE {0}" once you no longer '
+                'need it.'.format(PREVIOUS_TABLE))
+            log.log2die(1172, log_message)
+
+        # Make sure the timestamps fit the layout
+        maximum = connection.execute(text(
+            'SELECT MAX(timestamp) FROM iset_data')).scalar()
+        if storage == 'compact' and (maximum or 0) > MAX_COMPACT_TIMESTAMP:
+            log_message = (
+                'Timestamp {} in iset_data is too large for the compact '
+                'storage layout.'.format(maximum))
+            log.log2die(1173, log_message)
+
+        # Copy the rows. The rows are already checked against iset_datapoint
+        # so the foreign key is only added once they are copied
+        connection.execute(text(
+            'DROP TABLE IF EXISTS {}'.format(MIGRATION_TABLE)))
+        create(connection, MIGRATION_TABLE, storage, compression)
+        result = copy(
+            connection, 'iset_data', MIGRATION_TABLE, batch_size=batch_size,
+            progress=progress)
+        connection.execute(text(
+            'ALTER TABLE {} ADD FOREIGN KEY (idx_datapoint) '
+            'REFERENCES iset_datapoint (idx_datapoint)'.format(
+                MIGRATION_TABLE)))
+
+        # Make sure no rows were added while copying
+        count = connection.execute(text(
+            'SELECT COUNT(*) FROM iset_data')).scalar()
+        if count != result:
+            connection.execute(text('DROP TABLE {}'.format(MIGRATION_TABLE)))
+            log_message = (
+                'iset_data has {} rows, but {} were copied. Stop the '
+                'ingester before migrating iset_data.'.format(count, result))
+            log.log2die(1174, log_message)
+
+        # Swap the tables in a single step
+        connection.execute(text(
+            'RENAME TABLE iset_data TO {}, {} TO iset_data'.format(
+                PREVIOUS_TABLE, MIGRATION_TABLE)))
+        if drop is True:
+            connection.execute(text('DROP TABLE {}'.format(PREVIOUS_TABLE)))
+
+    # Log
+    log_message = (
+        'Migrated {} rows of iset_data to the {} storage layout in {} '
+        'seconds.'.format(
+            result, description, round(time.time() - start, 1)))
+    log.log2info(1175, log_message)
+
+    # Return
+    return result
@@ -6,8 +6,12 @@ from sqlalchemy import text
 
 # Infoset libraries
 from infoset.utils import log
+from infoset.utils import lru
 from infoset.db import POOL
 
+# Rows remembered by first(). Values expire after at most an hour
+_ROWS = lru.LocalCache(size=1048576, timeout=3600)
+
 
 class Database(object):
     """Class interacts with the connection.
@@ -181,6 +185,50 @@ class Database(object):
         self.close()
 
 
+def first(columns, *criteria, memoize=None):
+    """Get the first row matching the criteria using a single query.
+
+    Only the requested columns are read from the database.
+
+    Args:
+        columns: List of ORM columns to get. These can be from more than
+            one table if the criteria join them
+        criteria: SQLAlchemy filter expressions
+        memoize: Number of seconds this process remembers the row. Rows
+            are not remembered if None. Missing rows are never remembered
+
+    Returns:
+        result: Dict of column values keyed by column name. None if no
+            row matches
+
+    """
+    # Initialize key variables
+    result = None
+    database = Database()
+    session = database.session()
+    query = session.query(*columns).filter(*criteria)
+
+    # Use the remembered row if possible
+    if memoize is not None:
+        statement = query.statement.compile()
+        key = repr((str(statement), sorted(statement.params.items())))
+        result = _ROWS.get(key)
+        if result is not None:
+            database.close()
+            return result
+
+    # Get the row
+    row = query.first()
+    database.close()
+    if row is not None:
+        result = dict(zip([column.key for column in columns], row))
+        if memoize is not None:
+            _ROWS.set(key, result, timeout=memoize)
+
+    # Return
+    return result
+
+
 def connectivity():
     """Check connectivity to the database.
 
@@ -208,3 +256,36 @@ def connectivity():
 
     # Return
     return valid
+
+
+def paginate(query, column, after=None, limit=None):
+    """Apply keyset pagination to a query.
+
+    Rows are ordered by the column, which must be a primary key so that the
+    ordering is stable. Pages are requested by passing the last column value
+    of the previous page as the "after" argument.
+
+    Args:
+        query: SQLAlchemy query object
+        column: Primary key column to order by
+        after: Only return rows whose column value is greater than this
+        limit: Maximum number of rows to return
+
+    Returns:
+        result: SQLAlchemy query object
+
+    """
+    # Initialize key variables
+    result = query
+
+    # Skip rows returned in previous pages
+    if isinstance(after, int) is True:
+        result = result.filter(column > after)
+
+    # Order by the column and limit the number of rows
+    result = result.order_by(column)
+    if isinstance(limit, int) is True and limit >= 0:
+        result = result.limit(limit)
+
+    # Return
+    return result
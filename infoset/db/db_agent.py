@@ -6,8 +6,8 @@ from collections import defaultdict
 # Infoset libraries
 from infoset.utils import general
 from infoset.db import db
+from infoset.db import YIELD_PER
 from infoset.db.db_orm import Agent, AgentName
-from sqlalchemy import and_
 
 
 class GetIDXAgent(object):
@@ -47,34 +47,20 @@ class GetIDXAgent(object):
         # Only work if the value is an integer
         if isinstance(idx_agent, int) is True and idx_agent is not None:
             # Get the result
-            database = db.Database()
-            session = database.session()
-            result = session.query(Agent).filter(
-                Agent.idx_agent == idx_agent)
+            row = db.first(
+                [Agent.idx_agentname, Agent.id_agent, Agent.enabled,
+                 AgentName.name],
+                Agent.idx_agent == idx_agent,
+                Agent.idx_agentname == AgentName.idx_agentname)
 
             # Massage data
-            if result.count() == 1:
-                for instance in result:
-                    self.data_dict['idx_agent'] = idx_agent
-                    self.data_dict['idx_agentname'] = instance.idx_agentname
-                    self.data_dict[
-                        'id_agent'] = general.decode(instance.id_agent)
-                    self.data_dict['enabled'] = bool(instance.enabled)
-                    self.data_dict['exists'] = True
-                    break
-
-            # Return the session to the database pool after processing
-            database.close()
-
-            # Add the agent name to dict
-            if bool(self.data_dict['exists']) is True:
-                database = db.Database()
-                session = database.session()
-                result = session.query(AgentName.name).filter(
-                    and_(Agent.idx_agent == self.data_dict['idx_agent'],
-                         Agent.idx_agentname == AgentName.idx_agentname)).one()
-                self.data_dict['agent'] = general.decode(result.name)
-                database.close()
+            if row is not None:
+                self.data_dict['idx_agent'] = idx_agent
+                self.data_dict['idx_agentname'] = row['idx_agentname']
+                self.data_dict['id_agent'] = general.decode(row['id_agent'])
+                self.data_dict['enabled'] = bool(row['enabled'])
+                self.data_dict['agent'] = general.decode(row['name'])
+                self.data_dict['exists'] = True
 
     def exists(self):
         """Tell if row is exists.
@@ -213,33 +199,21 @@ class GetIDAgent(object):
         else:
             value = None
 
-        # Establish a database session
-        database = db.Database()
-        session = database.session()
-        result = session.query(Agent).filter(Agent.id_agent == value)
+        # Get the result
+        row = db.first(
+            [Agent.idx_agent, Agent.idx_agentname, Agent.enabled,
+             AgentName.name],
+            Agent.id_agent == value,
+            Agent.idx_agentname == AgentName.idx_agentname)
 
         # Massage data
-        if result.count() == 1:
-            for instance in result:
-                self.data_dict['id_agent'] = id_agent
-                self.data_dict['idx_agent'] = instance.idx_agent
-                self.data_dict['idx_agentname'] = instance.idx_agentname
-                self.data_dict['enabled'] = bool(instance.enabled)
-                self.data_dict['exists'] = True
-                break
-
-        # Return the session to the database pool after processing
-        database.close()
-
-        # Add the agent name to dict
-        if bool(self.data_dict['exists']) is True:
-            database = db.Database()
-            session = database.session()
-            result = session.query(AgentName.name).filter(
-                and_(Agent.idx_agent == self.data_dict['idx_agent'],
-                     Agent.idx_agentname == AgentName.idx_agentname)).one()
-            self.data_dict['agent'] = general.decode(result.name)
-            database.close()
+        if row is not None:
+            self.data_dict['id_agent'] = id_agent
+            self.data_dict['idx_agent'] = row['idx_agent']
+            self.data_dict['idx_agentname'] = row['idx_agentname']
+            self.data_dict['enabled'] = bool(row['enabled'])
+            self.data_dict['agent'] = general.decode(row['name'])
+            self.data_dict['exists'] = True
 
     def exists(self):
         """Tell if row is exists.
@@ -356,9 +330,8 @@ def id_agent_exists(id_agent):
     exists = False
 
     # Get information on agent from database
-    value = '{}'.format(id_agent)
-    data = GetIDAgent(value)
-    if data.exists() is True:
+    value = '{}'.format(id_agent).encode()
+    if db.first([Agent.idx_agent], Agent.id_agent == value) is not None:
         exists = True
 
     # Return
@@ -383,50 +356,69 @@ def idx_agent_exists(idx_agent):
         idx_agent = None
 
     # Get information on agent from database
-    data = GetIDXAgent(idx_agent)
-    if data.exists() is True:
-        exists = True
+    if idx_agent is not None:
+        row = db.first([Agent.idx_agent], Agent.idx_agent == idx_agent)
+        if row is not None:
+            exists = True
 
     # Return
     return exists
 
 
-def get_all_agents():
+def get_all_agents(after=None, limit=None):
     """Get data on all agents in the database.
 
     Args:
-        None
+        after: Only return agents with an idx_agent greater than this
+        limit: Maximum number of agents to return
 
     Returns:
         data: List of dicts of agent data.
 
     """
-    # Initialize important variables
-    data = []
+    # Return
+    data = list(get_all_agents_iterator(after=after, limit=limit))
+    return data
+
+
+def get_all_agents_iterator(after=None, limit=None):
+    """Iterate over data on all agents in the database.
 
+    Rows are fetched from the database in batches of YIELD_PER so that
+    memory usage stays bounded regardless of the number of agents.
+
+    Args:
+        after: Only return agents with an idx_agent greater than this
+        limit: Maximum number of agents to return
+
+    Returns:
+        None. Yields dicts of agent data ordered by idx_agent.
+
+    """
     # Establish a database session
     database = db.Database()
     session = database.session()
-    result = session.query(
+    query = session.query(
         Agent.id_agent, Agent.idx_agent, Agent.idx_agentname, Agent.enabled,
-        AgentName.name).filter(Agent.idx_agentname == AgentName.idx_agentname)
+        AgentName.name).filter(
+            Agent.idx_agentname == AgentName.idx_agentname)
+    result = db.paginate(
+        query, Agent.idx_agent, after=after, limit=limit).yield_per(
+            YIELD_PER)
 
     # Massage data
-    for instance in result:
-        # Get next record
-        data_dict = defaultdict(dict)
-        data_dict['id_agent'] = general.decode(instance.id_agent)
-        data_dict['idx_agent'] = instance.idx_agent
-        data_dict['idx_agentname'] = instance.idx_agentname
-        data_dict['enabled'] = bool(instance.enabled)
-        data_dict['agent'] = general.decode(instance.name)
-        data_dict['exists'] = True
-
-        # Append to list
-        data.append(data_dict)
-
-    # Return the session to the database pool after processing
-    database.close()
-
-    # Return
-    return data
+    try:
+        for instance in result:
+            # Get next record
+            data_dict = defaultdict(dict)
+            data_dict['id_agent'] = general.decode(instance.id_agent)
+            data_dict['idx_agent'] = instance.idx_agent
+            data_dict['idx_agentname'] = instance.idx_agentname
+            data_dict['enabled'] = bool(instance.enabled)
+            data_dict['agent'] = general.decode(instance.name)
+            data_dict['exists'] = True
+            yield data_dict
+
+    finally:
+        # Return the session to the database pool after processing
+        database.close()
@@ -47,22 +47,16 @@ class GetIDXAgentName(object):
         if (isinstance(idx_agentname, int) is True) and (
                 idx_agentname is not None):
             # Get the result
-            database = db.Database()
-            session = database.session()
-            result = session.query(AgentName).filter(
+            row = db.first(
+                [AgentName.name, AgentName.enabled],
                 AgentName.idx_agentname == idx_agentname)
 
             # Massage data
-            if result.count() == 1:
-                for instance in result:
-                    self.data_dict['idx_agentname'] = idx_agentname
-                    self.data_dict['name'] = general.decode(instance.name)
-                    self.data_dict['enabled'] = bool(instance.enabled)
-                    self.data_dict['exists'] = True
-                    break
-
-            # Return the session to the database pool after processing
-            database.close()
+            if row is not None:
+                self.data_dict['idx_agentname'] = idx_agentname
+                self.data_dict['name'] = general.decode(row['name'])
+                self.data_dict['enabled'] = bool(row['enabled'])
+                self.data_dict['exists'] = True
 
     def exists(self):
         """Tell if row is exists.
@@ -170,22 +164,17 @@ class GetAgentName(object):
         # Encode the Name
         value = '{}'.format(name).encode()
 
-        # Establish a database session
-        database = db.Database()
-        session = database.session()
-        result = session.query(AgentName).filter(AgentName.name == value)
+        # Get the result
+        row = db.first(
+            [AgentName.idx_agentname, AgentName.enabled],
+            AgentName.name == value)
 
         # Massage data
-        if result.count() == 1:
-            for instance in result:
-                self.data_dict['idx_agentname'] = instance.idx_agentname
-                self.data_dict['name'] = name
-                self.data_dict['enabled'] = bool(instance.enabled)
-                self.data_dict['exists'] = True
-                break
-
-        # Return the session to the database pool after processing
-        database.close()
+        if row is not None:
+            self.data_dict['idx_agentname'] = row['idx_agentname']
+            self.data_dict['name'] = name
+            self.data_dict['enabled'] = bool(row['enabled'])
+            self.data_dict['exists'] = True
 
     def exists(self):
         """Tell if row is exists.
@@ -40,24 +40,18 @@ class GetCodeBillcode(object):
             self.data_dict[key] = None
         self.data_dict['exists'] = False
 
-        # Establish a database session
-        database = db.Database()
-        session = database.session()
-        result = session.query(Billcode).filter(Billcode.code == value)
+        # Get the result
+        row = db.first(
+            [Billcode.idx_billcode, Billcode.name, Billcode.enabled],
+            Billcode.code == value)
 
         # Massage data
-        if result.count() == 1:
-            for instance in result:
-                self.data_dict['code'] = code
-                self.data_dict['enabled'] = bool(instance.enabled)
-                self.data_dict['idx_billcode'] = instance.idx_billcode
-                self.data_dict[
-                    'name'] = general.decode(instance.name)
-                self.data_dict['exists'] = True
-                break
-
-        # Return the session to the database pool after processing
-        database.close()
+        if row is not None:
+            self.data_dict['code'] = code
+            self.data_dict['enabled'] = bool(row['enabled'])
+            self.data_dict['idx_billcode'] = row['idx_billcode']
+            self.data_dict['name'] = general.decode(row['name'])
+            self.data_dict['exists'] = True
 
     def exists(self):
         """Tell if row is exists.
@@ -180,26 +174,19 @@ class GetIDXBillcode(object):
         if isinstance(idx_billcode, int) is False:
             idx_billcode = None
 
-        # Establish a database session
-        database = db.Database()
-        session = database.session()
-        result = session.query(
-            Billcode).filter(Billcode.idx_billcode == idx_billcode)
+        # Get the result
+        row = db.first(
+            [Billcode.idx_billcode, Billcode.code, Billcode.name,
+             Billcode.enabled],
+            Billcode.idx_billcode == idx_billcode)
 
         # Massage data
-        if result.count() == 1:
-            for instance in result:
-                self.data_dict['idx_billcode'] = instance.idx_billcode
-                self.data_dict['enabled'] = bool(instance.enabled)
-                self.data_dict[
-                    'code'] = general.decode(instance.code)
-                self.data_dict[
-                    'name'] = general.decode(instance.name)
-                self.data_dict['exists'] = True
-                break
-
-        # Return the session to the database pool after processing
-        database.close()
+        if row is not None:
+            self.data_dict['idx_billcode'] = row['idx_billcode']
+            self.data_dict['enabled'] = bool(row['enabled'])
+            self.data_dict['code'] = general.decode(row['code'])
+            self.data_dict['name'] = general.decode(row['name'])
+            self.data_dict['exists'] = True
 
     def exists(self):
         """Tell if row is exists.
@@ -40,26 +40,20 @@ class GetConfigurationKey(object):
             self.data_dict[key] = None
         self.data_dict['exists'] = False
 
-        # Establish a database session
-        database = db.Database()
-        session = database.session()
-        result = session.query(
-            Configuration).filter(Configuration.config_key == value)
+        # Get the result
+        row = db.first(
+            [Configuration.idx_configuration, Configuration.config_value,
+             Configuration.enabled],
+            Configuration.config_key == value)
 
         # Massage data
-        if result.count() == 1:
-            for instance in result:
-                self.data_dict[
-                    'idx_configuration'] = instance.idx_configuration
-                self.data_dict['config_key'] = config_key
-                self.data_dict[
-                    'config_value'] = general.decode(instance.config_value)
-                self.data_dict['enabled'] = bool(instance.enabled)
-                self.data_dict['exists'] = True
-                break
-
-        # Return the session to the database pool after processing
-        database.close()
+        if row is not None:
+            self.data_dict['idx_configuration'] = row['idx_configuration']
+            self.data_dict['config_key'] = config_key
+            self.data_dict[
+                'config_value'] = general.decode(row['config_value'])
+            self.data_dict['enabled'] = bool(row['enabled'])
+            self.data_dict['exists'] = True
 
     def exists(self):
         """Tell if row is exists.
@@ -164,27 +158,19 @@ class GetIDXConfiguration(object):
             self.data_dict[key] = None
         self.data_dict['exists'] = False
 
-        # Establish a database session
-        database = db.Database()
-        session = database.session()
-        result = session.query(
-            Configuration).filter(
-                Configuration.idx_configuration == idx_configuration)
+        # Get the result
+        row = db.first(
+            [Configuration.idx_configuration, Configuration.config_key,
+             Configuration.config_value],
+            Configuration.idx_configuration == idx_configuration)
 
         # Massage data
-        if result.count() == 1:
-            for instance in result:
-                self.data_dict[
-                    'idx_configuration'] = instance.idx_configuration
-                self.data_dict[
-                    'config_key'] = general.decode(instance.config_key)
-                self.data_dict[
-                    'config_value'] = general.decode(instance.config_value)
-                self.data_dict['exists'] = True
-                break
-
-        # Return the session to the database pool after processing
-        database.close()
+        if row is not None:
+            self.data_dict['idx_configuration'] = row['idx_configuration']
+            self.data_dict['config_key'] = general.decode(row['config_key'])
+            self.data_dict[
+                'config_value'] = general.decode(row['config_value'])
+            self.data_dict['exists'] = True
 
     def exists(self):
         """Tell if row is exists.
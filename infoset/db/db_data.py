@@ -6,10 +6,14 @@ from sqlalchemy import and_
 
 # Infoset libraries
 from infoset.utils import general
-from infoset.db import db_datapoint
 from infoset.db import db
+from infoset.db import YIELD_PER
 from infoset.db.db_orm import Data, Datapoint
 
+# Number of seconds the base_type and agent_label of datapoints are
+# remembered by GetIDXData
+DATAPOINT_MEMOIZE = 300
+
 
 class GetIDXData(object):
     """Class to return agent data.
@@ -41,10 +45,18 @@ class GetIDXData(object):
         self.data = defaultdict(dict)
         self.config = config
 
-        # Get the datapoint's base_type
-        datapointer = db_datapoint.GetIDXDatapoint(idx_datapoint)
-        self.base_type = datapointer.base_type()
-        self.agent_label = datapointer.agent_label()
+        # Get the datapoint's base_type. These values don't change, so
+        # they are remembered for repeated requests
+        self.base_type = None
+        self.agent_label = None
+        if isinstance(idx_datapoint, int) is True:
+            row = db.first(
+                [Datapoint.base_type, Datapoint.agent_label],
+                Datapoint.idx_datapoint == idx_datapoint,
+                memoize=DATAPOINT_MEMOIZE)
+            if row is not None:
+                self.base_type = row['base_type']
+                self.agent_label = general.decode(row['agent_label'])
 
         # Redefine start times
         if start is None:
@@ -175,10 +187,25 @@ def last_contacts(ts_start):
         data: List of dicts of last contact information
 
     """
-    # Initialize key variables
-    data = []
-    last_contact = defaultdict(lambda: defaultdict(dict))
+    # Return
+    data = list(last_contacts_iterator(ts_start))
+    return data
+
+
+def last_contacts_iterator(ts_start):
+    """Iterate over the last time each timeseries datapoint was updated.
 
+    Rows are read in primary key order and fetched from the database in
+    batches of YIELD_PER. Only the most recent row of the datapoint being
+    processed is kept in memory.
+
+    Args:
+        ts_start: Timestamp to start from
+
+    Returns:
+        None. Yields dicts of last contact information
+
+    """
     # Get start and stop times
     ts_stop = general.normalized_timestamp()
     if ts_start > ts_stop:
@@ -192,38 +219,59 @@ def last_contacts(ts_start):
     result = session.query(
         Data.value, Data.idx_datapoint, Data.timestamp).filter(
             and_(Data.timestamp >= ts_start, Data.timestamp <= ts_stop)
-        )
+        ).order_by(Data.idx_datapoint, Data.timestamp).yield_per(YIELD_PER)
 
     # Add to the list of device idx values
-    for instance in result:
-        idx_datapoint = instance.idx_datapoint
-        timestamp = instance.timestamp
-        value = float(instance.value)
+    try:
+        for data_dict in _most_recent(result):
+            yield data_dict
 
-        # Update dictionary
-        if idx_datapoint in last_contact:
-            if timestamp > last_contact[idx_datapoint]['timestamp']:
-                last_contact[idx_datapoint]['timestamp'] = timestamp
-                last_contact[idx_datapoint]['value'] = value
-            else:
-                continue
-        else:
-            last_contact[idx_datapoint]['timestamp'] = timestamp
-            last_contact[idx_datapoint]['value'] = value
+    finally:
+        # Return the session to the pool after processing
+        database.close()
 
-    # Return the session to the pool after processing
-    database.close()
 
-    # Convert dict to list of dicts
-    for idx_datapoint in last_contact:
-        data_dict = {}
-        data_dict['idx_datapoint'] = idx_datapoint
-        data_dict['timestamp'] = last_contact[idx_datapoint]['timestamp']
-        data_dict['value'] = last_contact[idx_datapoint]['value']
-        data.append(data_dict)
+def _most_recent(rows):
+    """Get the most recent value of each datapoint from ordered rows.
+
+    Args:
+        rows: Iterable of Data rows ordered by idx_datapoint and timestamp
+
+    Returns:
+        None. Yields dicts of last contact information
+
+    """
+    # Initialize key variables
+    previous = None
+
+    # A change in idx_datapoint means the previous row was the most recent
+    for instance in rows:
+        if previous is not None:
+            if instance.idx_datapoint != previous.idx_datapoint:
+                yield _contact(previous)
+        previous = instance
+
+    # Process the last datapoint
+    if previous is not None:
+        yield _contact(previous)
+
 
+def _contact(instance):
+    """Convert a Data row to a dict of last contact information.
+
+    Args:
+        instance: Data row
+
+    Returns:
+        data_dict: Dict of last contact information
+
+    """
     # Return
-    return data
+    data_dict = {}
+    data_dict['idx_datapoint'] = instance.idx_datapoint
+    data_dict['timestamp'] = instance.timestamp
+    data_dict['value'] = float(instance.value)
+    return data_dict
 
 
 def last_contacts_by_device(idx_deviceagent, ts_start):
@@ -12,6 +12,14 @@ from infoset.db import db
 from infoset.db import db_deviceagent
 from infoset.db.db_orm import Datapoint
 
+# Columns read by GetIDDatapoint and GetIDXDatapoint
+_COLUMNS = [
+    Datapoint.idx_datapoint, Datapoint.id_datapoint,
+    Datapoint.idx_deviceagent, Datapoint.idx_department,
+    Datapoint.idx_billcode, Datapoint.agent_label, Datapoint.agent_source,
+    Datapoint.enabled, Datapoint.billable, Datapoint.base_type,
+    Datapoint.timefixed_value, Datapoint.last_timestamp]
+
 
 class GetIDDatapoint(object):
     """Class to return datapoint data by datapoint idx_datapoint.
@@ -51,35 +59,25 @@ class GetIDDatapoint(object):
             self.data_dict[key] = None
         self.data_dict['exists'] = False
 
-        # Establish a database session
-        database = db.Database()
-        session = database.session()
-        result = session.query(
-            Datapoint).filter(Datapoint.id_datapoint == value)
+        # Get the result
+        row = db.first(_COLUMNS, Datapoint.id_datapoint == value)
 
         # Massage data
-        if result.count() == 1:
-            for instance in result:
-                self.data_dict['idx_datapoint'] = instance.idx_datapoint
-                self.data_dict['id_datapoint'] = id_datapoint
-                self.data_dict['idx_deviceagent'] = instance.idx_deviceagent
-                self.data_dict['idx_department'] = instance.idx_department
-                self.data_dict['idx_billcode'] = instance.idx_billcode
-                self.data_dict[
-                    'agent_label'] = general.decode(instance.agent_label)
-                self.data_dict[
-                    'agent_source'] = general.decode(instance.agent_source)
-                self.data_dict['enabled'] = bool(instance.enabled)
-                self.data_dict['billable'] = bool(instance.billable)
-                self.data_dict[
-                    'base_type'] = general.decode(instance.base_type)
-                self.data_dict['timefixed_value'] = instance.timefixed_value
-                self.data_dict['last_timestamp'] = instance.last_timestamp
-                self.data_dict['exists'] = True
-                break
-
-        # Return the session to the database pool after processing
-        database.close()
+        if row is not None:
+            self.data_dict['idx_datapoint'] = row['idx_datapoint']
+            self.data_dict['id_datapoint'] = id_datapoint
+            self.data_dict['idx_deviceagent'] = row['idx_deviceagent']
+            self.data_dict['idx_department'] = row['idx_department']
+            self.data_dict['idx_billcode'] = row['idx_billcode']
+            self.data_dict['agent_label'] = general.decode(row['agent_label'])
+            self.data_dict[
+                'agent_source'] = general.decode(row['agent_source'])
+            self.data_dict['enabled'] = bool(row['enabled'])
+            self.data_dict['billable'] = bool(row['billable'])
+            self.data_dict['base_type'] = general.decode(row['base_type'])
+            self.data_dict['timefixed_value'] = row['timefixed_value']
+            self.data_dict['last_timestamp'] = row['last_timestamp']
+            self.data_dict['exists'] = True
 
     def exists(self):
         """Tell if row is exists.
@@ -315,40 +313,27 @@ class GetIDXDatapoint(object):
         # Only work if the value is an integer
         if (isinstance(idx_datapoint, int) is True) and (
                 idx_datapoint is not None):
-            # Establish a database session
-            database = db.Database()
-            session = database.session()
-            result = session.query(
-                Datapoint).filter(Datapoint.idx_datapoint == idx_datapoint)
+            # Get the result
+            row = db.first(_COLUMNS, Datapoint.idx_datapoint == idx_datapoint)
 
             # Massage data
-            if result.count() == 1:
-                for instance in result:
-                    self.data_dict['idx_datapoint'] = instance.idx_datapoint
-                    self.data_dict[
-                        'id_datapoint'] = general.decode(
-                            instance.id_datapoint)
-                    self.data_dict[
-                        'idx_deviceagent'] = instance.idx_deviceagent
-                    self.data_dict['idx_department'] = instance.idx_department
-                    self.data_dict['idx_billcode'] = instance.idx_billcode
-                    self.data_dict[
-                        'agent_label'] = general.decode(
-                            instance.agent_label)
-                    self.data_dict[
-                        'agent_source'] = general.decode(
-                            instance.agent_source)
-                    self.data_dict['enabled'] = bool(instance.enabled)
-                    self.data_dict['billable'] = bool(instance.billable)
-                    self.data_dict['base_type'] = instance.base_type
-                    self.data_dict[
-                        'timefixed_value'] = instance.timefixed_value
-                    self.data_dict['last_timestamp'] = instance.last_timestamp
-                    self.data_dict['exists'] = True
-                    break
-
-            # Return the session to the database pool after processing
-            database.close()
+            if row is not None:
+                self.data_dict['idx_datapoint'] = row['idx_datapoint']
+                self.data_dict[
+                    'id_datapoint'] = general.decode(row['id_datapoint'])
+                self.data_dict['idx_deviceagent'] = row['idx_deviceagent']
+                self.data_dict['idx_department'] = row['idx_department']
+                self.data_dict['idx_billcode'] = row['idx_billcode']
+                self.data_dict[
+                    'agent_label'] = general.decode(row['agent_label'])
+                self.data_dict[
+                    'agent_source'] = general.decode(row['agent_source'])
+                self.data_dict['enabled'] = bool(row['enabled'])
+                self.data_dict['billable'] = bool(row['billable'])
+                self.data_dict['base_type'] = row['base_type']
+                self.data_dict['timefixed_value'] = row['timefixed_value']
+                self.data_dict['last_timestamp'] = row['last_timestamp']
+                self.data_dict['exists'] = True
 
     def exists(self):
         """Tell if row is exists.
@@ -561,9 +546,12 @@ def id_datapoint_exists(id_datapoint):
     exists = False
 
     # Get information on agent from database
-    data = GetIDDatapoint(id_datapoint)
-    if data.exists() is True:
-        exists = True
+    if isinstance(id_datapoint, str) is True:
+        row = db.first(
+            [Datapoint.idx_datapoint],
+            Datapoint.id_datapoint == id_datapoint.encode())
+        if row is not None:
+            exists = True
 
     # Return
     return exists
@@ -583,20 +571,25 @@ def idx_datapoint_exists(idx_datapoint):
     exists = False
 
     # Get information on agent from database
-    data = GetIDXDatapoint(idx_datapoint)
-    if data.exists() is True:
-        exists = True
+    if isinstance(idx_datapoint, int) is True:
+        row = db.first(
+            [Datapoint.idx_datapoint],
+            Datapoint.idx_datapoint == idx_datapoint)
+        if row is not None:
+            exists = True
 
     # Return
     return exists
 
 
-def listing(idx_deviceagent, base_type=None):
+def listing(idx_deviceagent, base_type=None, after=None, limit=None):
     """List of datapoint data for a specific idx_device, idx_agent combination.
 
     Args:
         idx_deviceagent: DeviceAgent index
         base_type: base_type to filter by
+        after: Only return datapoints with an idx_datapoint greater than this
+        limit: Maximum number of datapoints to return
 
     Returns:
         dict_list: List of dicts containing data
@@ -620,6 +613,8 @@ def listing(idx_deviceagent, base_type=None):
                     Datapoint.base_type == base_type,
                     Datapoint.idx_deviceagent == idx_deviceagent)
                 )
+        result = db.paginate(
+            result, Datapoint.idx_datapoint, after=after, limit=limit)
 
         # Add to the list of device idx_datapoint values
         for instance in result:
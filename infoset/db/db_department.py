@@ -41,25 +41,19 @@ class GetCodeDepartment(object):
             self.data_dict[key] = None
         self.data_dict['exists'] = False
 
-        # Establish a database session
-        database = db.Database()
-        session = database.session()
-        result = session.query(Department).filter(Department.code == value)
+        # Get the result
+        row = db.first(
+            [Department.idx_department, Department.code, Department.name,
+             Department.enabled],
+            Department.code == value)
 
         # Massage data
-        if result.count() == 1:
-            for instance in result:
-                self.data_dict['idx_department'] = instance.idx_department
-                self.data_dict[
-                    'code'] = general.decode(instance.code)
-                self.data_dict[
-                    'name'] = general.decode(instance.name)
-                self.data_dict['enabled'] = bool(instance.enabled)
-                self.data_dict['exists'] = True
-                break
-
-        # Return the session to the database pool after processing
-        database.close()
+        if row is not None:
+            self.data_dict['idx_department'] = row['idx_department']
+            self.data_dict['code'] = general.decode(row['code'])
+            self.data_dict['name'] = general.decode(row['name'])
+            self.data_dict['enabled'] = bool(row['enabled'])
+            self.data_dict['exists'] = True
 
     def exists(self):
         """Tell if row is exists.
@@ -178,26 +172,19 @@ class GetIDXDepartment(object):
             self.data_dict[key] = None
         self.data_dict['exists'] = False
 
-        # Establish a database session
-        database = db.Database()
-        session = database.session()
-        result = session.query(
-            Department).filter(Department.idx_department == idx_department)
+        # Get the result
+        row = db.first(
+            [Department.idx_department, Department.code, Department.name,
+             Department.enabled],
+            Department.idx_department == idx_department)
 
         # Massage data
-        if result.count() == 1:
-            for instance in result:
-                self.data_dict['idx_department'] = instance.idx_department
-                self.data_dict[
-                    'code'] = general.decode(instance.code)
-                self.data_dict[
-                    'name'] = general.decode(instance.name)
-                self.data_dict['enabled'] = bool(instance.enabled)
-                self.data_dict['exists'] = True
-                break
-
-        # Return the session to the database pool after processing
-        database.close()
+        if row is not None:
+            self.data_dict['idx_department'] = row['idx_department']
+            self.data_dict['code'] = general.decode(row['code'])
+            self.data_dict['name'] = general.decode(row['name'])
+            self.data_dict['enabled'] = bool(row['enabled'])
+            self.data_dict['exists'] = True
 
     def exists(self):
         """Tell if row is exists.
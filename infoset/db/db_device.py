@@ -46,25 +46,18 @@ class GetDevice(object):
         else:
             value = None
 
-        # Establish a database session
-        database = db.Database()
-        session = database.session()
-        result = session.query(Device).filter(Device.devicename == value)
+        # Get the result
+        row = db.first(
+            [Device.idx_device, Device.description, Device.enabled],
+            Device.devicename == value)
 
         # Massage data
-        if result.count() == 1:
-            for instance in result:
-                self.data_dict['idx_device'] = instance.idx_device
-                self.data_dict[
-                    'devicename'] = devicename
-                self.data_dict[
-                    'description'] = general.decode(instance.description)
-                self.data_dict['enabled'] = bool(instance.enabled)
-                self.data_dict['exists'] = True
-                break
-
-        # Return the session to the database pool after processing
-        database.close()
+        if row is not None:
+            self.data_dict['idx_device'] = row['idx_device']
+            self.data_dict['devicename'] = devicename
+            self.data_dict['description'] = general.decode(row['description'])
+            self.data_dict['enabled'] = bool(row['enabled'])
+            self.data_dict['exists'] = True
 
     def exists(self):
         """Tell if row is found.
@@ -184,26 +177,20 @@ class GetIDXDevice(object):
 
         # Only work if the value is an integer
         if isinstance(idx_device, int) is True and idx_device is not None:
-            # Establish a database session
-            database = db.Database()
-            session = database.session()
-            result = session.query(
-                Device).filter(Device.idx_device == idx_device)
+            # Get the result
+            row = db.first(
+                [Device.devicename, Device.description, Device.enabled],
+                Device.idx_device == idx_device)
 
             # Massage data
-            if result.count() == 1:
-                for instance in result:
-                    self.data_dict['idx_device'] = instance.idx_device
-                    self.data_dict['devicename'] = general.decode(
-                        instance.devicename)
-                    self.data_dict['description'] = general.decode(
-                        instance.description)
-                    self.data_dict['enabled'] = bool(instance.enabled)
-                    self.data_dict['exists'] = True
-                    break
-
-            # Return the session to the database pool after processing
-            database.close()
+            if row is not None:
+                self.data_dict['idx_device'] = idx_device
+                self.data_dict['devicename'] = general.decode(
+                    row['devicename'])
+                self.data_dict['description'] = general.decode(
+                    row['description'])
+                self.data_dict['enabled'] = bool(row['enabled'])
+                self.data_dict['exists'] = True
 
     def exists(self):
         """Tell if row is found.
@@ -290,41 +277,39 @@ class GetIDXDevice(object):
         return value
 
 
-def all_devices(enabled=True):
+def all_devices(enabled=True, after=None, limit=None):
     """Get list of all devices.
 
     Args:
         enabled: Only return enabled devices if true
+        after: Only return devices with an idx_device greater than this
+        limit: Maximum number of devices to return
 
     Returns:
-        devicelist: List of dicts of device data
+        devicelist: List of dicts of device data ordered by idx_device
 
     """
     devicelist = []
-    idx_device_list = []
 
     # Establish a database session
     database = db.Database()
     session = database.session()
     if enabled is True:
-        result = session.query(Device.idx_device).filter(Device.enabled == 1)
+        query = session.query(Device).filter(Device.enabled == 1)
     else:
-        result = session.query(Device.idx_device)
+        query = session.query(Device)
+    result = db.paginate(
+        query, Device.idx_device, after=after, limit=limit)
 
-    # Add to the list of device idx_device values
+    # Get device information from a single query
     for instance in result:
-        idx_device_list.append(instance.idx_device)
-
-    # Get device information
-    if bool(idx_device_list) is True:
-        for idx_device in idx_device_list:
-            data_dict = {}
-            device = GetIDXDevice(idx_device)
-            data_dict['devicename'] = device.devicename()
-            data_dict['description'] = device.description()
-            data_dict['enabled'] = device.enabled()
-            data_dict['exists'] = True
-            devicelist.append(data_dict)
+        data_dict = {}
+        data_dict['idx_device'] = instance.idx_device
+        data_dict['devicename'] = general.decode(instance.devicename)
+        data_dict['description'] = general.decode(instance.description)
+        data_dict['enabled'] = bool(instance.enabled)
+        data_dict['exists'] = True
+        devicelist.append(data_dict)
 
     # Return the session to the database pool after processing
     database.close()
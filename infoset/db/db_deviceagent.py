@@ -3,11 +3,9 @@
 # Python standard libraries
 from collections import defaultdict
 
-# Python libraries
-from sqlalchemy import and_
-
 # Infoset libraries
 from infoset.db import db
+from infoset.db import YIELD_PER
 from infoset.db.db_orm import DeviceAgent
 
 
@@ -51,24 +49,19 @@ class GetIDXDeviceAgent(object):
         if isinstance(idx_deviceagent, int) is True and (
                 idx_deviceagent is not None):
             # Get the result
-            database = db.Database()
-            session = database.session()
-            result = session.query(DeviceAgent).filter(
+            row = db.first(
+                [DeviceAgent.idx_agent, DeviceAgent.idx_device,
+                 DeviceAgent.last_timestamp, DeviceAgent.enabled],
                 DeviceAgent.idx_deviceagent == idx_deviceagent)
 
             # Massage data
-            if result.count() == 1:
-                for instance in result:
-                    self.data_dict['idx_deviceagent'] = idx_deviceagent
-                    self.data_dict['idx_agent'] = instance.idx_agent
-                    self.data_dict['last_timestamp'] = instance.last_timestamp
-                    self.data_dict['enabled'] = bool(instance.enabled)
-                    self.data_dict['idx_device'] = instance.idx_device
-                    self.data_dict['exists'] = True
-                    break
-
-            # Return the session to the database pool after processing
-            database.close()
+            if row is not None:
+                self.data_dict['idx_deviceagent'] = idx_deviceagent
+                self.data_dict['idx_agent'] = row['idx_agent']
+                self.data_dict['last_timestamp'] = row['last_timestamp']
+                self.data_dict['enabled'] = bool(row['enabled'])
+                self.data_dict['idx_device'] = row['idx_device']
+                self.data_dict['exists'] = True
 
     def exists(self):
         """Tell if row is exists.
@@ -210,26 +203,21 @@ class GetDeviceAgent(object):
         if isinstance(idx_agent, int) is False:
             idx_agent = None
 
-        # Establish a database session
-        database = db.Database()
-        session = database.session()
-        result = session.query(DeviceAgent).filter(and_(
+        # Get the result
+        row = db.first(
+            [DeviceAgent.idx_deviceagent, DeviceAgent.last_timestamp,
+             DeviceAgent.enabled],
             DeviceAgent.idx_device == idx_device,
-            DeviceAgent.idx_agent == idx_agent))
+            DeviceAgent.idx_agent == idx_agent)
 
         # Massage data
-        if result.count() == 1:
-            for instance in result:
-                self.data_dict['last_timestamp'] = instance.last_timestamp
-                self.data_dict['idx_deviceagent'] = instance.idx_deviceagent
-                self.data_dict['idx_device'] = instance.idx_device
-                self.data_dict['idx_agent'] = instance.idx_agent
-                self.data_dict['enabled'] = bool(instance.enabled)
-                self.data_dict['exists'] = True
-                break
-
-        # Return the session to the database pool after processing
-        database.close()
+        if row is not None:
+            self.data_dict['last_timestamp'] = row['last_timestamp']
+            self.data_dict['idx_deviceagent'] = row['idx_deviceagent']
+            self.data_dict['idx_device'] = idx_device
+            self.data_dict['idx_agent'] = idx_agent
+            self.data_dict['enabled'] = bool(row['enabled'])
+            self.data_dict['exists'] = True
 
     def exists(self):
         """Tell if row is exists.
@@ -453,36 +441,55 @@ def agent_indices(idx_device):
     return idx_list
 
 
-def get_all_device_agents():
+def get_all_device_agents(after=None, limit=None):
     """Get list of all DeviceAgent indexes.
 
     Args:
-        None
+        after: Only return rows with an idx_deviceagent greater than this
+        limit: Maximum number of rows to return
 
     Returns:
         listing: List of indexes
 
     """
-    data = []
+    # Return
+    data = list(get_all_device_agents_iterator(after=after, limit=limit))
+    return data
+
+
+def get_all_device_agents_iterator(after=None, limit=None):
+    """Iterate over all DeviceAgent rows.
+
+    Rows are fetched from the database in batches of YIELD_PER so that
+    memory usage stays bounded regardless of the number of rows.
+
+    Args:
+        after: Only return rows with an idx_deviceagent greater than this
+        limit: Maximum number of rows to return
+
+    Returns:
+        None. Yields dicts of DeviceAgent data ordered by idx_deviceagent.
 
+    """
     # Establish a database session
     database = db.Database()
     session = database.session()
-    result = session.query(DeviceAgent)
+    result = db.paginate(
+        session.query(DeviceAgent), DeviceAgent.idx_deviceagent,
+        after=after, limit=limit).yield_per(YIELD_PER)
 
     # Add to the list of device idx values
-    for instance in result:
-        data_dict = {}
-        data_dict['idx_deviceagent'] = instance.idx_deviceagent
-        data_dict['idx_agent'] = instance.idx_agent
-        data_dict['idx_device'] = instance.idx_device
-        data_dict['last_timestamp'] = instance.last_timestamp
-        data_dict['enabled'] = bool(instance.enabled)
-        data_dict['exists'] = True
-        data.append(data_dict)
-
-    # Return the session to the pool after processing
-    database.close()
-
-    # Return
-    return data
+    try:
+        for instance in result:
+            data_dict = {}
+            data_dict['idx_deviceagent'] = instance.idx_deviceagent
+            data_dict['idx_agent'] = instance.idx_agent
+            data_dict['idx_device'] = instance.idx_device
+            data_dict['last_timestamp'] = instance.last_timestamp
+            data_dict['enabled'] = bool(instance.enabled)
+            data_dict['exists'] = True
+            yield data_dict
+
+    finally:
+        # Return the session to the pool after processing
+        database.close()
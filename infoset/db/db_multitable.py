@@ -5,7 +5,10 @@ Handles queries that span multiple tables.
 """
 
 # Python standard libraries
-import copy
+import os
+import time
+import pickle
+import tempfile
 from collections import defaultdict
 
 # PIP libraries
@@ -13,22 +16,35 @@ from sqlalchemy import and_
 
 # Infoset libraries
 from infoset.utils import general
+from infoset.utils import log
 from infoset.db import db
+from infoset.db import YIELD_PER
 from infoset.db.db_orm import Datapoint, Device, Agent, DeviceAgent, AgentName
 
+# Name of the datapoint summary snapshot file
+SNAPSHOT_FILENAME = 'datapoint_summary.pickle'
 
-def datapoint_summary_list():
+# Number of seconds after which the snapshot is rebuilt from scratch
+SNAPSHOT_REBUILD_INTERVAL = 3600
+
+# Snapshot loaded by datapoint_summary_snapshot and its file version
+_SNAPSHOT = {'version': None, 'data': None}
+
+
+def datapoint_summary_list(after=None, limit=None):
     """Get summary datapoint information as a list of dicts.
 
     Args:
-        None
+        after: Only return datapoints with an idx_datapoint greater than this
+        limit: Maximum number of datapoints to return
 
     Returns:
         return_value: List of dicts. Each dict keyed by table column name
 
     """
     # Return
-    return_value = _datapoint_summary(aslist=True)
+    return_value = list(
+        datapoint_summary_list_iterator(after=after, limit=limit))
     return return_value
 
 
@@ -48,27 +64,27 @@ def datapoint_summary():
     return return_value
 
 
-def _datapoint_summary(aslist=False):
-    """Get summary datapoint information.
+def datapoint_summary_list_iterator(after=None, limit=None):
+    """Iterate over summary datapoint information.
+
+    Rows are fetched from the database in batches of YIELD_PER so that
+    memory usage stays bounded regardless of the number of datapoints.
 
     Args:
-        None
+        after: Only return datapoints with an idx_datapoint greater than this
+        limit: Maximum number of datapoints to return
 
     Returns:
-        return_value: Dict keyed by idx_datapoint OR list of dicts
+        None. Yields dicts keyed by table column name ordered by
+            idx_datapoint
 
     """
-    # Initialize key variables
-    data = defaultdict(lambda: defaultdict(dict))
-    data_list = []
-    return_value = None
-
     # Establish a database session
     database = db.Database()
     session = database.session()
 
     # Get result of query
-    rows = session.query(
+    query = session.query(
         Datapoint.idx_datapoint,
         Datapoint.agent_label,
         Datapoint.agent_source,
@@ -82,33 +98,205 @@ def _datapoint_summary(aslist=False):
                 Agent.idx_agentname == AgentName.idx_agentname,
                 Device.idx_device == DeviceAgent.idx_device)
             )
+    rows = db.paginate(
+        query, Datapoint.idx_datapoint, after=after, limit=limit).yield_per(
+            YIELD_PER)
 
     # Process query results
-    for row in rows:
-        idx_datapoint = row.idx_datapoint
-        data_dict = {}
-        data_dict['agent'] = general.decode(row.name)
-        data_dict['agent_label'] = general.decode(row.agent_label)
-        data_dict['agent_source'] = general.decode(row.agent_source)
-        data_dict['id_agent'] = general.decode(row.id_agent)
-        data_dict['devicename'] = general.decode(row.devicename)
-        data_dict['idx_deviceagent'] = row.idx_deviceagent
+    try:
+        for row in rows:
+            data_dict = {}
+            data_dict['agent'] = general.decode(row.name)
+            data_dict['agent_label'] = general.decode(row.agent_label)
+            data_dict['agent_source'] = general.decode(row.agent_source)
+            data_dict['id_agent'] = general.decode(row.id_agent)
+            data_dict['devicename'] = general.decode(row.devicename)
+            data_dict['idx_deviceagent'] = row.idx_deviceagent
+            data_dict['idx_datapoint'] = row.idx_datapoint
+            yield data_dict
+
+    finally:
+        # Return the session to the database pool after processing
+        database.close()
+
+
+def _datapoint_summary(aslist=False):
+    """Get summary datapoint information.
+
+    Args:
+        None
+
+    Returns:
+        return_value: Dict keyed by idx_datapoint OR list of dicts
 
+    """
+    # Initialize key variables
+    data = defaultdict(lambda: defaultdict(dict))
+    data_list = []
+
+    # Process query results. The dicts are created afresh for each row
+    # so there is no need to copy them before returning.
+    for data_dict in datapoint_summary_list_iterator():
         # Assign values to data structures dependent on 'aslist' value
         if aslist is True:
-            data_dict['idx_datapoint'] = idx_datapoint
             data_list.append(data_dict)
         else:
+            idx_datapoint = data_dict.pop('idx_datapoint')
             data[idx_datapoint] = data_dict
 
-    # Return the session to the database pool after processing
-    database.close()
-
     # Assign values to data structures dependent on 'aslist' value
     if aslist is True:
-        return_value = copy.deepcopy(data_list)
+        return_value = data_list
     else:
-        return_value = copy.deepcopy(data)
+        return_value = data
 
     # Return
     return return_value
+
+
+def update_datapoint_summary_snapshot(config):
+    """Update the datapoint summary snapshot file used by the API.
+
+    The summary of a datapoint never changes after it is created, so only
+    datapoints added since the last update are read from the database. The
+    snapshot is rebuilt from scratch every SNAPSHOT_REBUILD_INTERVAL
+    seconds.
+
+    Args:
+        config: Config object
+
+    Returns:
+        result: Number of datapoints added to the snapshot
+
+    """
+    # Initialize key variables
+    result = 0
+    filepath = _snapshot_filepath(config)
+    snapshot = _read_snapshot(filepath)
+
+    # Rebuild old snapshots
+    if snapshot is not None:
+        age = time.time() - snapshot['created']
+        if age > SNAPSHOT_REBUILD_INTERVAL:
+            snapshot = None
+    if snapshot is None:
+        snapshot = {'created': time.time(), 'after': None, 'data': {}}
+
+    # Add new datapoints
+    for data_dict in datapoint_summary_list_iterator(
+            after=snapshot['after']):
+        idx_datapoint = data_dict.pop('idx_datapoint')
+        snapshot['data'][idx_datapoint] = data_dict
+        snapshot['after'] = idx_datapoint
+        result += 1
+
+    # Write the file only if it has changed
+    if bool(result) is True or os.path.isfile(filepath) is False:
+        _write_snapshot(filepath, snapshot)
+
+    # Return
+    return result
+
+
+def datapoint_summary_snapshot(config):
+    """Get summary datapoint information from the snapshot file.
+
+    The file is only read again when it is updated by the ingester. The
+    database is queried if there is no snapshot. The result is shared by
+    all callers and must not be modified.
+
+    Args:
+        config: Config object
+
+    Returns:
+        return_value: Dict keyed by idx_datapoint.
+            Subkeys are by table column name
+
+    """
+    # Initialize key variables
+    filepath = _snapshot_filepath(config)
+
+    # Get the version of the file
+    try:
+        version = os.stat(filepath).st_mtime_ns
+    except OSError:
+        return datapoint_summary()
+
+    # Read the file only if it has changed
+    if version != _SNAPSHOT['version']:
+        snapshot = _read_snapshot(filepath)
+        if snapshot is None:
+            return datapoint_summary()
+        _SNAPSHOT['data'] = snapshot['data']
+        _SNAPSHOT['version'] = version
+
+    # Return
+    return_value = _SNAPSHOT['data']
+    return return_value
+
+
+def _snapshot_filepath(config):
+    """Get the path of the datapoint summary snapshot file.
+
+    Args:
+        config: Config object
+
+    Returns:
+        result: Filepath
+
+    """
+    # Return
+    result = os.path.join(
+        config.ingest_snapshot_directory(), SNAPSHOT_FILENAME)
+    return result
+
+
+def _read_snapshot(filepath):
+    """Read a datapoint summary snapshot file.
+
+    Args:
+        filepath: Filepath
+
+    Returns:
+        result: Snapshot dict or None if it can't be read
+
+    """
+    # Initialize key variables
+    result = None
+
+    # Read the file
+    if os.path.isfile(filepath) is True:
+        try:
+            with open(filepath, 'rb') as f_handle:
+                result = pickle.load(f_handle)
+        except Exception as exception_error:
+            log_message = (
+                'Cannot read snapshot file {}. Error: {}'
+                ''.format(filepath, exception_error))
+            log.log2warning(1146, log_message)
+
+    # Return
+    return result
+
+
+def _write_snapshot(filepath, snapshot):
+    """Replace a datapoint summary snapshot file.
+
+    The file is written to a temporary file first so that readers never see
+    a partially written snapshot.
+
+    Args:
+        filepath: Filepath
+        snapshot: Snapshot dict
+
+    Returns:
+        None
+
+    """
+    # Write the file
+    (handle, temporary) = tempfile.mkstemp(
+        dir=os.path.dirname(filepath), suffix='.tmp')
+    with os.fdopen(handle, 'wb') as f_handle:
+        pickle.dump(snapshot, f_handle, pickle.HIGHEST_PROTOCOL)
+    os.chmod(temporary, 0o644)
+    os.replace(temporary, filepath)
@@ -6,15 +6,33 @@ Manages connection pooling among other things.
 """
 
 # SQLobject stuff
-from sqlalchemy import UniqueConstraint, PrimaryKeyConstraint, text
+from sqlalchemy import UniqueConstraint, PrimaryKeyConstraint, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.dialects.mysql import BIGINT, DATETIME, INTEGER
-from sqlalchemy.dialects.mysql import NUMERIC, VARBINARY
+from sqlalchemy.dialects.mysql import VARBINARY
 from sqlalchemy import Column
 from sqlalchemy import ForeignKey
 
+# Infoset libraries
+from infoset.constants import DATA_STORAGES
+from infoset.utils import configuration
+
 BASE = declarative_base()
 
+# Table options of the iset_data table when its pages are compressed
+DATA_COMPRESSION = {
+    'mysql_row_format': 'COMPRESSED',
+    'mysql_key_block_size': '8'
+}
+
+# Storage layout of the iset_data table, selected when the database is setup
+_CONFIG = configuration.Config()
+_DATA_STORAGE = DATA_STORAGES[_CONFIG.db_storage()]
+if _CONFIG.db_compression() is True:
+    _DATA_OPTIONS = dict(DATA_COMPRESSION, mysql_engine='InnoDB')
+else:
+    _DATA_OPTIONS = {'mysql_engine': 'InnoDB'}
+
 
 class Device(BASE):
     """Class defining the iset_device table of the database."""
@@ -91,18 +109,21 @@ class Data(BASE):
     __table_args__ = (
         PrimaryKeyConstraint(
             'idx_datapoint', 'timestamp'),
-        {
-            'mysql_engine': 'InnoDB'
-        }
+        # Covering index for last contact queries that filter on timestamp
+        Index(
+            'iset_data_timestamp_covering',
+            'timestamp', 'idx_datapoint', 'value'),
+        _DATA_OPTIONS
         )
 
     idx_datapoint = Column(
         BIGINT(unsigned=True), ForeignKey('iset_datapoint.idx_datapoint'),
         nullable=False, server_default='1')
 
-    timestamp = Column(BIGINT(unsigned=True), nullable=False, default='1')
+    timestamp = Column(
+        _DATA_STORAGE['timestamp'], nullable=False, default='1')
 
-    value = Column(NUMERIC(40, 10), default=None)
+    value = Column(_DATA_STORAGE['value'], default=None)
 
 
 class Agent(BASE):
@@ -166,6 +187,14 @@ class Datapoint(BASE):
 
     __tablename__ = 'iset_datapoint'
     __table_args__ = (
+        # Used by the ingester to find enabled datapoints of a DeviceAgent
+        Index(
+            'iset_datapoint_deviceagent_enabled',
+            'idx_deviceagent', 'enabled'),
+        # Used by the API to list datapoints of a DeviceAgent by base_type
+        Index(
+            'iset_datapoint_deviceagent_base_type',
+            'idx_deviceagent', 'base_type'),
         {
             'mysql_engine': 'InnoDB'
         }
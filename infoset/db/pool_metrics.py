@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""Database connection pool metrics.
+
+Each process counts the activity of its own connection pool and regularly
+writes the counters, together with the current pool occupancy, to a file
+named after its PID. statistics() combines the files of all running
+processes, so the number of connections used by the API and ingester
+workers can be compared with the MySQL max_connections setting.
+
+"""
+
+# Standard libraries
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+
+# PIP3 libraries
+from sqlalchemy import event
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+# Infoset libraries
+from infoset.utils import log
+
+# Counters kept by each process
+COUNTERS = [
+    'checkouts', 'checkins', 'connects', 'disconnects', 'invalidations',
+    'pid_discards', 'checkout_timeouts', 'checkout_wait_seconds']
+
+# Minimum number of seconds between writes of a process' statistics file
+STATISTICS_INTERVAL = 10
+
+# Per process state
+_LOCK = threading.Lock()
+_STATE = {
+    'pid': None,
+    'started': None,
+    'written': 0,
+    'counters': None,
+    'directory': None,
+    'engine': None
+}
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection."""
+
+    def _do_get(self):
+        """Get a connection from the pool, timing the wait.
+
+        Args:
+            None
+
+        Returns:
+            result: Connection record
+
+        """
+        # Initialize key variables
+        start = time.time()
+
+        # Get the connection
+        try:
+            result = super(TimedQueuePool, self)._do_get()
+        except exc.TimeoutError:
+            record('checkout_timeouts')
+            raise
+        finally:
+            record('checkout_wait_seconds', time.time() - start)
+        return result
+
+
+def add_engine_metrics(engine, directory):
+    """Count the connection pool events of an engine.
+
+    Args:
+        engine: SQLalchemy engine instance
+        directory: Directory in which to write statistics files
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    _STATE['directory'] = directory
+    _STATE['engine'] = engine
+
+    # Events that only need to be counted
+    names = {
+        'connect': 'connects',
+        'close': 'disconnects',
+        'close_detached': 'disconnects',
+        'invalidate': 'invalidations',
+        'checkout': 'checkouts'
+    }
+    for (identifier, name) in names.items():
+        event.listen(engine, identifier, _counter(name))
+
+    # Write the statistics file when connections are returned
+    event.listen(engine, 'checkin', _checkin)
+
+
+def record(name, value=1):
+    """Add a value to a counter of this process.
+
+    Args:
+        name: Name of the counter
+        value: Value to add
+
+    Returns:
+        None
+
+    """
+    with _LOCK:
+        _reset_if_forked()
+        _STATE['counters'][name] += value
+
+
+def statistics(directory):
+    """Get the connection pool statistics of all running processes.
+
+    Files of processes that no longer exist are deleted.
+
+    Args:
+        directory: Directory containing statistics files
+
+    Returns:
+        result: Dict of statistics with these keys:
+            processes: List of dicts, one per process
+            totals: Sums of the counters and connection counts of all
+                processes, with connect and disconnect rates per second
+                and the average checkout wait in seconds
+
+    """
+    # Initialize key variables
+    processes = []
+    totals = dict.fromkeys(
+        COUNTERS + [
+            'size', 'checked_in', 'checked_out', 'overflow', 'limit'], 0)
+
+    # Read the files of running processes
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith('.json') is False:
+            continue
+        filepath = os.path.join(directory, filename)
+        try:
+            with open(filepath, 'r') as f_handle:
+                data = json.load(f_handle)
+        except (OSError, ValueError):
+            continue
+        if _running(data['pid']) is False:
+            _delete(filepath)
+            continue
+        processes.append(data)
+        for key in totals:
+            totals[key] += data.get(key, 0)
+
+    # Calculate rates
+    totals['connects_per_second'] = round(
+        sum(_rate(item, 'connects') for item in processes), 4)
+    totals['disconnects_per_second'] = round(
+        sum(_rate(item, 'disconnects') for item in processes), 4)
+    if bool(totals['checkouts']) is True:
+        totals['checkout_wait_average'] = round(
+            totals['checkout_wait_seconds'] / totals['checkouts'], 6)
+    else:
+        totals['checkout_wait_average'] = 0
+    totals['checkout_wait_seconds'] = round(
+        totals['checkout_wait_seconds'], 6)
+    totals['processes'] = len(processes)
+
+    # Return
+    result = {'processes': processes, 'totals': totals}
+    return result
+
+
+def write(force=False, returning=0):
+    """Write the statistics file of this process.
+
+    Args:
+        force: Write even if the file was written less than
+            STATISTICS_INTERVAL seconds ago
+        returning: Number of connections being returned to the pool that
+            should not be counted as in use
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    now = time.time()
+    directory = _STATE['directory']
+    engine = _STATE['engine']
+    if directory is None or engine is None:
+        return
+
+    # Get the data to write
+    with _LOCK:
+        _reset_if_forked()
+        if force is False and now - _STATE['written'] < STATISTICS_INTERVAL:
+            return
+        _STATE['written'] = now
+        data = dict(_STATE['counters'])
+        data['pid'] = _STATE['pid']
+        data['started'] = _STATE['started']
+
+    # Add the occupancy of the pool
+    pool = engine.pool
+    data['timestamp'] = now
+    data['process'] = os.path.basename(sys.argv[0])
+    data['size'] = pool.size()
+    data['checked_in'] = pool.checkedin() + returning
+    data['checked_out'] = pool.checkedout() - returning
+    data['overflow'] = max(pool.overflow(), 0)
+    data['limit'] = pool.size() + getattr(pool, '_max_overflow', 0)
+
+    # Write the file. Readers never see a partially written file
+    filepath = os.path.join(directory, '{}.json'.format(data['pid']))
+    try:
+        (handle, temporary) = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(handle, 'w') as f_handle:
+            json.dump(data, f_handle)
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, filepath)
+    except OSError as exception:
+        log_message = (
+            'Unable to write pool statistics file {}: {}'
+            ''.format(filepath, exception))
+        log.log2debug(1151, log_message)
+
+
+def _counter(name):
+    """Create an event listener that increments a counter.
+
+    Args:
+        name: Name of the counter
+
+    Returns:
+        listener: Event listener
+
+    """
+    def listener(*args):
+        """Increment the counter.
+
+        Args:
+            args: Event arguments
+
+        Returns:
+            None
+
+        """
+        record(name)
+
+    # Return
+    return listener
+
+
+def _checkin(dbapi_connection, connection_record):
+    """Count connections returned to the pool.
+
+    Args:
+        dbapi_connection: Connection object
+        connection_record: Connection record object
+
+    Returns:
+        None
+
+    """
+    record('checkins')
+    write(returning=1)
+
+
+def _reset_if_forked():
+    """Start new counters in processes forked after they were created.
+
+    Must be called while holding _LOCK.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    pid = os.getpid()
+
+    # Reset
+    if _STATE['pid'] != pid:
+        _STATE['pid'] = pid
+        _STATE['started'] = time.time()
+        _STATE['written'] = 0
+        _STATE['counters'] = dict.fromkeys(COUNTERS, 0)
+
+
+def _rate(data, name):
+    """Get the average per second rate of a counter of a process.
+
+    Args:
+        data: Statistics of the process
+        name: Name of the counter
+
+    Returns:
+        result: Rate
+
+    """
+    # Return
+    seconds = max(data['timestamp'] - data['started'], 1)
+    result = data[name] / seconds
+    return result
+
+
+def _running(pid):
+    """Determine whether a process is running.
+
+    Args:
+        pid: Process ID
+
+    Returns:
+        result: True if running
+
+    """
+    # Initialize key variables
+    result = True
+
+    # Signal 0 only checks whether the process exists
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        result = False
+    except PermissionError:
+        pass
+    return result
+
+
+def _delete(filepath):
+    """Delete a statistics file.
+
+    Args:
+        filepath: Filepath
+
+    Returns:
+        None
+
+    """
+    try:
+        os.remove(filepath)
+    except OSError:
+        pass
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""Queue the data an agent couldn't post to the API.
+
+Each agent and device has its own queue directory containing:
+
+    1) Segment files named after their sequence number, such as
+       00000000000000000001.ndjson. Data is appended to the newest segment
+       as a line of JSON. A new segment is started when the newest one
+       reaches SEGMENT_SIZE bytes.
+    2) An index file containing the segment and byte offset of the oldest
+       data not yet posted, the sequence number of the newest segment and
+       the number of bytes queued. Segments are deleted once all their
+       data has been posted.
+
+Queuing data and reading it back are therefore sequential file operations
+that don't depend on how much data is queued, or how many segments there
+are. When the queue reaches its
+maximum size, either the oldest segments are deleted to make room for new
+data, or new data is discarded, depending on the drop policy.
+
+"""
+
+# Standard libraries
+import os
+import json
+import fcntl
+import tempfile
+from contextlib import contextmanager
+
+# infoset libraries
+from infoset.utils import log
+
+# Default maximum number of bytes queued
+MAX_BYTES = 104857600
+
+# Drop policies. 'oldest' deletes the oldest data to make room for new
+# data. 'newest' discards new data when the queue is full
+DROP_POLICIES = ['oldest', 'newest']
+
+# Size at which a new segment is started
+SEGMENT_SIZE = 1048576
+
+# Suffix of segment files
+SUFFIX = '.ndjson'
+
+
+class Backlog(object):
+    """Bounded, append-only queue of agent data stored in segment files."""
+
+    def __init__(self, directory, max_bytes=MAX_BYTES, drop_policy='oldest'):
+        """Method initializing the class.
+
+        Args:
+            directory: Queue directory. Created if it doesn't exist
+            max_bytes: Maximum number of bytes queued. 0 is unlimited
+            drop_policy: Policy used when the queue is full. One of
+                DROP_POLICIES
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.drop_policy = drop_policy
+        self._index = os.path.join(directory, 'index.json')
+
+        # Check the drop policy
+        if drop_policy not in DROP_POLICIES:
+            log_message = (
+                'Agent cache drop policy "%s" is not one of %s.'
+                '') % (drop_policy, DROP_POLICIES)
+            log.log2die(1158, log_message)
+
+        # Create the queue directory
+        os.makedirs(directory, exist_ok=True)
+
+    def put(self, data):
+        """Add data to the queue.
+
+        Args:
+            data: Agent data
+
+        Returns:
+            success: True if the data was queued
+
+        """
+        # Initialize key variables
+        line = ('%s\n') % (json.dumps(data))
+        size = len(line.encode())
+
+        # Data that could never fit is discarded without dropping any
+        if self.max_bytes > 0 and size > self.max_bytes:
+            log_message = (
+                'Data of %s bytes is larger than agent cache %s. '
+                'Discarding it.') % (size, self.directory)
+            log.log2warning(1177, log_message)
+            return False
+
+        with self._lock():
+            # Make room for the data
+            state = self._state()
+            if self.max_bytes > 0:
+                while state['bytes'] + size > self.max_bytes:
+                    if (self.drop_policy == 'newest' or
+                            self._drop(state) is False):
+                        log_message = (
+                            'Agent cache %s is full. Discarding data.'
+                            '') % (self.directory)
+                        log.log2warning(1159, log_message)
+                        return False
+
+            # Start a new segment when the newest is full
+            segment = state['newest']
+            if segment < state['segment']:
+                segment = state['segment']
+            elif self._filesize(segment) >= SEGMENT_SIZE:
+                segment += 1
+
+            # Append the data
+            with open(self._filepath(segment), 'a') as f_handle:
+                f_handle.write(line)
+            state['newest'] = segment
+            state['bytes'] += size
+            self._save(state)
+
+        # Return
+        return True
+
+    def get(self, count):
+        """Read the oldest data in the queue without removing it.
+
+        Args:
+            count: Maximum number of items to read
+
+        Returns:
+            result: List of (position, data) tuples. Pass the position to
+                the commit method to remove the item and those before it
+
+        """
+        # Initialize key variables
+        result = []
+        state = self._state()
+        offset = state['offset']
+        segments = list(range(state['segment'], state['newest'] + 1))
+
+        # Read each segment from the position of the oldest data
+        for segment in segments:
+            filepath = self._filepath(segment)
+            newest = segment == segments[-1]
+            try:
+                f_handle = open(filepath, 'rb')
+            except FileNotFoundError:
+                # The oldest data was dropped to make room for new data
+                offset = 0
+                continue
+            with f_handle:
+                f_handle.seek(offset)
+                while len(result) < count:
+                    line = f_handle.readline()
+                    if line.endswith(b'\n') is False:
+                        # The end of the segment, or data still being
+                        # written to the newest segment
+                        if newest is True or bool(line) is False:
+                            break
+                    offset = f_handle.tell()
+                    try:
+                        result.append(
+                            ([segment, offset], json.loads(line.decode())))
+                    except ValueError:
+                        log_message = (
+                            'Error reading data at byte %s of agent cache '
+                            'file %s. May be corrupted.'
+                            '') % (offset, filepath)
+                        log.log2warning(1160, log_message)
+            if len(result) >= count:
+                break
+            offset = 0
+
+        # Return
+        return result
+
+    def commit(self, position):
+        """Remove the data before a position from the queue.
+
+        Args:
+            position: Position returned by the get method
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        (segment, offset) = position
+
+        with self._lock():
+            # Ignore positions of data that was dropped since it was read
+            state = self._state()
+            if (segment, offset) <= (state['segment'], state['offset']):
+                return
+
+            # Delete segments that have been posted
+            removed = offset - state['offset']
+            for item in range(state['segment'], segment):
+                removed += self._filesize(item)
+                if os.path.exists(self._filepath(item)) is True:
+                    os.remove(self._filepath(item))
+
+            # Save the position of the oldest data
+            state['segment'] = segment
+            state['offset'] = offset
+            state['bytes'] = max(state['bytes'] - removed, 0)
+            self._save(state)
+
+    def size(self):
+        """Get the number of bytes queued.
+
+        Args:
+            None
+
+        Returns:
+            result: Number of bytes
+
+        """
+        # Return
+        with self._lock():
+            result = self._state()['bytes']
+        return result
+
+    def _drop(self, state):
+        """Delete the oldest segment.
+
+        Args:
+            state: Dict of the index, updated and saved if a segment was
+                deleted
+
+        Returns:
+            success: True if a segment was deleted
+
+        """
+        # Initialize key variables
+        oldest = state['segment']
+        if state['newest'] < oldest:
+            return False
+        filepath = self._filepath(oldest)
+        size = self._filesize(oldest)
+
+        # Start a new segment if the oldest is also the newest
+        if oldest == state['newest']:
+            if size <= state['offset']:
+                return False
+            open(self._filepath(oldest + 1), 'a').close()
+            state['newest'] = oldest + 1
+
+        # Delete the oldest segment
+        if os.path.exists(filepath) is True:
+            os.remove(filepath)
+        state['bytes'] = max(
+            state['bytes'] - max(size - state['offset'], 0), 0)
+        state['segment'] = oldest + 1
+        state['offset'] = 0
+        self._save(state)
+        log_message = (
+            'Agent cache %s is full. Deleted the oldest data in %s.'
+            '') % (self.directory, filepath)
+        log.log2warning(1161, log_message)
+        return True
+
+    def _segments(self):
+        """Get the sequence numbers of the segments.
+
+        Args:
+            None
+
+        Returns:
+            result: Sorted list of sequence numbers
+
+        """
+        # Return
+        result = sorted(
+            int(filename[:-len(SUFFIX)])
+            for filename in os.listdir(self.directory)
+            if filename.endswith(SUFFIX) and
+            filename[:-len(SUFFIX)].isdigit())
+        return result
+
+    def _filepath(self, segment):
+        """Get the path of a segment file.
+
+        Args:
+            segment: Sequence number of the segment
+
+        Returns:
+            result: Path
+
+        """
+        # Return
+        result = os.path.join(
+            self.directory, '{:020d}{}'.format(segment, SUFFIX))
+        return result
+
+    def _filesize(self, segment):
+        """Get the size of a segment file.
+
+        Args:
+            segment: Sequence number of the segment
+
+        Returns:
+            result: Number of bytes. 0 if the segment doesn't exist
+
+        """
+        # Return
+        try:
+            result = os.path.getsize(self._filepath(segment))
+        except OSError:
+            result = 0
+        return result
+
+    def _state(self):
+        """Get the state of the queue from the index.
+
+        The index is rebuilt from the segment files if it is missing or
+        was written by an earlier version.
+
+        Args:
+            None
+
+        Returns:
+            result: Dict with these keys:
+                segment: Sequence number of the segment of the oldest data
+                offset: Byte offset of the oldest data in the segment
+                newest: Sequence number of the newest segment. Less than
+                    segment if there are no segments
+                bytes: Number of bytes queued
+
+        """
+        # Read the index
+        try:
+            with open(self._index, 'r') as f_handle:
+                index = json.load(f_handle)
+        except (OSError, ValueError):
+            index = None
+        if isinstance(index, dict) is True:
+            return index
+
+        # Rebuild the index
+        segments = self._segments()
+        if isinstance(index, list) is True and len(index) == 2:
+            (segment, offset) = index
+        elif bool(segments) is True:
+            (segment, offset) = (segments[0], 0)
+        else:
+            (segment, offset) = (1, 0)
+        segments = [item for item in segments if item >= segment]
+        if bool(segments) is True:
+            newest = segments[-1]
+        else:
+            newest = segment - 1
+        size = sum(self._filesize(item) for item in segments)
+        if segment in segments:
+            size -= offset
+
+        # Return
+        result = {
+            'segment': segment,
+            'offset': offset,
+            'newest': newest,
+            'bytes': max(size, 0)
+        }
+        return result
+
+    def _save(self, state):
+        """Save the state of the queue to the index.
+
+        Args:
+            state: Dict of the index
+
+        Returns:
+            None
+
+        """
+        # Replace the index so that it is never partially written
+        (handle, temporary) = tempfile.mkstemp(
+            dir=self.directory, suffix='.tmp')
+        with os.fdopen(handle, 'w') as f_handle:
+            json.dump(state, f_handle)
+        os.replace(temporary, self._index)
+
+    @contextmanager
+    def _lock(self):
+        """Lock the queue against changes by other processes.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Lock
+        with open(os.path.join(self.directory, 'lock'), 'w') as f_handle:
+            fcntl.flock(f_handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f_handle, fcntl.LOCK_UN)
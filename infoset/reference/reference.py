@@ -14,9 +14,9 @@ import os
 from random import random
 import tempfile
 import time
+import threading
 from collections import defaultdict
 from copy import deepcopy
-import json
 
 # pip3 libraries
 import requests
@@ -25,7 +25,26 @@ import requests
 from infoset.utils import log
 from infoset.utils import general
 from infoset.utils import daemon
+from infoset.utils import payload
 from infoset.utils.configuration import Config
+from infoset.cache import delta
+from infoset.reference import replay
+from infoset.reference import backlog
+
+# Schema IDs registered with the API by this process
+_SCHEMA_IDS = set()
+
+# Number of seconds to stop posting when a busy API doesn't say how long
+RETRY_AFTER = 60
+
+# Times before which the API servers, keyed by URL prefix, asked not to be
+# contacted
+_RETRY_AFTER = {}
+
+# HTTP sessions shared by all the agents of this process, keyed by URL
+# prefix, so that connections to the API are reused between posts
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
 
 
 class ReferenceSampleConfig(Config):
@@ -65,6 +84,40 @@ class ReferenceSampleConfig(Config):
         # Return
         return result
 
+    def agent_cache_max_bytes(self):
+        """Get agent_cache_max_bytes.
+
+        The maximum number of bytes of data each agent keeps in its cache
+        while it can't contact the API. 0 is unlimited.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        result = backlog.MAX_BYTES
+        return result
+
+    def agent_cache_drop_policy(self):
+        """Get agent_cache_drop_policy.
+
+        What an agent does when its cache is full. 'oldest' deletes the
+        oldest data to make room for new data. 'newest' discards new data.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        result = 'oldest'
+        return result
+
     def agent_name(self):
         """Get agent_name.
 
@@ -147,6 +200,179 @@ class ReferenceSampleConfig(Config):
         result = 'infoset/api/v1'
         return result
 
+    def api_payload_format(self):
+        """Get api_payload_format.
+
+        The format of the data posted to the API. One of 'json', 'msgpack'
+        or 'cbor'. The binary formats are smaller, but need the python
+        msgpack or cbor2 package to be installed on both the agent and the
+        API server.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        result = 'json'
+        return result
+
+    def api_delta_posts(self):
+        """Get api_delta_posts.
+
+        Only datapoint values are posted to the API if this is set to True.
+        The labels, descriptions, base_types and sources of the data are
+        registered with the API once, when they are first seen.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        result = False
+        return result
+
+    def api_payload_compression(self):
+        """Get api_payload_compression.
+
+        Data posted to the API will be gzip compressed if this is set to
+        True.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        result = False
+        return result
+
+    def api_pool_size(self):
+        """Get api_pool_size.
+
+        The maximum number of connections to the API kept open for reuse.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        result = 10
+        return result
+
+    def api_retries(self):
+        """Get api_retries.
+
+        The number of times a request is retried when the API can't be
+        reached or the connection fails.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        result = 3
+        return result
+
+    def api_retry_backoff(self):
+        """Get api_retry_backoff.
+
+        The delay before retrying a request, in seconds. The delay doubles
+        with each retry.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        result = 0.5
+        return result
+
+    def api_timeout(self):
+        """Get api_timeout.
+
+        The number of seconds to wait for the API to accept a connection or
+        send data before giving up.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        result = 10
+        return result
+
+    def api_replay_batch_size(self):
+        """Get api_replay_batch_size.
+
+        The number of cached files posted in each request when the agent
+        posts data it cached while the API was unreachable.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        result = replay.BATCH_SIZE
+        return result
+
+    def api_replay_workers(self):
+        """Get api_replay_workers.
+
+        The number of devices whose cached files are posted at the same
+        time. The files of each device are always posted in timestamp order.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        result = replay.WORKERS
+        return result
+
+    def api_replay_rate(self):
+        """Get api_replay_rate.
+
+        The maximum number of requests per second made when posting cached
+        files, so that a large backlog doesn't overwhelm the API. 0 is
+        unlimited.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        result = replay.RATE
+        return result
+
 
 class ReferenceSampleAPI(object):
     """Class used to GET and POST data to the infoset-ng API."""
@@ -176,7 +402,25 @@ class ReferenceSampleAPI(object):
                 prefix, config.api_server_name(),
                 config.api_server_port(), fixed_uri)
 
-    def _url(self, uri):
+        # Get the HTTP session
+        self.timeout = config.api_timeout()
+        self.session = _session(self.url_prefix, config)
+
+        # Get the format of posted data
+        self.payload_format = config.api_payload_format()
+        self.compression = config.api_payload_compression()
+        self.delta_posts = config.api_delta_posts()
+        if payload.available(self.payload_format) is False:
+            log_message = (
+                'Payload format "%s" is not supported. The python %s package '
+                'may need to be installed.'
+                '') % (
+                    self.payload_format,
+                    payload.FORMATS.get(
+                        self.payload_format, {}).get('module'))
+            log.log2die(1152, log_message)
+
+    def url(self, uri):
         """Create API URL.
 
         Args:
@@ -207,11 +451,11 @@ class ReferenceSampleAPI(object):
         data = None
 
         # Create API URL
-        url = self._url(uri)
+        url = self.url(uri)
 
         # Return data
         try:
-            result = requests.get(url)
+            result = self.session.get(url, timeout=self.timeout)
             data = result.json()
         except:
             data = None
@@ -224,6 +468,7 @@ class ReferenceSampleAPI(object):
 
         Args:
             uri: URI to retrieve excluding the API prefix.
+            data: Data to post
 
         Returns:
             _data: Result of query
@@ -231,11 +476,25 @@ class ReferenceSampleAPI(object):
         """
         # Initialize key variables
         success = False
+        headers = {
+            'Content-Type': payload.FORMATS[
+                self.payload_format]['mimetype']}
+
+        # Encode the data
+        body = payload.dumps(data, self.payload_format)
+        if self.compression is True:
+            body = payload.compress(body)
+            headers['Content-Encoding'] = 'gzip'
+
+        # Don't contact the API while it has asked agents to wait
+        if time.time() < _RETRY_AFTER.get(self.url_prefix, 0):
+            return success
 
         # Create API URL
-        url = self._url(uri)
+        url = self.url(uri)
         try:
-            result = requests.post(url, json=data)
+            result = self.session.post(
+                url, data=body, headers=headers, timeout=self.timeout)
             response = True
         except:
             response = False
@@ -244,10 +503,76 @@ class ReferenceSampleAPI(object):
         if response is True:
             if result.status_code == 200:
                 success = True
+            elif result.status_code in [429, 503]:
+                self._retry_after(result)
 
         # Retun
         return success
 
+    def _retry_after(self, result):
+        """Stop posting for the time requested by a busy API.
+
+        Data that can't be posted is cached by the agent and posted later.
+
+        Args:
+            result: requests Response object
+
+        Returns:
+            None
+
+        """
+        # Get the number of seconds to wait
+        try:
+            seconds = int(result.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            seconds = RETRY_AFTER
+
+        # Stop posting
+        _RETRY_AFTER[self.url_prefix] = time.time() + seconds
+        log_message = (
+            'API server %s is busy. Not posting data for %s seconds.'
+            '') % (self.url_prefix, seconds)
+        log.log2info(1154, log_message)
+
+    def post_delta(self, uri, data):
+        """Post API data as a delta post.
+
+        The schema of the data is registered with the API the first time
+        it is posted. The complete data is posted if the delta post fails.
+
+        Args:
+            uri: URI to retrieve excluding the API prefix.
+            data: Data to post
+
+        Returns:
+            success: True if successful
+
+        """
+        # Initialize key variables
+        success = False
+        schema = delta.create(data)
+        if schema is None:
+            success = self.post(uri, data)
+            return success
+        schema_id = schema['schema_id']
+
+        # Register the schema
+        if schema_id not in _SCHEMA_IDS:
+            if self.post('/schemas', data) is True:
+                _SCHEMA_IDS.add(schema_id)
+
+        # Post only the values
+        if schema_id in _SCHEMA_IDS:
+            values = [item[5] for item in delta.datapoints(data)]
+            success = self.post(uri, [schema_id, data['timestamp'], values])
+            if success is False:
+                _SCHEMA_IDS.discard(schema_id)
+
+        # Post the complete data if the delta post failed
+        if success is False:
+            success = self.post(uri, data)
+        return success
+
 
 class ReferenceSampleAgent(object):
     """Infoset reference agent class for retreiving and posting data."""
@@ -288,6 +613,12 @@ class ReferenceSampleAgent(object):
         devicehash = general.hashstring(self.data['devicename'], sha=1)
         self.cache_suffix = ('%s_%s.json') % (id_agent, devicehash)
 
+        # Data that can't be posted is queued in this backlog
+        self._backlog = backlog.Backlog(
+            os.path.join(self.cache_dir, ('%s_%s') % (id_agent, devicehash)),
+            max_bytes=config.agent_cache_max_bytes(),
+            drop_policy=config.agent_cache_drop_policy())
+
     def name(self):
         """Return the name of the agent.
 
@@ -485,7 +816,6 @@ class ReferenceSampleAgent(object):
         """
         # Initialize key variables
         success = False
-        timestamp = self.data['timestamp']
         id_agent = self.data['id_agent']
 
         # Create data to post
@@ -494,7 +824,10 @@ class ReferenceSampleAgent(object):
 
         # Post data save to cache if this fails
         uri = ('/receive/%s') % (id_agent)
-        success = self._api.post(uri, data)
+        if self._api.delta_posts is True:
+            success = self._api.post_delta(uri, data)
+        else:
+            success = self._api.post(uri, data)
 
         # Log message
         if success is True:
@@ -505,13 +838,7 @@ class ReferenceSampleAgent(object):
         else:
             # Save data if requested
             if save is True:
-                # Create a unique very long filename to reduce risk of
-                filename = ('%s/%s_%s.json') % (
-                    self.cache_dir, timestamp, self.cache_suffix)
-
-                # Save data
-                with open(filename, 'w') as f_handle:
-                    json.dump(data, f_handle)
+                self._backlog.put(data)
 
             # Log message
             log_message = (
@@ -525,58 +852,82 @@ class ReferenceSampleAgent(object):
     def purge(self):
         """Purge data from cache by posting to central server.
 
+        The agent's backlog is posted in the order it was queued, many
+        items per request. Data is removed from the backlog once the API
+        accepts it. Cache files written by earlier versions of the agent
+        are posted first, in timestamp order.
+
         Args:
             None
 
         Returns:
-            success: "True: if successful
+            result: Number of cache files and backlog items posted
 
         """
         # Initialize key variables
-        id_agent = self.data['id_agent']
+        result = 0
+        config = self._api.config
+        url_prefix = self._api.url_prefix
+
+        # Don't contact the API while it has asked agents to wait
+        if time.time() < _RETRY_AFTER.get(url_prefix, 0):
+            return result
+
+        # Post the files that match the cache suffix
+        replayer = replay.Replay(
+            self._api.url('/receive'), self.cache_dir,
+            suffix=self.cache_suffix,
+            batch_size=config.api_replay_batch_size(),
+            workers=config.api_replay_workers(),
+            rate=config.api_replay_rate(),
+            payload_format=self._api.payload_format,
+            compression=self._api.compression,
+            session=self._api.session, timeout=self._api.timeout)
+        result = replayer.run()
+        result += replayer.run_backlog(self._backlog)
+
+        # Stop posting if the API is busy
+        if replayer.retry_after is not None:
+            seconds = replayer.retry_after or RETRY_AFTER
+            _RETRY_AFTER[url_prefix] = time.time() + seconds
+
+        # Return
+        return result
+
 
-        # Add files in cache directory to list only if they match the
-        # cache suffix
-        all_filenames = [filename for filename in os.listdir(
-            self.cache_dir) if os.path.isfile(
-                os.path.join(self.cache_dir, filename))]
-        filenames = [
-            filename for filename in all_filenames if filename.endswith(
-                self.cache_suffix)]
-
-        # Read cache file in sorted order.
-        # NOTE: We must post data in timestamp sorted order.
-        for filename in filenames.sorted():
-            # Only post files for our own UID value
-            if id_agent not in filename:
-                continue
-
-            # Get the full filepath for the cache file and post
-            filepath = os.path.join(self.cache_dir, filename)
-            with open(filepath, 'r') as f_handle:
-                try:
-                    data = json.load(f_handle)
-                except:
-                    # Log removal
-                    log_message = (
-                        'Error reading previously cached agent data file %s '
-                        'for agent %s. May be corrupted.'
-                        '') % (filepath, self.name())
-                    log.log2die(1058, log_message)
-
-            # Post file
-            success = self.post(save=False, data=data)
-
-            # Delete file if successful
-            if success is True:
-                os.remove(filepath)
-
-                # Log removal
-                log_message = (
-                    'Purging cache file %s after successfully '
-                    'contacting server'
-                    '') % (filepath)
-                log.log2info(1110, log_message)
+def _session(url_prefix, config):
+    """Get the HTTP session used to contact an API server.
+
+    Args:
+        url_prefix: URL prefix of the API server
+        config: ConfigAgent object
+
+    Returns:
+        result: requests Session object
+
+    """
+    # Return the session if it exists
+    with _SESSIONS_LOCK:
+        if url_prefix in _SESSIONS:
+            return _SESSIONS[url_prefix]
+
+        # Retry failed connections, but not requests the API refused. The
+        # API can be sent the same post more than once, so posts are
+        # retried too
+        retries = requests.adapters.Retry(
+            total=config.api_retries(), status=0,
+            backoff_factor=config.api_retry_backoff(),
+            allowed_methods=None, raise_on_status=False)
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=config.api_pool_size(),
+            max_retries=retries)
+
+        # Create the session
+        result = requests.Session()
+        result.mount('http://', adapter)
+        result.mount('https://', adapter)
+        _SESSIONS[url_prefix] = result
+    return result
 
 
 def get_id_agent(agent_name, test=False):
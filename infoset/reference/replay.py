@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""Post data cached by agents while the API was unreachable.
+
+Cache files are posted to the API's batch receive route, many files per
+request, using a keep-alive HTTP session. The files of each agent and
+device are posted in timestamp order, as the ingester discards data that
+is older than data it has already stored. Different devices are posted
+concurrently. Each file is deleted as soon as the API accepts it, so a
+replay that is interrupted continues where it stopped.
+
+"""
+
+# Standard libraries
+import os
+import json
+import time
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+# pip3 libraries
+import requests
+
+# infoset libraries
+from infoset.utils import log
+from infoset.utils import payload
+
+# Default number of cache files posted in each request
+BATCH_SIZE = 100
+
+# Default number of devices whose files are posted at the same time
+WORKERS = 4
+
+# Default maximum number of requests per second. 0 is unlimited
+RATE = 10
+
+# Seconds to wait for the API to respond
+TIMEOUT = 30
+
+
+class Replay(object):
+    """Post cache files to the API's batch receive route."""
+
+    def __init__(self, url, cache_dir, suffix='', batch_size=BATCH_SIZE,
+                 workers=WORKERS, rate=RATE, payload_format='json',
+                 compression=False, session=None, timeout=TIMEOUT):
+        """Method initializing the class.
+
+        Args:
+            url: URL of the API's batch receive route
+            cache_dir: Directory containing the cache files
+            suffix: Only post files whose names end with this suffix
+            batch_size: Number of cache files posted in each request
+            workers: Number of devices whose files are posted at the same
+                time
+            rate: Maximum number of requests per second. 0 is unlimited
+            payload_format: Format of the data posted
+            compression: Gzip compress the data posted if True
+            session: requests Session object to use. A session is created
+                and closed by the Replay object if None
+            timeout: Seconds to wait for the API to respond
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.url = url
+        self.cache_dir = cache_dir
+        self.suffix = suffix
+        self.batch_size = max(batch_size, 1)
+        self.workers = max(workers, 1)
+        self.rate = rate
+        self.payload_format = payload_format
+        self.compression = compression
+        self.timeout = timeout
+        self.retry_after = None
+        self._posted = 0
+        self._next_request = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+        # Create a session that keeps a connection open for each worker
+        self._close = session is None
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=1, pool_maxsize=self.workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
+
+    def run(self):
+        """Post the cache files.
+
+        Args:
+            None
+
+        Returns:
+            result: Number of cache files posted
+
+        """
+        # Post the files of each device concurrently
+        streams = self.streams()
+        if bool(streams) is True:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                list(executor.map(self._replay, streams))
+
+        # Return
+        if self._close is True:
+            self.session.close()
+        result = self._posted
+        return result
+
+    def run_backlog(self, queue):
+        """Post the data in an agent's backlog.
+
+        Args:
+            queue: Backlog object
+
+        Returns:
+            result: Number of items posted
+
+        """
+        # Initialize key variables
+        result = 0
+
+        # Post the oldest data in batches until the backlog is empty
+        while self._stop.is_set() is False:
+            items = queue.get(self.batch_size)
+            if bool(items) is False:
+                break
+            status = self.post([data for (_, data) in items])
+
+            # One invalid item causes the API to refuse the whole batch.
+            # Post the items one at a time, discarding those refused
+            if status in [400, 404] and len(items) > 1:
+                for (position, data) in items:
+                    status = self.post([data])
+                    if status not in [200, 400, 404]:
+                        return result
+                    if status == 200:
+                        result += 1
+                    else:
+                        self._refused(queue.directory)
+                    queue.commit(position)
+                continue
+
+            # Remove the data from the backlog once the API has it
+            if status == 200:
+                result += len(items)
+            elif status in [400, 404]:
+                self._refused(queue.directory)
+            else:
+                break
+            queue.commit(items[-1][0])
+
+        # Log
+        if result > 0:
+            log_message = (
+                'Purged %s items from agent cache %s after successfully '
+                'contacting server %s') % (result, queue.directory, self.url)
+            log.log2info(1163, log_message)
+        return result
+
+    def streams(self):
+        """Get the cache files of each agent and device.
+
+        Args:
+            None
+
+        Returns:
+            result: List of lists of filepaths. Each list contains the
+                files of one agent and device in timestamp order
+
+        """
+        # Initialize key variables
+        streams = defaultdict(list)
+
+        # Group files by the part of the name after the timestamp
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith(self.suffix) is False:
+                continue
+            filepath = os.path.join(self.cache_dir, filename)
+            if os.path.isfile(filepath) is False:
+                continue
+            (timestamp, _, key) = filename.partition('_')
+            if timestamp.isdigit() is False:
+                continue
+            streams[key].append((int(timestamp), filepath))
+
+        # Return
+        result = [
+            [filepath for (_, filepath) in sorted(items)]
+            for items in streams.values()]
+        return result
+
+    def _replay(self, filepaths):
+        """Post the cache files of one agent and device in batches.
+
+        Args:
+            filepaths: List of filepaths in timestamp order
+
+        Returns:
+            None
+
+        """
+        # Post each batch, stopping at the first that fails so that the
+        # order of the data is kept
+        for start in range(0, len(filepaths), self.batch_size):
+            if self._stop.is_set() is True:
+                break
+            batch = filepaths[start:start + self.batch_size]
+            if self._post_files(batch) is False:
+                break
+
+    def _post_files(self, filepaths):
+        """Post a batch of cache files and delete them when accepted.
+
+        Files the API refuses are deleted too, as posting them again would
+        always fail.
+
+        Args:
+            filepaths: List of filepaths
+
+        Returns:
+            success: True if the API accepted or refused the files. False
+                if they must be posted again later, in which case the
+                newer files of the device mustn't be posted first
+
+        """
+        # Read the files
+        items = []
+        for filepath in filepaths:
+            try:
+                with open(filepath, 'r') as f_handle:
+                    items.append((filepath, json.load(f_handle)))
+            except (OSError, ValueError):
+                log_message = (
+                    'Error reading previously cached agent data file %s. '
+                    'May be corrupted.') % (filepath)
+                log.log2warning(1155, log_message)
+        if bool(items) is False:
+            return True
+
+        # Post the data
+        status = self.post([data for (_, data) in items])
+
+        # One invalid file causes the API to refuse the whole batch. Post
+        # the files one at a time to find the files the API accepts,
+        # stopping at the first that must be posted again
+        if status in [400, 404] and len(items) > 1:
+            for (filepath, _) in items:
+                if self._post_files([filepath]) is False:
+                    return False
+            return True
+
+        # Delete the files the API accepted
+        if status == 200:
+            for (filepath, _) in items:
+                os.remove(filepath)
+            with self._lock:
+                self._posted += len(items)
+            log_message = (
+                'Purged %s cache files ending with %s after successfully '
+                'contacting server %s') % (len(items), self.suffix, self.url)
+            log.log2info(1157, log_message)
+
+        # Delete the file the API refused
+        elif status in [400, 404]:
+            os.remove(items[0][0])
+            log_message = (
+                'Server %s refused previously cached agent data file %s. '
+                'Discarding it.') % (self.url, items[0][0])
+            log.log2warning(1156, log_message)
+
+        # Return
+        success = status in [200, 400, 404]
+        return success
+
+    def _refused(self, directory):
+        """Log data from an agent backlog that the API refused.
+
+        Args:
+            directory: Backlog directory
+
+        Returns:
+            None
+
+        """
+        # Log
+        log_message = (
+            'Server %s refused data from agent cache %s. Discarding it.'
+            '') % (self.url, directory)
+        log.log2warning(1162, log_message)
+
+    def post(self, items):
+        """Post a batch of agent data.
+
+        Args:
+            items: List of agent data
+
+        Returns:
+            status: HTTP status code. None if the API couldn't be contacted
+
+        """
+        # Initialize key variables
+        status = None
+        headers = {
+            'Content-Type': payload.FORMATS[self.payload_format]['mimetype']}
+
+        # Encode the data
+        body = payload.dumps(items, self.payload_format)
+        if self.compression is True:
+            body = payload.compress(body)
+            headers['Content-Encoding'] = 'gzip'
+
+        # Post
+        self._wait()
+        try:
+            response = self.session.post(
+                self.url, data=body, headers=headers, timeout=self.timeout)
+            status = response.status_code
+        except requests.exceptions.RequestException:
+            self._stop.set()
+            return status
+
+        # Stop all workers if the API is busy
+        if status in [429, 503]:
+            try:
+                self.retry_after = int(response.headers.get('Retry-After'))
+            except (TypeError, ValueError):
+                self.retry_after = 0
+            self._stop.set()
+        return status
+
+    def _wait(self):
+        """Wait to keep the number of requests below the maximum rate.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Nothing to do without a limit
+        if self.rate <= 0:
+            return
+
+        # Reserve the next available time to make a request
+        with self._lock:
+            now = time.time()
+            start = max(now, self._next_request)
+            self._next_request = start + 1 / self.rate
+        if start > now:
+            time.sleep(start - now)
@@ -143,6 +143,33 @@ class APITestCase(unittest.TestCase):
         for key in keys:
             self.assertEqual(key in result, True)
 
+    def test_agents_query_stream(self):
+        """Testing method / function agents_query with streaming."""
+        # Clear the memory cache
+        CACHE.clear()
+
+        # Get results as a chunked JSON array
+        response = self.API.get('/infoset/api/v1/agents?stream=json')
+        data = json.loads(response.get_data(as_text=True))
+
+        # Verify reponse code and content
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertEqual(isinstance(data, list), True)
+        self.assertEqual(data[0]['id_agent'], self.test_object.id_agent())
+        self.assertEqual(data[0]['agent'], self.test_object.agent())
+
+        # Get results as NDJSON
+        response = self.API.get('/infoset/api/v1/agents?stream=ndjson')
+        lines = response.get_data(as_text=True).splitlines()
+        result = json.loads(lines[0])
+
+        # Verify reponse code and content
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertEqual(result['id_agent'], self.test_object.id_agent())
+        self.assertEqual(result['idx_agent'], self.test_object.idx_agent())
+
 
 if __name__ == '__main__':
     # Test the environment variables
@@ -100,6 +100,37 @@ class APITestCase(unittest.TestCase):
         self.assertEqual(len(result), 1)
         self.assertEqual(result, [self.expected['idx_agent']])
 
+    def test_db_getdevices(self):
+        """Testing method / function db_getdevices."""
+        # Clear the memory cache
+        CACHE.clear()
+
+        # Get results
+        uri = '/infoset/api/v1/devices?limit=1'
+        response = self.API.get(uri)
+        data = json.loads(response.get_data(as_text=True))
+
+        # Verify reponse code
+        self.assertEqual(response.status_code, 200)
+
+        # Verify response content
+        self.assertEqual(isinstance(data, list), True)
+        self.assertEqual(len(data), 1)
+        result = data[0]
+        self.assertEqual(result['idx_device'], self.test_object.idx_device())
+        self.assertEqual(result['devicename'], self.test_object.devicename())
+        self.assertEqual(result['enabled'], self.test_object.enabled())
+        self.assertEqual(result['exists'], self.test_object.exists())
+
+        # Get the next page
+        uri = '/infoset/api/v1/devices?after={}'.format(
+            self.expected['idx_device'])
+        response = self.API.get(uri)
+        data = json.loads(response.get_data(as_text=True))
+        for result in data:
+            self.assertGreater(
+                result['idx_device'], self.expected['idx_device'])
+
 
 if __name__ == '__main__':
     # Test the environment variables
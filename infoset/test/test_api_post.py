@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""Test the post library in the infoset.api module."""
+
+import unittest
+import json
+from unittest import mock
+import os
+import sys
+
+# Try to create a working PYTHONPATH
+_TEST_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+_LIB_DIRECTORY = os.path.abspath(os.path.join(_TEST_DIRECTORY, os.pardir))
+_ROOT_DIRECTORY = os.path.abspath(os.path.join(_LIB_DIRECTORY, os.pardir))
+if _TEST_DIRECTORY.endswith('/infoset-ng/infoset/test') is True:
+    sys.path.append(_ROOT_DIRECTORY)
+else:
+    print(
+        'This script is not installed in the "infoset-ng/bin" directory. '
+        'Please fix.')
+    sys.exit(2)
+
+from infoset.api import API, CONFIG
+from infoset.utils import general
+from infoset.utils import payload
+from infoset.cache import spool
+from infoset.test import unittest_setup
+
+
+def _post(timestamp, devicename):
+    """Create an agent post."""
+    data = {
+        'agent': 'test_agent',
+        'timestamp': timestamp,
+        'id_agent': general.hashstring('test_agent'),
+        'devicename': devicename,
+        'timeseries': {
+            'label': {
+                'base_type': 1, 'description': 'description',
+                'data': [[0, 1.0, 'source']]}}
+    }
+    return data
+
+
+class APITestCase(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+    def setUp(self):
+        """Setup the environment prior to testing."""
+        API.config['TESTING'] = True
+        self.API = API.test_client()
+        self.cache_dir = CONFIG.ingest_cache_directory()
+        self.before = set(os.listdir(self.cache_dir))
+
+    def tearDown(self):
+        """Cleanup the environment after testing."""
+        for filename in self._files():
+            os.remove(os.path.join(self.cache_dir, filename))
+
+    def _files(self):
+        """Get the files created by the test."""
+        return sorted(
+            filename for filename in set(
+                os.listdir(self.cache_dir)) - self.before
+            if os.path.isfile(os.path.join(self.cache_dir, filename)))
+
+    def _filename(self, data):
+        """Get the name of the cache file of a post."""
+        return '{}_{}_{}.json'.format(
+            data['timestamp'], data['id_agent'],
+            general.hashstring(data['devicename'], sha=1))
+
+    def test_receive(self):
+        """Testing method / function receive."""
+        # Initializing key variables
+        data = _post(300, 'device')
+        uri = '/infoset/api/v1/receive/{}'.format(data['id_agent'])
+
+        # Test
+        response = self.API.post(uri, json=data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._files(), [self._filename(data)])
+        with open(os.path.join(self.cache_dir, self._filename(data))) as f_h:
+            self.assertEqual(json.load(f_h), data)
+
+        # Test with missing keys
+        del data['devicename']
+        response = self.API.post(uri, json=data)
+        self.assertEqual(response.status_code, 404)
+
+        # Test unsupported content
+        response = self.API.post(uri, data='data', content_type='text/plain')
+        self.assertEqual(response.status_code, 415)
+        response = self.API.post(
+            uri, data='{"bad', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_receive_compressed(self):
+        """Testing method / function receive with gzip bodies."""
+        # Initializing key variables
+        data = _post(300, 'device')
+        uri = '/infoset/api/v1/receive/{}'.format(data['id_agent'])
+
+        # Test
+        response = self.API.post(
+            uri, data=payload.compress(payload.dumps(data)),
+            content_type='application/json',
+            headers={'Content-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 200)
+        filepath = os.path.join(self.cache_dir, self._filename(data))
+        self.assertEqual(payload.load(filepath), data)
+
+        # Test data that isn't compressed
+        response = self.API.post(
+            uri, data=payload.dumps(data), content_type='application/json',
+            headers={'Content-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 400)
+
+    @unittest.skipIf(
+        payload.available('msgpack') is False, 'msgpack is not installed')
+    def test_receive_msgpack(self):
+        """Testing method / function receive with msgpack data."""
+        # Initializing key variables
+        data = _post(300, 'device')
+        uri = '/infoset/api/v1/receive/{}'.format(data['id_agent'])
+        filename = self._filename(data).replace('.json', '.msgpack')
+
+        # Test a single post. The data is saved as msgpack
+        response = self.API.post(
+            uri, data=payload.dumps(data, 'msgpack'),
+            content_type='application/msgpack')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._files(), [filename])
+        filepath = os.path.join(self.cache_dir, filename)
+        self.assertEqual(payload.load(filepath), data)
+        self.tearDown()
+
+        # Test a batch
+        items = [_post(300, 'device_1'), _post(300, 'device_2')]
+        response = self.API.post(
+            '/infoset/api/v1/receive',
+            data=payload.compress(payload.dumps(items, 'msgpack')),
+            content_type='application/msgpack',
+            headers={'Content-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self._files()), 2)
+        for filename in self._files():
+            self.assertTrue(filename.endswith('.msgpack'))
+
+    def test_register(self):
+        """Testing method / function register and delta posts."""
+        # Initializing key variables
+        data = _post(300, 'device')
+        uri = '/infoset/api/v1/receive/{}'.format(data['id_agent'])
+
+        # Register the schema
+        response = self.API.post('/infoset/api/v1/schemas', json=data)
+        self.assertEqual(response.status_code, 200)
+        result = json.loads(response.get_data(as_text=True))
+        self.assertEqual(result['datapoints'], 1)
+        schema_id = result['schema_id']
+
+        # Test delta posts
+        response = self.API.post(uri, json=[schema_id, 600, [2.0]])
+        self.assertEqual(response.status_code, 200)
+        filename = self._filename(_post(600, 'device'))
+        self.assertEqual(self._files(), [filename])
+
+        # Test delta posts with unknown schemas or the wrong values
+        response = self.API.post(uri, json=['abc', 600, [2.0]])
+        self.assertEqual(response.status_code, 409)
+        response = self.API.post(uri, json=[schema_id, 600, [2.0, 3.0]])
+        self.assertEqual(response.status_code, 404)
+
+        # Test malformed delta posts
+        for route in [uri, '/infoset/api/v1/receive']:
+            response = self.API.post(route, json=[['x'], 300, []])
+            self.assertIn(response.status_code, [400, 404])
+
+        # Test batches of delta and regular posts
+        response = self.API.post(
+            '/infoset/api/v1/receive',
+            json=[[schema_id, 900, [1.0]], _post(900, 'device_2')])
+        self.assertEqual(response.status_code, 200)
+
+        # Test invalid schemas
+        del data['timeseries']
+        response = self.API.post('/infoset/api/v1/schemas', json=data)
+        self.assertEqual(response.status_code, 404)
+
+    def test_receive_busy(self):
+        """Testing method / function receive when the ingester is busy."""
+        # Initializing key variables
+        data = _post(300, 'device')
+        uri = '/infoset/api/v1/receive/{}'.format(data['id_agent'])
+
+        # Test
+        with mock.patch.object(spool, 'full', return_value=True):
+            for route in [uri, '/infoset/api/v1/receive']:
+                response = self.API.post(route, json=data)
+                self.assertEqual(response.status_code, 503)
+                self.assertEqual(
+                    response.headers['Retry-After'],
+                    str(CONFIG.api_spool_retry_after()))
+        self.assertEqual(self._files(), [])
+
+    def test_receive_invalid(self):
+        """Testing method / function receive with invalid data."""
+        # Initializing key variables
+        uri = '/infoset/api/v1/receive/abc'
+        bad_timeseries = _post(300, 'device')
+        bad_timeseries['timeseries']['label']['data'][0][1] = 'text'
+        bad_datapoint = _post(300, 'device')
+        bad_datapoint['timeseries']['label']['data'][0] = [0, 1]
+        bad_structure = _post(300, 'device')
+        bad_structure['timeseries'] = [1, 2]
+        bad_id_agent = _post(300, 'device')
+        bad_id_agent['id_agent'] = 'Not Hex'
+        not_normalized = _post(301, 'device')
+        no_agent = _post(300, 'device')
+        del no_agent['agent']
+
+        # Test
+        for data in [
+                bad_timeseries, bad_datapoint, bad_structure, bad_id_agent,
+                not_normalized, no_agent, [1, 2], 'text']:
+            response = self.API.post(uri, json=data)
+            self.assertEqual(response.status_code, 404)
+        self.assertEqual(self._files(), [])
+
+    def test_receive_batch(self):
+        """Testing method / function receive_batch."""
+        # Initializing key variables
+        uri = '/infoset/api/v1/receive'
+        items = [
+            _post(timestamp, devicename) for timestamp in [300, 600]
+            for devicename in ['device_1', 'device_2']]
+
+        # Test JSON list
+        response = self.API.post(uri, json=items)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            self._files(), sorted(self._filename(data) for data in items))
+        self.tearDown()
+
+        # Test newline delimited JSON
+        body = '\n'.join(json.dumps(data) for data in items)
+        response = self.API.post(
+            uri, data=body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self._files()), len(items))
+        self.tearDown()
+
+        # Nothing is saved if any post is invalid
+        items.append({'timestamp': 'bad', 'id_agent': 1, 'devicename': 2})
+        response = self.API.post(uri, json=items)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self._files(), [])
+
+        # Test bodies that aren't lists
+        for body in [items[0], []]:
+            response = self.API.post(uri, json=body)
+            self.assertEqual(response.status_code, 404)
+        response = self.API.post(
+            uri, data='{"bad', content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    # Test the environment variables
+    unittest_setup.ready()
+
+    # Do the unit test
+    unittest.main()
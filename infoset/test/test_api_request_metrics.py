@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Test the request_metrics library in the infoset.api module."""
+
+import unittest
+from unittest import mock
+import tempfile
+import shutil
+import os
+import sys
+
+# Try to create a working PYTHONPATH
+_TEST_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+_LIB_DIRECTORY = os.path.abspath(os.path.join(_TEST_DIRECTORY, os.pardir))
+_ROOT_DIRECTORY = os.path.abspath(os.path.join(_LIB_DIRECTORY, os.pardir))
+if _TEST_DIRECTORY.endswith('/infoset-ng/infoset/test') is True:
+    sys.path.append(_ROOT_DIRECTORY)
+else:
+    print(
+        'This script is not installed in the "infoset-ng/bin" directory. '
+        'Please fix.')
+    sys.exit(2)
+
+from flask import Flask
+
+from infoset.api import request_metrics
+from infoset.utils import metrics
+from infoset.test import unittest_setup
+
+
+class TestRequestMetrics(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def setUp(self):
+        """Setup the environment prior to testing."""
+        # Initialize key variables
+        self.directory = tempfile.mkdtemp()
+        self.previous = metrics._STATE['directory']
+        metrics.configure(self.directory)
+        metrics._STATE['pid'] = None
+
+    def tearDown(self):
+        """Cleanup the environment after testing."""
+        metrics.configure(self.previous)
+        metrics._STATE['pid'] = None
+        shutil.rmtree(self.directory)
+
+    def test_after_request(self):
+        """Testing function after_request."""
+        # Test
+        app = Flask(__name__)
+        response = mock.Mock(status_code=404)
+        with app.test_request_context('/missing'):
+            self.assertEqual(
+                request_metrics.after_request(response), response)
+            request_metrics.before_request()
+            request_metrics.after_request(response)
+        self.assertEqual(list(metrics._STATE['histograms']), [
+            'infoset_api_request_duration_seconds'
+            '{method="GET",route="unmatched",status="404"}'])
+
+
+if __name__ == '__main__':
+    # Test the environment variables
+    unittest_setup.ready()
+
+    # Do the unit test
+    unittest.main()
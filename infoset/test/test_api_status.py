@@ -2,6 +2,7 @@
 """Test the db_agent library in the infoset.db module."""
 
 import unittest
+import json
 import os
 import sys
 
@@ -18,6 +19,7 @@ else:
     sys.exit(2)
 
 from infoset.api import API
+from infoset.cache import timing
 from infoset.test import unittest_setup
 
 
@@ -42,6 +44,62 @@ class APITestCase(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data, expected)
 
+    def test_cache(self):
+        """Testing method / function cache."""
+        # Initializing key variables
+        response = self.API.get('/infoset/api/v1/status/cache')
+        data = json.loads(response.get_data(as_text=True))
+
+        # Verify reponses
+        self.assertEqual(response.status_code, 200)
+        for key in ['local_hits', 'memcached_hits', 'misses', 'hit_rate']:
+            self.assertTrue(key in data)
+
+    def test_pool(self):
+        """Testing method / function pool."""
+        # Initializing key variables
+        response = self.API.get('/infoset/api/v1/status/pool')
+        data = json.loads(response.get_data(as_text=True))
+
+        # Verify reponses
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue('processes' in data)
+        for key in ['checkouts', 'checked_out', 'limit', 'processes']:
+            self.assertTrue(key in data['totals'])
+
+    def test_ingester(self):
+        """Testing method / function ingester."""
+        # Initializing key variables
+        response = self.API.get('/infoset/api/v1/status/ingester')
+        data = json.loads(response.get_data(as_text=True))
+
+        # Verify reponses
+        self.assertEqual(response.status_code, 200)
+        for key in ['last_cycle', 'totals', 'buckets']:
+            self.assertTrue(key in data)
+        self.assertEqual(
+            sorted(data['totals']['stages']), sorted(timing.STAGES))
+
+    def test_prometheus(self):
+        """Testing method / function prometheus."""
+        # Make a request to be counted
+        self.API.get('/infoset/api/v1/status')
+        response = self.API.get('/infoset/api/v1/metrics')
+        text = response.get_data(as_text=True)
+
+        # Verify reponses
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        for name in [
+                'infoset_api_cache_hit_ratio', 'infoset_spool_files',
+                'infoset_ingest_lag_seconds',
+                'infoset_ingest_datapoints_total',
+                'infoset_ingest_stage_duration_seconds']:
+            self.assertTrue('# TYPE {} '.format(name) in text)
+        self.assertTrue(
+            'infoset_api_request_duration_seconds_count{method="GET",'
+            'route="/infoset/api/v1/status",status="200"}' in text)
+
 
 if __name__ == '__main__':
     # Test the environment variables
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Test the backlog library in the infoset.reference module."""
+
+import unittest
+from unittest import mock
+import tempfile
+import shutil
+import json
+import os
+import sys
+
+# Try to create a working PYTHONPATH
+_TEST_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+_LIB_DIRECTORY = os.path.abspath(os.path.join(_TEST_DIRECTORY, os.pardir))
+_ROOT_DIRECTORY = os.path.abspath(os.path.join(_LIB_DIRECTORY, os.pardir))
+if _TEST_DIRECTORY.endswith('/infoset-ng/infoset/test') is True:
+    sys.path.append(_ROOT_DIRECTORY)
+else:
+    print(
+        'This script is not installed in the "infoset-ng/bin" directory. '
+        'Please fix.')
+    sys.exit(2)
+
+from infoset.reference import backlog
+from infoset.test import unittest_setup
+
+
+class TestBacklog(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def setUp(self):
+        """Setup the environment prior to testing."""
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Cleanup the environment after testing."""
+        shutil.rmtree(self.directory)
+
+    def _segments(self):
+        """Get the names of the segment files."""
+        return sorted(
+            filename for filename in os.listdir(self.directory)
+            if filename.endswith(backlog.SUFFIX))
+
+    def test_put_get_commit(self):
+        """Testing methods put, get and commit."""
+        # Initialize key variables
+        queue = backlog.Backlog(self.directory)
+        for timestamp in range(5):
+            self.assertTrue(queue.put({'timestamp': timestamp}))
+
+        # Data is read in the order it was queued, until committed
+        items = queue.get(3)
+        self.assertEqual(
+            [data['timestamp'] for (_, data) in items], [0, 1, 2])
+        self.assertEqual(queue.get(3), items)
+        queue.commit(items[1][0])
+        self.assertEqual(
+            [data['timestamp'] for (_, data) in queue.get(10)], [2, 3, 4])
+
+        # The backlog is empty once everything is committed
+        queue.commit(queue.get(10)[-1][0])
+        self.assertEqual(queue.get(10), [])
+        self.assertEqual(queue.size(), 0)
+
+        # The position is kept by new Backlog objects
+        queue.put({'timestamp': 5})
+        queue = backlog.Backlog(self.directory)
+        self.assertEqual(
+            [data['timestamp'] for (_, data) in queue.get(10)], [5])
+
+    def test_segments(self):
+        """Testing segment files."""
+        # Initialize key variables
+        queue = backlog.Backlog(self.directory)
+
+        # Test
+        with mock.patch.object(backlog, 'SEGMENT_SIZE', 30):
+            for timestamp in range(6):
+                queue.put({'timestamp': timestamp})
+        self.assertEqual(len(self._segments()), 3)
+
+        # Data is read across segments. Posted segments are deleted
+        items = queue.get(10)
+        self.assertEqual(
+            [data['timestamp'] for (_, data) in items], list(range(6)))
+        queue.commit(items[3][0])
+        self.assertEqual(len(self._segments()), 2)
+        self.assertEqual(
+            [data['timestamp'] for (_, data) in queue.get(10)], [4, 5])
+
+    def test_incomplete(self):
+        """Testing incomplete and corrupted data."""
+        # Initialize key variables
+        queue = backlog.Backlog(self.directory)
+        queue.put({'timestamp': 0})
+        filepath = os.path.join(self.directory, self._segments()[0])
+
+        # Data still being written isn't read
+        with open(filepath, 'a') as f_handle:
+            f_handle.write('{"timestamp"')
+        self.assertEqual(len(queue.get(10)), 1)
+
+        # Corrupted data in older segments is skipped
+        with open(filepath, 'a') as f_handle:
+            f_handle.write(': 1}\n{bad}\n')
+        with mock.patch.object(backlog, 'SEGMENT_SIZE', 1):
+            queue.put({'timestamp': 2})
+        self.assertEqual(
+            [data['timestamp'] for (_, data) in queue.get(10)], [0, 1, 2])
+
+    def test_drop_policy(self):
+        """Testing the drop policies."""
+        # Initialize key variables
+        line_size = len('{"timestamp": 0}\n')
+
+        # New data is discarded
+        queue = backlog.Backlog(
+            self.directory, max_bytes=line_size * 3, drop_policy='newest')
+        for timestamp in range(5):
+            self.assertEqual(
+                queue.put({'timestamp': timestamp}), timestamp < 3)
+        self.assertEqual(
+            [data['timestamp'] for (_, data) in queue.get(10)], [0, 1, 2])
+
+        # The oldest segments are deleted to make room for new data
+        queue.drop_policy = 'oldest'
+        with mock.patch.object(backlog, 'SEGMENT_SIZE', line_size * 2):
+            for timestamp in range(5, 9):
+                self.assertTrue(queue.put({'timestamp': timestamp}))
+        self.assertEqual(
+            [data['timestamp'] for (_, data) in queue.get(10)], [7, 8])
+        self.assertLessEqual(queue.size(), line_size * 3)
+
+        # Data larger than the queue is discarded without dropping any
+        self.assertFalse(queue.put({'timestamp': 'x' * line_size * 3}))
+        self.assertEqual(
+            [data['timestamp'] for (_, data) in queue.get(10)], [7, 8])
+
+    def test_size(self):
+        """Testing method size."""
+        # Initialize key variables
+        line_size = len('{"timestamp": 0}\n')
+        queue = backlog.Backlog(self.directory)
+
+        # The size is kept in the index, so the segments aren't listed
+        with mock.patch.object(backlog, 'SEGMENT_SIZE', line_size * 2):
+            queue.put({'timestamp': 0})
+            with mock.patch.object(
+                    backlog.os, 'listdir', side_effect=AssertionError):
+                for timestamp in range(1, 5):
+                    queue.put({'timestamp': timestamp})
+                self.assertEqual(queue.size(), line_size * 5)
+                queue.commit(queue.get(3)[-1][0])
+                self.assertEqual(queue.size(), line_size * 2)
+        self.assertEqual(len(self._segments()), 2)
+
+        # Indexes written by earlier versions are rebuilt
+        filepath = os.path.join(self.directory, 'index.json')
+        with open(filepath, 'w') as f_handle:
+            json.dump([2, line_size], f_handle)
+        queue = backlog.Backlog(self.directory)
+        self.assertEqual(queue.size(), line_size * 2)
+        self.assertEqual(
+            [data['timestamp'] for (_, data) in queue.get(10)], [3, 4])
+
+
+if __name__ == '__main__':
+    # Test the environment variables
+    unittest_setup.ready()
+
+    # Do the unit test
+    unittest.main()
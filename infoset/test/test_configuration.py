@@ -221,6 +221,72 @@ main:
         # Cleanup files in temp directories
         _delete_files(directory)
 
+    def test_ingest_snapshot_directory(self):
+        """Testing method ingest_snapshot_directory."""
+        # Test the directory is created
+        result = self.config.ingest_snapshot_directory()
+        self.assertEqual(
+            result, ('%s/snapshots') % (self.cache_directory))
+        self.assertTrue(os.path.isdir(result))
+
+        # Cleanup
+        os.rmdir(result)
+
+    def test_ingest_schema_directory(self):
+        """Testing method ingest_schema_directory."""
+        # Test the directory is created
+        result = self.config.ingest_schema_directory()
+        self.assertEqual(
+            result, ('%s/schemas') % (self.cache_directory))
+        self.assertTrue(os.path.isdir(result))
+
+        # Cleanup
+        os.rmdir(result)
+
+    def test_pool_statistics_directory(self):
+        """Testing method pool_statistics_directory."""
+        # Test the directory is created
+        result = self.config.pool_statistics_directory()
+        self.assertEqual(
+            result, ('%s/pool_statistics') % (self.cache_directory))
+        self.assertTrue(os.path.isdir(result))
+
+        # Cleanup
+        os.rmdir(result)
+
+    def test_ingest_statistics_directory(self):
+        """Testing method ingest_statistics_directory."""
+        # Test the directory is created
+        result = self.config.ingest_statistics_directory()
+        self.assertEqual(
+            result, ('%s/ingest_statistics') % (self.cache_directory))
+        self.assertTrue(os.path.isdir(result))
+
+        # Test the profile directory is created in it
+        profiles = self.config.ingest_profile_directory()
+        self.assertEqual(profiles, ('%s/profiles') % (result))
+        self.assertTrue(os.path.isdir(profiles))
+
+        # Cleanup
+        os.rmdir(profiles)
+        os.rmdir(result)
+
+    def test_metrics_directory(self):
+        """Testing method metrics_directory."""
+        # Test the directory is created
+        result = self.config.metrics_directory()
+        self.assertEqual(result, ('%s/metrics') % (self.cache_directory))
+        self.assertTrue(os.path.isdir(result))
+
+        # Cleanup
+        os.rmdir(result)
+
+    def test_ingest_profile(self):
+        """Testing method ingest_profile."""
+        # Testing the default value
+        result = self.config.ingest_profile()
+        self.assertFalse(result)
+
     def test_ingest_pool_size(self):
         """Testing method ingest_pool_size."""
         # Testing ingest_pool_size with good_dict
@@ -539,6 +605,194 @@ main:
         # Cleanup files in temp directories
         _delete_files(directory)
 
+    def test_api_cache_timeout(self):
+        """Testing method api_cache_timeout."""
+        # Testing the default value
+        result = self.config.api_cache_timeout()
+        self.assertEqual(result, 3600)
+
+        # Set the environmental variable for the configuration directory
+        directory = tempfile.mkdtemp()
+        os.environ['INFOSET_CONFIGDIR'] = directory
+        config_file = ('%s/test_config.yaml') % (directory)
+
+        # Testing api_cache_timeout with a configured value
+        good_config = ("""\
+main:
+    api_cache_timeout: 60
+""")
+        good_dict = yaml.safe_load(bytes(good_config, 'utf-8'))
+
+        # Write good_config to file
+        with open(config_file, 'w') as f_handle:
+            yaml.dump(good_dict, f_handle, default_flow_style=True)
+
+        # Create configuration object
+        config = configuration.Config()
+        result = config.api_cache_timeout()
+        self.assertEqual(result, 60)
+
+        # Cleanup files in temp directories
+        _delete_files(directory)
+
+    def test_api_local_cache_size(self):
+        """Testing method api_local_cache_size."""
+        # Testing the default value
+        result = self.config.api_local_cache_size()
+        self.assertEqual(result, 16777216)
+
+    def test_api_local_cache_timeout(self):
+        """Testing method api_local_cache_timeout."""
+        # Testing the default value
+        result = self.config.api_local_cache_timeout()
+        self.assertEqual(result, 60)
+
+    def test_api_worker_class(self):
+        """Testing method api_worker_class."""
+        # Testing the default value
+        result = self.config.api_worker_class()
+        self.assertEqual(result, 'sync')
+
+        # Set the environmental variable for the configuration directory
+        directory = tempfile.mkdtemp()
+        os.environ['INFOSET_CONFIGDIR'] = directory
+        config_file = ('%s/test_config.yaml') % (directory)
+
+        # Testing with a valid value
+        with open(config_file, 'w') as f_handle:
+            yaml.dump(
+                {'main': {'api_worker_class': 'Gevent'}}, f_handle,
+                default_flow_style=True)
+        config = configuration.Config()
+        self.assertEqual(config.api_worker_class(), 'gevent')
+
+        # Testing with an unsupported value
+        with open(config_file, 'w') as f_handle:
+            yaml.dump(
+                {'main': {'api_worker_class': 'tornado'}}, f_handle,
+                default_flow_style=True)
+        config = configuration.Config()
+        with self.assertRaises(SystemExit):
+            config.api_worker_class()
+
+        # Cleanup files in temp directories
+        _delete_files(directory)
+
+    def test_db_storage(self):
+        """Testing method db_storage."""
+        # Testing the default value
+        result = self.config.db_storage()
+        self.assertEqual(result, 'standard')
+
+        # Set the environmental variable for the configuration directory
+        directory = tempfile.mkdtemp()
+        os.environ['INFOSET_CONFIGDIR'] = directory
+        config_file = ('%s/test_config.yaml') % (directory)
+
+        # Testing with a valid value
+        with open(config_file, 'w') as f_handle:
+            yaml.dump(
+                {'main': {'db_storage': 'Compact'}}, f_handle,
+                default_flow_style=True)
+        config = configuration.Config()
+        self.assertEqual(config.db_storage(), 'compact')
+
+        # Testing with an unsupported value
+        with open(config_file, 'w') as f_handle:
+            yaml.dump(
+                {'main': {'db_storage': 'tiny'}}, f_handle,
+                default_flow_style=True)
+        config = configuration.Config()
+        with self.assertRaises(SystemExit):
+            config.db_storage()
+
+        # Cleanup files in temp directories
+        _delete_files(directory)
+
+    def test_db_compression(self):
+        """Testing method db_compression."""
+        # Testing the default value
+        result = self.config.db_compression()
+        self.assertEqual(result, False)
+
+    def test_api_worker_connections(self):
+        """Testing method api_worker_connections."""
+        # Testing the default value
+        result = self.config.api_worker_connections()
+        self.assertEqual(result, 1000)
+
+    def test_api_workers(self):
+        """Testing method api_workers."""
+        # Testing the default value
+        result = self.config.api_workers()
+        self.assertIsNone(result)
+
+    def test_api_threads(self):
+        """Testing method api_threads."""
+        # Testing the default value
+        result = self.config.api_threads()
+        self.assertEqual(result, 1)
+
+    def test_api_keepalive(self):
+        """Testing method api_keepalive."""
+        # Testing the default value
+        result = self.config.api_keepalive()
+        self.assertEqual(result, 2)
+
+    def test_api_max_requests(self):
+        """Testing method api_max_requests."""
+        # Testing the default value
+        result = self.config.api_max_requests()
+        self.assertEqual(result, 0)
+
+    def test_api_max_requests_jitter(self):
+        """Testing method api_max_requests_jitter."""
+        # Testing the default value
+        result = self.config.api_max_requests_jitter()
+        self.assertEqual(result, 0)
+
+    def test_api_preload_app(self):
+        """Testing method api_preload_app."""
+        # Testing the default value
+        result = self.config.api_preload_app()
+        self.assertFalse(result)
+
+    def test_api_spool_max_files(self):
+        """Testing method api_spool_max_files."""
+        # Testing the default value
+        result = self.config.api_spool_max_files()
+        self.assertEqual(result, 100000)
+
+    def test_api_spool_max_bytes(self):
+        """Testing method api_spool_max_bytes."""
+        # Testing the default value
+        result = self.config.api_spool_max_bytes()
+        self.assertEqual(result, 1073741824)
+
+    def test_api_spool_retry_after(self):
+        """Testing method api_spool_retry_after."""
+        # Testing the default value
+        result = self.config.api_spool_retry_after()
+        self.assertEqual(result, 60)
+
+    def test_sqlalchemy_pool_timeout(self):
+        """Testing method sqlalchemy_pool_timeout."""
+        # Testing the default value
+        result = self.config.sqlalchemy_pool_timeout()
+        self.assertEqual(result, 30)
+
+    def test_sqlalchemy_pool_recycle(self):
+        """Testing method sqlalchemy_pool_recycle."""
+        # Testing the default value
+        result = self.config.sqlalchemy_pool_recycle()
+        self.assertEqual(result, 600)
+
+    def test_sqlalchemy_pool_pre_ping(self):
+        """Testing method sqlalchemy_pool_pre_ping."""
+        # Testing the default value
+        result = self.config.sqlalchemy_pool_pre_ping()
+        self.assertFalse(result)
+
     def test_db_hostname(self):
         """Testing method db_hostname."""
         result = self.config.db_hostname()
@@ -739,6 +993,42 @@ main:
         # Cleanup files in temp directories
         _delete_files(directory)
 
+    def test_cached(self):
+        """Testing function cached."""
+        # Set the environmental variable for the configuration directory
+        directory = tempfile.mkdtemp()
+        os.environ['INFOSET_CONFIGDIR'] = directory
+        config_file = ('%s/test_config.yaml') % (directory)
+        with open(config_file, 'w') as f_handle:
+            yaml.dump(self.good_dict, f_handle, default_flow_style=True)
+
+        # The same object is returned if nothing has changed
+        config = configuration.cached()
+        self.assertEqual(config.interval(), 300)
+        self.assertIs(configuration.cached(), config)
+
+        # Change the interval in the configuration file
+        new_dict = yaml.safe_load(yaml.dump(self.good_dict))
+        new_dict['main']['interval'] = 600
+        with open(config_file, 'w') as f_handle:
+            yaml.dump(new_dict, f_handle, default_flow_style=True)
+        os.utime(config_file, (1, 1))
+
+        # Changes are detected by the file modification time check
+        check_interval = configuration.RELOAD_CHECK_INTERVAL
+        configuration.RELOAD_CHECK_INTERVAL = 0
+        result = configuration.cached()
+        configuration.RELOAD_CHECK_INTERVAL = check_interval
+        self.assertIsNot(result, config)
+        self.assertEqual(result.interval(), 600)
+
+        # Test an explicit reload
+        configuration.reload()
+        self.assertIsNot(configuration.cached(), result)
+
+        # Cleanup files in temp directories
+        _delete_files(directory)
+
 
 def _delete_files(directory):
     """Delete all files in directory."""
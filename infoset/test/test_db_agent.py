@@ -257,6 +257,22 @@ class Other(unittest.TestCase):
         self.assertEqual(
             result[0]['idx_agentname'], self.expected['idx_agentname'])
 
+    def test_get_all_agents_pagination(self):
+        """Testing function get_all_agents with pagination."""
+        # Testing with known good value
+        result = db_agent.get_all_agents(limit=1)
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0]['idx_agent'], self.expected['idx_agent'])
+
+        # Testing the page after the known good value
+        result = db_agent.get_all_agents(after=self.expected['idx_agent'])
+        for item in result:
+            self.assertGreater(item['idx_agent'], self.expected['idx_agent'])
+
+        # Testing an empty page
+        result = db_agent.get_all_agents(limit=0)
+        self.assertEqual(result, [])
+
 
 if __name__ == '__main__':
     # Test the environment variables
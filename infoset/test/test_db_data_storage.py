@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Test the data_storage library in the infoset.db module."""
+
+import unittest
+from unittest import mock
+import os
+import sys
+
+# Try to create a working PYTHONPATH
+_TEST_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+_LIB_DIRECTORY = os.path.abspath(os.path.join(_TEST_DIRECTORY, os.pardir))
+_ROOT_DIRECTORY = os.path.abspath(os.path.join(_LIB_DIRECTORY, os.pardir))
+if _TEST_DIRECTORY.endswith('/infoset-ng/infoset/test') is True:
+    sys.path.append(_ROOT_DIRECTORY)
+else:
+    print(
+        'This script is not installed in the "infoset-ng/bin" directory. '
+        'Please fix.')
+    sys.exit(2)
+
+from sqlalchemy.dialects import mysql
+
+from infoset.db import data_storage
+from infoset.test import unittest_setup
+
+
+class _Connection(object):
+    """Connection recording the statements it executes."""
+
+    def __init__(self, counts=None, results=None):
+        """Initialize the class."""
+        self.dialect = mysql.dialect()
+        self.statements = []
+        self.counts = list(counts or [])
+        self.results = list(results or [])
+
+    def execute(self, statement, **kwargs):
+        """Record a statement."""
+        self.statements.append((' '.join(str(statement).split()), kwargs))
+        result = mock.Mock()
+        if str(statement).startswith('INSERT') is True:
+            result.rowcount = self.counts.pop(0)
+        elif bool(self.results) is True:
+            result.fetchone.return_value = self.results.pop(0)
+        return result
+
+    def begin(self):
+        """Start a transaction."""
+        return mock.MagicMock()
+
+
+class TestDataStorage(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def test_create(self):
+        """Testing function create."""
+        # Test a compact compressed table
+        connection = _Connection()
+        data_storage.create(connection, 'iset_data_new', 'compact', True)
+        self.assertEqual(
+            [sql for (sql, _) in connection.statements], [
+                'CREATE TABLE iset_data_new LIKE iset_data',
+                'ALTER TABLE iset_data_new MODIFY timestamp INTEGER UNSIGNED '
+                'NOT NULL, MODIFY value DOUBLE NULL DEFAULT NULL, '
+                'ROW_FORMAT=COMPRESSED, KEY_BLOCK_SIZE=8'])
+
+        # Test a standard table
+        connection = _Connection()
+        data_storage.create(connection, 'iset_data_new', 'standard', False)
+        self.assertEqual(
+            connection.statements[1][0],
+            'ALTER TABLE iset_data_new MODIFY timestamp BIGINT UNSIGNED '
+            'NOT NULL, MODIFY value NUMERIC(40, 10) NULL DEFAULT NULL, '
+            'ROW_FORMAT=DEFAULT, KEY_BLOCK_SIZE=0')
+
+    def test_copy(self):
+        """Testing function copy."""
+        # Each batch continues from the last row copied
+        connection = _Connection(
+            counts=[2, 1, 0], results=[(1, 600), (2, 300)])
+        progress = []
+        result = data_storage.copy(
+            connection, 'iset_data', 'iset_data_new', batch_size=2,
+            progress=progress.append)
+        self.assertEqual(result, 3)
+        self.assertEqual(progress, [2, 3])
+        inserts = [
+            kwargs for (sql, kwargs) in connection.statements
+            if sql.startswith('INSERT') is True]
+        self.assertEqual(inserts, [
+            {'idx_datapoint': 0, 'timestamp': -1, 'limit': 2},
+            {'idx_datapoint': 1, 'timestamp': 600, 'limit': 2},
+            {'idx_datapoint': 2, 'timestamp': 300, 'limit': 2}])
+
+
+if __name__ == '__main__':
+    # Test the environment variables
+    unittest_setup.ready()
+
+    # Do the unit test
+    unittest.main()
@@ -273,6 +273,19 @@ class TestFunctions(unittest.TestCase):
             for key, _ in result.items():
                 self.assertEqual(result[key], self.expected[key])
 
+    def test_get_all_device_agents_pagination(self):
+        """Testing function get_all_device_agents with pagination."""
+        # Testing with known good value
+        results = db_deviceagent.get_all_device_agents(limit=1)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(
+            results[0]['idx_deviceagent'], self.expected['idx_deviceagent'])
+
+        # There should be nothing after the only item
+        results = db_deviceagent.get_all_device_agents(
+            after=self.expected['idx_deviceagent'])
+        self.assertEqual(results, [])
+
 
 if __name__ == '__main__':
     # Test the environment variables
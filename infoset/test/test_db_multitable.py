@@ -18,6 +18,7 @@ else:
     sys.exit(2)
 
 from infoset.db import db_multitable
+from infoset.utils import configuration
 from infoset.test import unittest_setup_db
 from infoset.test import unittest_setup
 
@@ -59,6 +60,43 @@ class TestFunctions(unittest.TestCase):
             for key, _ in data_dict.items():
                 self.assertEqual(data_dict[key], self.expected[key])
 
+    def test_datapoint_summary_list_iterator(self):
+        """Testing function datapoint_summary_list_iterator."""
+        # Start testing
+        results = list(db_multitable.datapoint_summary_list_iterator())
+        self.assertEqual(results, db_multitable.datapoint_summary_list())
+        for data_dict in results:
+            for key, _ in data_dict.items():
+                self.assertEqual(data_dict[key], self.expected[key])
+
+    def test_update_datapoint_summary_snapshot(self):
+        """Testing function update_datapoint_summary_snapshot."""
+        # Remove any existing snapshot
+        config = configuration.Config()
+        filepath = os.path.join(
+            config.ingest_snapshot_directory(),
+            db_multitable.SNAPSHOT_FILENAME)
+        if os.path.isfile(filepath) is True:
+            os.remove(filepath)
+
+        # Only new datapoints are added
+        result = db_multitable.update_datapoint_summary_snapshot(config)
+        self.assertEqual(result, len(db_multitable.datapoint_summary()))
+        result = db_multitable.update_datapoint_summary_snapshot(config)
+        self.assertEqual(result, 0)
+        self.assertTrue(os.path.isfile(filepath))
+
+    def test_datapoint_summary_snapshot(self):
+        """Testing function datapoint_summary_snapshot."""
+        # Test with the snapshot file
+        config = configuration.Config()
+        db_multitable.update_datapoint_summary_snapshot(config)
+        result = db_multitable.datapoint_summary_snapshot(config)
+        self.assertEqual(result, db_multitable.datapoint_summary())
+
+        # The file is only read when it changes
+        self.assertIs(db_multitable.datapoint_summary_snapshot(config), result)
+
     def test__datapoint_summary(self):
         """Testing function _datapoint_summary."""
         # Tested by test_datapoint_summary and test_datapoint_summary_list
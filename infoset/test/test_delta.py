@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Test the delta library in the infoset.cache module."""
+
+import unittest
+import copy
+import os
+import sys
+
+# Try to create a working PYTHONPATH
+_TEST_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+_LIB_DIRECTORY = os.path.abspath(os.path.join(_TEST_DIRECTORY, os.pardir))
+_ROOT_DIRECTORY = os.path.abspath(os.path.join(_LIB_DIRECTORY, os.pardir))
+if _TEST_DIRECTORY.endswith('/infoset-ng/infoset/test') is True:
+    sys.path.append(_ROOT_DIRECTORY)
+else:
+    print(
+        'This script is not installed in the "infoset-ng/bin" directory. '
+        'Please fix.')
+    sys.exit(2)
+
+from infoset.cache import delta
+from infoset.utils import general
+from infoset.test import unittest_setup
+
+# Agent post
+DATA = {
+    'timestamp': 300,
+    'id_agent': general.hashstring('test_agent'),
+    'agent': 'test_agent',
+    'devicename': 'device',
+    'timeseries': {
+        'label_b': {
+            'base_type': 32, 'description': 'description_b',
+            'data': [[0, 1, 'source_0'], [1, 2, 'source_1']]},
+        'label_a': {
+            'base_type': 1, 'description': 'description_a',
+            'data': [['eth0', 3.5, 'source_2']]}},
+    'timefixed': {
+        'label_c': {
+            'base_type': None, 'description': 'description_c',
+            'data': [[0, 'version 1', 'source_3']]}}
+}
+
+
+class TestFunctions(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def test_datapoints(self):
+        """Testing function datapoints."""
+        # Test
+        result = delta.datapoints(DATA)
+        self.assertEqual(
+            [(item[1], item[4]) for item in result],
+            [('label_a', 'eth0'), ('label_b', 0), ('label_b', 1),
+             ('label_c', 0)])
+        self.assertEqual(
+            [item[5] for item in result], [3.5, 1, 2, 'version 1'])
+
+    def test_register(self):
+        """Testing function register."""
+        # Test
+        schema = delta.register(DATA)
+        self.assertEqual(len(schema['datapoints']), 4)
+        self.assertEqual(delta.get(schema['schema_id']), schema)
+
+        # The schema doesn't depend on the values or timestamp
+        data = copy.deepcopy(DATA)
+        data['timestamp'] = 600
+        data['timeseries']['label_a']['data'][0][1] = 7
+        self.assertEqual(
+            delta.register(data)['schema_id'], schema['schema_id'])
+
+        # It depends on the metadata
+        data['timeseries']['label_a']['description'] = 'new'
+        self.assertNotEqual(
+            delta.register(data)['schema_id'], schema['schema_id'])
+
+        # Test invalid posts
+        for data in [{}, {'timeseries': []}, DATA['timeseries']]:
+            self.assertEqual(delta.register(data), None)
+
+        # Test unknown schemas
+        for schema_id in ['abc', '../abc', None]:
+            self.assertEqual(delta.get(schema_id), None)
+
+    def test_expand(self):
+        """Testing function expand."""
+        # Initialize key variables
+        schema = delta.register(DATA)
+        values = [item[5] for item in delta.datapoints(DATA)]
+
+        # Test
+        (information, id_datapoints) = delta.expand(
+            [schema['schema_id'], 300, values])
+        self.assertEqual(information, DATA)
+        self.assertEqual(
+            id_datapoints['timeseries']['label_b'],
+            [delta.id_datapoint(
+                DATA['id_agent'], 'label_b', index, 'test_agent', 'device')
+             for index in [0, 1]])
+
+        # Test invalid delta posts
+        for data in [
+                ['abc', 300, values], [schema['schema_id'], 300, values[1:]],
+                [schema['schema_id'], 'bad', values],
+                [schema['schema_id'], 301, values],
+                [schema['schema_id'], 300, ['text', 1, 2, 'version 1']]]:
+            self.assertEqual(delta.expand(data), (None, None))
+
+    def test_is_delta(self):
+        """Testing function is_delta."""
+        # Test
+        self.assertTrue(delta.is_delta(['abc', 300, []]))
+        self.assertFalse(delta.is_delta(DATA))
+        self.assertFalse(delta.is_delta(['abc', 300]))
+        self.assertFalse(delta.is_delta([['abc'], 300, []]))
+
+
+if __name__ == '__main__':
+    # Test the environment variables
+    unittest_setup.ready()
+
+    # Do the unit test
+    unittest.main()
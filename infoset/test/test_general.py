@@ -321,6 +321,12 @@ class KnownValues(unittest.TestCase):
         # Initialize key variables
         pass
 
+    def test_monkey_patch(self):
+        """Test function monkey_patch."""
+        # Synchronous workers don't patch the standard library
+        result = general.monkey_patch('sync')
+        self.assertFalse(result)
+
 
 if __name__ == '__main__':
     # Test the environment variables
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Test the lru library in the infoset.utils module."""
+
+import unittest
+import time
+import os
+import sys
+
+# Try to create a working PYTHONPATH
+_TEST_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+_LIB_DIRECTORY = os.path.abspath(os.path.join(_TEST_DIRECTORY, os.pardir))
+_ROOT_DIRECTORY = os.path.abspath(os.path.join(_LIB_DIRECTORY, os.pardir))
+if _TEST_DIRECTORY.endswith('/infoset-ng/infoset/test') is True:
+    sys.path.append(_ROOT_DIRECTORY)
+else:
+    print(
+        'This script is not installed in the "infoset-ng/bin" directory. '
+        'Please fix.')
+    sys.exit(2)
+
+from infoset.utils import lru
+from infoset.test import unittest_setup
+
+
+class TestLocalCache(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def test_get(self):
+        """Testing method get."""
+        # Test with a missing key
+        cache = lru.LocalCache()
+        self.assertIsNone(cache.get('missing'))
+
+        # Values are copies, not the stored object
+        value = {'key': [1, 2, 3]}
+        cache.set('key', value)
+        result = cache.get('key')
+        self.assertEqual(result, value)
+        result['key'].append(4)
+        self.assertEqual(cache.get('key'), value)
+
+        # Test expiry
+        cache.set('expires', 1, timeout=1)
+        self.assertEqual(cache.get('expires'), 1)
+        time.sleep(1.1)
+        self.assertIsNone(cache.get('expires'))
+
+    def test_set(self):
+        """Testing method set."""
+        # Values larger than an eighth of the cache are not stored
+        cache = lru.LocalCache(size=8000)
+        self.assertFalse(cache.set('big', 'x' * 2000))
+        self.assertIsNone(cache.get('big'))
+
+        # Least recently used values are discarded when full
+        for key in range(10):
+            self.assertTrue(cache.set(key, 'x' * 900))
+            cache.get(0)
+        self.assertTrue(cache.used <= 8000)
+        self.assertIsNotNone(cache.get(0))
+        self.assertIsNone(cache.get(1))
+        self.assertIsNotNone(cache.get(9))
+
+    def test_delete(self):
+        """Testing method delete."""
+        cache = lru.LocalCache()
+        cache.set('key', 'value')
+        cache.delete('key')
+        self.assertIsNone(cache.get('key'))
+        self.assertEqual(cache.used, 0)
+
+    def test_clear(self):
+        """Testing method clear."""
+        cache = lru.LocalCache()
+        cache.set('key', 'value')
+        cache.clear()
+        self.assertIsNone(cache.get('key'))
+        self.assertEqual(cache.used, 0)
+
+
+if __name__ == '__main__':
+    # Test the environment variables
+    unittest_setup.ready()
+
+    # Do the unit test
+    unittest.main()
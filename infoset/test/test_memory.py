@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""Test the memory library in the infoset.utils module."""
+
+import unittest
+from unittest import mock
+import os
+import sys
+
+# Try to create a working PYTHONPATH
+_TEST_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+_LIB_DIRECTORY = os.path.abspath(os.path.join(_TEST_DIRECTORY, os.pardir))
+_ROOT_DIRECTORY = os.path.abspath(os.path.join(_LIB_DIRECTORY, os.pardir))
+if _TEST_DIRECTORY.endswith('/infoset-ng/infoset/test') is True:
+    sys.path.append(_ROOT_DIRECTORY)
+else:
+    print(
+        'This script is not installed in the "infoset-ng/bin" directory. '
+        'Please fix.')
+    sys.exit(2)
+
+from infoset.utils import memory
+from infoset.utils import configuration
+from infoset.utils import general
+from infoset.api import API
+from infoset.test import unittest_setup
+
+
+class TestCache(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    # Create cache object
+    cache = memory.Cache(configuration.Config())
+
+    def test_generation(self):
+        """Testing method generation."""
+        # Create a new counter
+        key = memory.generation_key(
+            'datapoint', general.randomstring())
+        result = self.cache.generation(key)
+        self.assertTrue(isinstance(result, int))
+
+        # The value doesn't change until it is incremented
+        self.assertEqual(self.cache.generation(key), result)
+
+    def test_stamp(self):
+        """Testing method stamp."""
+        # Counters get a value the overall counter hasn't had before
+        keys = [
+            memory.generation_key('datapoint', general.randomstring())
+            for _ in range(3)]
+        before = [self.cache.generation(key) for key in keys]
+        self.cache.stamp(keys)
+        after = [self.cache.generation(key) for key in keys]
+        self.assertEqual(len(set(after)), 1)
+        self.assertEqual(
+            after[0], self.cache.generation(memory.generation_key()))
+        for (old, new) in zip(before, after):
+            self.assertTrue(new > old)
+
+        # Stamped counters change every time
+        self.cache.stamp(keys[:1])
+        self.assertNotEqual(self.cache.generation(keys[0]), after[0])
+        self.assertEqual(self.cache.generation(keys[1]), after[1])
+
+        # Counters that don't exist are created
+        key = memory.generation_key('deviceagent', general.randomstring())
+        self.cache.stamp([key])
+        self.assertTrue(isinstance(self.cache.get(key), int))
+
+
+class TestTieredCache(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    # Create cache object
+    config = configuration.Config()
+    cache = memory.TieredCache(
+        servers=['{}:{}'.format(
+            config.memcached_hostname(), config.memcached_port())],
+        local_size=1048576)
+
+    def test_get(self):
+        """Testing method get."""
+        # Values are read locally once set
+        key = general.randomstring()
+        self.cache.set(key, 'value')
+        self.cache._client.delete(key)
+        self.assertEqual(self.cache.get(key), 'value')
+
+        # Values read from memcached are stored locally
+        key = general.randomstring()
+        self.cache._client.set(key, 'value')
+        self.assertEqual(self.cache.get(key), 'value')
+        self.assertEqual(self.cache.local.get(key), 'value')
+
+    def test_delete(self):
+        """Testing method delete."""
+        key = general.randomstring()
+        self.cache.set(key, 'value')
+        self.cache.delete(key)
+        self.assertIsNone(self.cache.get(key))
+
+    def test_single_flight(self):
+        """Testing recomputation of missing values."""
+        # Initialize key variables
+        other = memory.TieredCache(
+            servers=['{}:{}'.format(
+                self.config.memcached_hostname(),
+                self.config.memcached_port())],
+            local_size=1048576)
+
+        with API.test_request_context('/'):
+            # The first process to miss gets the lock to recompute the value
+            path = general.randomstring()
+            key = memory.cache_key(path, 6000, 1, [])
+            self.assertIsNone(self.cache.get(key))
+            self.assertFalse(self.cache.acquire(key))
+            self.cache.set(key, 'first')
+
+            # The previous value is returned while the value is recomputed
+            key = memory.cache_key(path, 6000, 2, [])
+            self.assertIsNone(self.cache.get(key))
+            self.assertEqual(other.get(key), 'first')
+
+            # Only the process holding the lock releases it
+            other.set(key, 'other')
+            self.assertFalse(self.cache.acquire(key))
+
+            # The lock is released when the value is set
+            self.cache.set(key, 'second')
+            self.assertTrue(self.cache.acquire(key))
+            self.cache.release(key)
+
+    def test_statistics(self):
+        """Testing hit and miss counters."""
+        # Test the counters of this process
+        cache = memory.TieredCache(
+            servers=['{}:{}'.format(
+                self.config.memcached_hostname(),
+                self.config.memcached_port())],
+            local_size=1048576)
+        key = general.randomstring()
+        cache.get(key)
+        cache.set(key, 'value')
+        cache.get(key)
+        self.assertEqual(cache.statistics['misses'], 1)
+        self.assertEqual(cache.statistics['local_hits'], 1)
+
+        # Test the counters shared by all processes
+        result = memory.Cache(self.config).statistics()
+        self.assertTrue('hit_rate' in result)
+
+
+class TestFunctions(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def test_cache_key(self):
+        """Testing function cache_key."""
+        # The order of the arguments doesn't matter
+        result = memory.cache_key(
+            '/infoset/api/v1/agents', 6000, 1, [('a', '1'), ('b', '2')])
+        expected = memory.cache_key(
+            '/infoset/api/v1/agents', '6000', 1, [('b', '2'), ('a', '1')])
+        self.assertEqual(result, expected)
+        self.assertEqual(len(result), len('infoset_flask__1') + 64)
+
+        # Test with different generations
+        expected = memory.cache_key(
+            '/infoset/api/v1/agents', 6000, 2, [('a', '1'), ('b', '2')])
+        self.assertNotEqual(result, expected)
+
+        # Test with different arguments
+        expected = memory.cache_key(
+            '/infoset/api/v1/agents', 6000, 1, [('a', '1'), ('b', '3')])
+        self.assertNotEqual(result, expected)
+
+    def test_flask_cache_key(self):
+        """Testing function flask_cache_key."""
+        # Initialize key variables
+        keys = {}
+        urls = [
+            '/infoset/api/v1/datapoints/1/data',
+            '/infoset/api/v1/datapoints/1/data?secondsago=3600',
+            '/infoset/api/v1/datapoints/1/data?ts_start=300&ts_stop=600',
+            '/infoset/api/v1/lastcontacts/deviceagents/1',
+            '/infoset/api/v1/lastcontacts/deviceagents/1?ts_start=300',
+            '/infoset/api/v1/devices/1']
+
+        # Get the keys of requests at two different times
+        for timestamp in [300, 600]:
+            with mock.patch.object(
+                    general, 'normalized_timestamp', return_value=timestamp):
+                for url in urls:
+                    with API.test_request_context(url):
+                        keys.setdefault(url, set()).add(
+                            memory.flask_cache_key())
+
+        # Only the keys of windows relative to the current time change
+        self.assertEqual(
+            [len(keys[url]) for url in urls], [2, 2, 1, 2, 1, 1])
+
+    def test_stale_key(self):
+        """Testing function stale_key."""
+        # Keys of the same request have the same stale key
+        key = memory.cache_key('/infoset/api/v1/agents', 6000, 1, [])
+        result = memory.stale_key(key)
+        expected = memory.stale_key(
+            memory.cache_key('/infoset/api/v1/agents', 6000, 2, []))
+        self.assertEqual(result, expected)
+        self.assertNotEqual(result, key)
+
+        # Test with keys not created by cache_key
+        self.assertIsNone(memory.stale_key('infoset_generation_all'))
+
+    def test_generation_key(self):
+        """Testing function generation_key."""
+        # Test the key for all data
+        result = memory.generation_key()
+        self.assertEqual(result, 'infoset_generation_all')
+
+        # Test the key for a single row
+        result = memory.generation_key('datapoint', 10)
+        self.assertEqual(result, 'infoset_generation_datapoint_10')
+
+
+if __name__ == '__main__':
+    # Test the environment variables
+    unittest_setup.ready()
+
+    # Do the unit test
+    unittest.main()
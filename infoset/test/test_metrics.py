@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Test the metrics library in the infoset.utils module."""
+
+import unittest
+import tempfile
+import shutil
+import json
+import os
+import sys
+
+# Try to create a working PYTHONPATH
+_TEST_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+_LIB_DIRECTORY = os.path.abspath(os.path.join(_TEST_DIRECTORY, os.pardir))
+_ROOT_DIRECTORY = os.path.abspath(os.path.join(_LIB_DIRECTORY, os.pardir))
+if _TEST_DIRECTORY.endswith('/infoset-ng/infoset/test') is True:
+    sys.path.append(_ROOT_DIRECTORY)
+else:
+    print(
+        'This script is not installed in the "infoset-ng/bin" directory. '
+        'Please fix.')
+    sys.exit(2)
+
+from infoset.utils import metrics
+from infoset.test import unittest_setup
+
+
+class TestMetrics(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def setUp(self):
+        """Setup the environment prior to testing."""
+        # Initialize key variables
+        self.directory = tempfile.mkdtemp()
+        self.previous = metrics._STATE['directory']
+        metrics.configure(self.directory)
+        metrics._STATE['pid'] = None
+
+    def tearDown(self):
+        """Cleanup the environment after testing."""
+        metrics.configure(self.previous)
+        metrics._STATE['pid'] = None
+        shutil.rmtree(self.directory)
+
+    def test_series(self):
+        """Testing function series."""
+        # Test
+        self.assertEqual(metrics.series('name'), 'name')
+        self.assertEqual(
+            metrics.series('name', {'b': 'x"y', 'a': 1}),
+            'name{a="1",b="x\\"y"}')
+
+    def test_write(self):
+        """Testing function write."""
+        # Test
+        metrics.increment('infoset_db_query_errors_total', value=2)
+        metrics.observe('infoset_db_query_duration_seconds', 0.02)
+        metrics.write()
+        filepath = os.path.join(self.directory, '{}.json'.format(os.getpid()))
+        with open(filepath, 'r') as f_handle:
+            data = json.load(f_handle)
+        self.assertEqual(
+            data['counters'], {'infoset_db_query_errors_total': 2})
+        histogram = data['histograms']['infoset_db_query_duration_seconds']
+        self.assertEqual(histogram['count'], 1)
+        self.assertEqual(histogram['buckets'][2], 1)
+
+        # Files aren't written again until STATISTICS_INTERVAL has passed
+        metrics.increment('infoset_db_query_errors_total')
+        metrics.write()
+        self.assertEqual(metrics.collect(self.directory)['counters'], {
+            'infoset_db_query_errors_total': 2})
+        metrics.write(force=True)
+        self.assertEqual(metrics.collect(self.directory)['counters'], {
+            'infoset_db_query_errors_total': 3})
+
+    def test_collect(self):
+        """Testing function collect."""
+        # Write the files of this process and a stopped one
+        metrics.increment('infoset_db_query_errors_total')
+        metrics.write()
+        stopped = {
+            'pid': 999999999,
+            'counters': {'infoset_db_query_errors_total': 5},
+            'histograms': {}}
+        with open(os.path.join(
+                self.directory, '999999999.json'), 'w') as f_handle:
+            json.dump(stopped, f_handle)
+
+        # The stopped process is archived, and still counted
+        for _ in range(2):
+            result = metrics.collect(self.directory)
+            self.assertEqual(
+                result['counters']['infoset_db_query_errors_total'], 6)
+        self.assertFalse(
+            os.path.exists(os.path.join(self.directory, '999999999.json')))
+
+    def test_render(self):
+        """Testing function render."""
+        # Test
+        histogram = {'count': 2, 'sum': 1.5, 'buckets': [1, 0, 1],
+                     'limits': [0.1, 1]}
+        result = metrics.render(
+            {'infoset_ingest_files_total': 3},
+            {'infoset_ingest_stage_duration_seconds{stage="read"}': histogram},
+            {'infoset_spool_bytes': 10})
+        lines = result.splitlines()
+        self.assertIn('# TYPE infoset_ingest_files_total counter', lines)
+        self.assertIn('infoset_ingest_files_total 3', lines)
+        self.assertIn('# TYPE infoset_spool_bytes gauge', lines)
+        self.assertIn('infoset_spool_bytes 10', lines)
+        for line in [
+                'infoset_ingest_stage_duration_seconds_bucket'
+                '{stage="read",le="0.1"} 1',
+                'infoset_ingest_stage_duration_seconds_bucket'
+                '{stage="read",le="1"} 1',
+                'infoset_ingest_stage_duration_seconds_bucket'
+                '{stage="read",le="+Inf"} 2',
+                'infoset_ingest_stage_duration_seconds_sum'
+                '{stage="read"} 1.5',
+                'infoset_ingest_stage_duration_seconds_count'
+                '{stage="read"} 2']:
+            self.assertIn(line, lines)
+
+
+if __name__ == '__main__':
+    # Test the environment variables
+    unittest_setup.ready()
+
+    # Do the unit test
+    unittest.main()
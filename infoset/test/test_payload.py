@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Test the payload library in the infoset.utils module."""
+
+import unittest
+import tempfile
+import shutil
+import gzip
+import os
+import sys
+
+# Try to create a working PYTHONPATH
+_TEST_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+_LIB_DIRECTORY = os.path.abspath(os.path.join(_TEST_DIRECTORY, os.pardir))
+_ROOT_DIRECTORY = os.path.abspath(os.path.join(_LIB_DIRECTORY, os.pardir))
+if _TEST_DIRECTORY.endswith('/infoset-ng/infoset/test') is True:
+    sys.path.append(_ROOT_DIRECTORY)
+else:
+    print(
+        'This script is not installed in the "infoset-ng/bin" directory. '
+        'Please fix.')
+    sys.exit(2)
+
+from infoset.utils import payload
+from infoset.test import unittest_setup
+
+# Data to encode
+DATA = {
+    'timestamp': 300,
+    'id_agent': 'abc',
+    'devicename': 'device',
+    'timeseries': {
+        'label': {
+            'base_type': 1, 'description': 'description',
+            'data': [[0, 1.5, 'source'], [1, 2, None]]}}
+}
+
+
+class TestFunctions(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def setUp(self):
+        """Setup the environment prior to testing."""
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Cleanup the environment after testing."""
+        shutil.rmtree(self.directory)
+
+    def test_available(self):
+        """Testing function available."""
+        # Test
+        self.assertEqual(payload.available('json'), True)
+        self.assertEqual(payload.available('yaml'), False)
+
+    def test_format_of_mimetype(self):
+        """Testing function format_of_mimetype."""
+        # Test
+        self.assertEqual(
+            payload.format_of_mimetype('application/json'), 'json')
+        self.assertEqual(
+            payload.format_of_mimetype('application/x-msgpack'), 'msgpack')
+        self.assertEqual(
+            payload.format_of_mimetype('application/cbor'), 'cbor')
+        self.assertEqual(payload.format_of_mimetype('text/plain'), None)
+
+    def test_loads(self):
+        """Testing function loads."""
+        # Test every available format
+        for payload_format in payload.FORMATS:
+            if payload.available(payload_format) is False:
+                continue
+            encoded = payload.dumps(DATA, payload_format)
+            self.assertEqual(payload.loads(encoded, payload_format), DATA)
+
+            # Test invalid data
+            with self.assertRaises(ValueError):
+                payload.loads(b'\xc1\xff{', payload_format)
+
+        # Test unknown formats
+        with self.assertRaises(ValueError):
+            payload.loads(b'{}', 'xml')
+
+    def test_load(self):
+        """Testing function load."""
+        # Test every available format
+        for payload_format in payload.FORMATS:
+            if payload.available(payload_format) is False:
+                continue
+            filepath = os.path.join(
+                self.directory, '300_abc_def.{}'.format(payload_format))
+            with open(filepath, 'wb') as f_handle:
+                f_handle.write(payload.dumps(DATA, payload_format))
+            self.assertEqual(payload.load(filepath), DATA)
+
+    def test_decompress(self):
+        """Testing function decompress."""
+        # Initialize key variables
+        data = payload.dumps(DATA)
+
+        # Test
+        self.assertEqual(payload.decompress(data, None), data)
+        self.assertEqual(
+            payload.decompress(payload.compress(data), 'gzip'), data)
+        self.assertEqual(
+            payload.decompress(gzip.compress(data), 'x-gzip'), data)
+        with self.assertRaises(ValueError):
+            payload.decompress(data, 'gzip')
+        with self.assertRaises(ValueError):
+            payload.decompress(data, 'br')
+
+        # Data that decompresses to more than the maximum size is refused
+        large = payload.compress(b' ' * (payload.MAXIMUM_SIZE + 1))
+        with self.assertRaises(ValueError):
+            payload.decompress(large, 'gzip')
+
+
+if __name__ == '__main__':
+    # Test the environment variables
+    unittest_setup.ready()
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Test the pool_metrics library in the infoset.db module."""
+
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+
+# Try to create a working PYTHONPATH
+_TEST_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+_LIB_DIRECTORY = os.path.abspath(os.path.join(_TEST_DIRECTORY, os.pardir))
+_ROOT_DIRECTORY = os.path.abspath(os.path.join(_LIB_DIRECTORY, os.pardir))
+if _TEST_DIRECTORY.endswith('/infoset-ng/infoset/test') is True:
+    sys.path.append(_ROOT_DIRECTORY)
+else:
+    print(
+        'This script is not installed in the "infoset-ng/bin" directory. '
+        'Please fix.')
+    sys.exit(2)
+
+from sqlalchemy import create_engine
+from sqlalchemy import exc
+
+from infoset.db import pool_metrics
+from infoset.test import unittest_setup
+
+
+class TestFunctions(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def setUp(self):
+        """Setup the environment prior to testing."""
+        # Use an in memory database so that no server is needed
+        self.directory = tempfile.mkdtemp()
+        self.engine = create_engine(
+            'sqlite://', poolclass=pool_metrics.TimedQueuePool,
+            pool_size=1, max_overflow=1, pool_timeout=0.1)
+        pool_metrics.add_engine_metrics(self.engine, self.directory)
+
+    def tearDown(self):
+        """Cleanup the environment after testing."""
+        self.engine.dispose()
+        shutil.rmtree(self.directory)
+
+    def test_statistics(self):
+        """Testing function statistics."""
+        # Get the counters before the test
+        pool_metrics.write(force=True)
+        before = pool_metrics.statistics(self.directory)['totals']
+
+        # Use every connection in the pool, then wait for one more
+        connections = [self.engine.connect() for _ in range(2)]
+        with self.assertRaises(exc.TimeoutError):
+            self.engine.connect()
+        pool_metrics.write(force=True)
+        result = pool_metrics.statistics(self.directory)
+        self.assertEqual(len(result['processes']), 1)
+        self.assertEqual(result['processes'][0]['pid'], os.getpid())
+        totals = result['totals']
+        self.assertEqual(totals['checked_out'], 2)
+        self.assertEqual(totals['overflow'], 1)
+        self.assertEqual(totals['limit'], 2)
+        self.assertEqual(
+            totals['checkout_timeouts'], before['checkout_timeouts'] + 1)
+        self.assertTrue(totals['checkout_wait_seconds'] >= 0.1)
+
+        # Return the connections
+        for connection in connections:
+            connection.close()
+        pool_metrics.write(force=True)
+        totals = pool_metrics.statistics(self.directory)['totals']
+        self.assertEqual(totals['checked_out'], 0)
+        self.assertEqual(totals['checkins'], before['checkins'] + 2)
+
+    def test_record(self):
+        """Testing function record."""
+        # Test
+        pool_metrics.write(force=True)
+        before = pool_metrics.statistics(self.directory)['totals']
+        pool_metrics.record('pid_discards')
+        pool_metrics.write(force=True)
+        after = pool_metrics.statistics(self.directory)['totals']
+        self.assertEqual(after['pid_discards'], before['pid_discards'] + 1)
+
+    def test_dead_processes(self):
+        """Testing the removal of files of processes that have stopped."""
+        # Create a file for a process that doesn't exist
+        filepath = os.path.join(self.directory, '999999999.json')
+        with open(filepath, 'w') as f_handle:
+            f_handle.write('{"pid": 999999999}')
+        result = pool_metrics.statistics(self.directory)
+        self.assertEqual(len(result['processes']), 0)
+        self.assertFalse(os.path.exists(filepath))
+
+
+if __name__ == '__main__':
+    # Test the environment variables
+    unittest_setup.ready()
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Test the reference library in the infoset.reference module."""
+
+import unittest
+import os
+import sys
+
+# Try to create a working PYTHONPATH
+_TEST_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+_LIB_DIRECTORY = os.path.abspath(os.path.join(_TEST_DIRECTORY, os.pardir))
+_ROOT_DIRECTORY = os.path.abspath(os.path.join(_LIB_DIRECTORY, os.pardir))
+if _TEST_DIRECTORY.endswith('/infoset-ng/infoset/test') is True:
+    sys.path.append(_ROOT_DIRECTORY)
+else:
+    print(
+        'This script is not installed in the "infoset-ng/bin" directory. '
+        'Please fix.')
+    sys.exit(2)
+
+from infoset.reference import reference
+from infoset.test import unittest_setup
+
+
+class TestFunctions(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def tearDown(self):
+        """Cleanup the environment after testing."""
+        reference._SESSIONS.clear()
+
+    def test_session(self):
+        """Testing function _session."""
+        # Initialize key variables
+        config = reference.ReferenceSampleConfig()
+
+        # Test
+        result = reference._session('http://server_1:6000', config)
+        adapter = result.get_adapter('http://server_1:6000')
+        self.assertEqual(adapter.max_retries.total, config.api_retries())
+        self.assertEqual(adapter.max_retries.status, 0)
+        self.assertEqual(
+            adapter.max_retries.backoff_factor, config.api_retry_backoff())
+        self.assertEqual(adapter._pool_maxsize, config.api_pool_size())
+
+        # The session is shared by each API server's agents
+        self.assertIs(
+            reference._session('http://server_1:6000', config), result)
+        self.assertIsNot(
+            reference._session('http://server_2:6000', config), result)
+
+    def test_api(self):
+        """Testing class ReferenceSampleAPI."""
+        # Initialize key variables
+        config = reference.ReferenceSampleConfig()
+
+        # Test
+        api_1 = reference.ReferenceSampleAPI(config)
+        api_2 = reference.ReferenceSampleAPI(config)
+        self.assertIs(api_1.session, api_2.session)
+        self.assertEqual(api_1.timeout, config.api_timeout())
+
+
+if __name__ == '__main__':
+    # Test the environment variables
+    unittest_setup.ready()
+
+    # Do the unit test
+    unittest.main()
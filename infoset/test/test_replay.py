@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""Test the replay library in the infoset.reference module."""
+
+import unittest
+from unittest import mock
+import tempfile
+import shutil
+import json
+import os
+import sys
+
+# Try to create a working PYTHONPATH
+_TEST_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+_LIB_DIRECTORY = os.path.abspath(os.path.join(_TEST_DIRECTORY, os.pardir))
+_ROOT_DIRECTORY = os.path.abspath(os.path.join(_LIB_DIRECTORY, os.pardir))
+if _TEST_DIRECTORY.endswith('/infoset-ng/infoset/test') is True:
+    sys.path.append(_ROOT_DIRECTORY)
+else:
+    print(
+        'This script is not installed in the "infoset-ng/bin" directory. '
+        'Please fix.')
+    sys.exit(2)
+
+from infoset.reference import replay
+from infoset.reference import backlog
+from infoset.test import unittest_setup
+
+
+class TestReplay(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def setUp(self):
+        """Setup the environment prior to testing."""
+        # Create cache files for two devices
+        self.directory = tempfile.mkdtemp()
+        for device in ['abc_def', 'abc_fed']:
+            for timestamp in [900, 300, 1200, 600]:
+                filepath = os.path.join(
+                    self.directory, '{}_{}.json'.format(timestamp, device))
+                with open(filepath, 'w') as f_handle:
+                    json.dump(
+                        {'timestamp': timestamp, 'device': device}, f_handle)
+
+        # Files of other agents are ignored
+        with open(os.path.join(self.directory, '300_xyz_def.json'), 'w'):
+            pass
+
+        # Record the data posted
+        self.posted = []
+
+    def tearDown(self):
+        """Cleanup the environment after testing."""
+        shutil.rmtree(self.directory)
+
+    def _replayer(self, statuses):
+        """Create a Replay object whose posts get the statuses supplied."""
+        # Initialize key variables
+        replayer = replay.Replay(
+            'http://localhost/receive', self.directory, suffix='def.json',
+            batch_size=3, workers=2, rate=0)
+
+        def _post(url, data=None, headers=None, timeout=None):
+            """Record the post and respond."""
+            items = json.loads(data.decode())
+            self.posted.append(items)
+            response = mock.Mock()
+            response.status_code = statuses(items)
+            response.headers = {'Retry-After': '30'}
+            return response
+
+        replayer.session.post = _post
+        return replayer
+
+    def _remaining(self):
+        """Get the names of the cache files not posted."""
+        return sorted(os.listdir(self.directory))
+
+    def test_streams(self):
+        """Testing method streams."""
+        # Test
+        replayer = self._replayer(lambda _: 200)
+        result = sorted(replayer.streams())
+        self.assertEqual(
+            [[os.path.basename(item) for item in stream]
+             for stream in result],
+            [['300_abc_def.json', '600_abc_def.json', '900_abc_def.json',
+              '1200_abc_def.json'],
+             ['300_xyz_def.json']])
+
+    def test_run(self):
+        """Testing method run."""
+        # Test
+        replayer = self._replayer(lambda _: 200)
+        replayer.suffix = 'abc_def.json'
+        self.assertEqual(replayer.run(), 4)
+        self.assertEqual(
+            [[item['timestamp'] for item in items] for items in self.posted],
+            [[300, 600, 900], [1200]])
+        self.assertEqual(len(self._remaining()), 5)
+
+        # Each device is posted in timestamp order
+        replayer = self._replayer(lambda _: 200)
+        replayer.suffix = '.json'
+        self.posted = []
+        self.assertEqual(replayer.run(), 4)
+        self.assertEqual(
+            [item['timestamp'] for items in self.posted for item in items],
+            [300, 600, 900, 1200])
+        self.assertEqual(self._remaining(), ['300_xyz_def.json'])
+
+    def test_run_refused(self):
+        """Testing method run with data the API refuses."""
+        # Initialize key variables
+        def _statuses(items):
+            """Refuse timestamp 600."""
+            if 600 in [item['timestamp'] for item in items]:
+                return 404
+            return 200
+
+        # The refused file is discarded
+        replayer = self._replayer(_statuses)
+        replayer.suffix = 'abc_def.json'
+        self.assertEqual(replayer.run(), 3)
+        self.assertEqual(
+            [item['timestamp'] for items in self.posted for item in items],
+            [300, 600, 900, 300, 600, 900, 1200])
+        self.assertEqual(
+            [name for name in self._remaining() if 'abc_def' in name], [])
+
+    def test_run_refused_error(self):
+        """Testing method run with an error after the API refuses data."""
+        # Initialize key variables
+        def _statuses(items):
+            """Refuse the first batch, then fail to post timestamp 600."""
+            timestamps = [item['timestamp'] for item in items]
+            if len(timestamps) > 1:
+                return 400
+            if 600 in timestamps:
+                return 500
+            return 200
+
+        # Newer files aren't posted before the file that failed
+        replayer = self._replayer(_statuses)
+        replayer.suffix = 'abc_def.json'
+        self.assertEqual(replayer.run(), 1)
+        self.assertEqual(
+            [item['timestamp'] for items in self.posted for item in items],
+            [300, 600, 900, 300, 600])
+        self.assertEqual(
+            [name for name in self._remaining() if 'abc_def' in name],
+            ['1200_abc_def.json', '600_abc_def.json', '900_abc_def.json'])
+
+    def test_run_busy(self):
+        """Testing method run with a busy API."""
+        # Test
+        replayer = self._replayer(lambda _: 503)
+        replayer.suffix = 'abc_def.json'
+        self.assertEqual(replayer.run(), 0)
+        self.assertEqual(replayer.retry_after, 30)
+        self.assertEqual(len(self.posted), 1)
+        self.assertEqual(len(self._remaining()), 9)
+
+    def test_run_backlog(self):
+        """Testing method run_backlog."""
+        # Initialize key variables
+        def _statuses(items):
+            """Refuse timestamp 2 and be busy for timestamp 5."""
+            timestamps = [item['timestamp'] for item in items]
+            if 5 in timestamps:
+                return 503
+            if 2 in timestamps:
+                return 404
+            return 200
+
+        queue = backlog.Backlog(os.path.join(self.directory, 'backlog'))
+        for timestamp in range(7):
+            queue.put({'timestamp': timestamp})
+
+        # Refused data is discarded. Posting stops when the API is busy
+        replayer = self._replayer(_statuses)
+        self.assertEqual(replayer.run_backlog(queue), 2)
+        self.assertEqual(
+            [item['timestamp'] for items in self.posted for item in items],
+            [0, 1, 2, 0, 1, 2, 3, 4, 5])
+        self.assertEqual(
+            [data['timestamp'] for (_, data) in queue.get(10)], [3, 4, 5, 6])
+
+
+if __name__ == '__main__':
+    # Test the environment variables
+    unittest_setup.ready()
+
+    # Do the unit test
+    unittest.main()
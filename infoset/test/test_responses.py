@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Test the responses library in the infoset.utils module."""
+
+import unittest
+from unittest import mock
+import gzip
+import zlib
+import json
+import os
+import sys
+
+# Try to create a working PYTHONPATH
+_TEST_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+_LIB_DIRECTORY = os.path.abspath(os.path.join(_TEST_DIRECTORY, os.pardir))
+_ROOT_DIRECTORY = os.path.abspath(os.path.join(_LIB_DIRECTORY, os.pardir))
+if _TEST_DIRECTORY.endswith('/infoset-ng/infoset/test') is True:
+    sys.path.append(_ROOT_DIRECTORY)
+else:
+    print(
+        'This script is not installed in the "infoset-ng/bin" directory. '
+        'Please fix.')
+    sys.exit(2)
+
+from flask import Flask, Blueprint, jsonify
+
+from infoset.utils import responses
+from infoset.utils import memory
+from infoset.utils import streaming
+from infoset.utils import configuration
+from infoset.test import unittest_setup
+
+# Data returned by the test application
+ITEMS = [{'idx': idx, 'value': idx * 1.5} for idx in range(100)]
+
+# Test application
+DEVICES = Blueprint('DEVICES', __name__)
+APP = Flask(__name__)
+
+
+@DEVICES.route('/devices/<int:value>')
+def devices(value):
+    """Return a response that can be compressed."""
+    return jsonify(ITEMS)
+
+
+@DEVICES.route('/devices/stream')
+def stream():
+    """Return a streamed response."""
+    return streaming.response(ITEMS)
+
+
+@DEVICES.route('/devices/small')
+def small():
+    """Return a response too small to be compressed."""
+    return jsonify([])
+
+
+# Test blueprint for responses about a time window
+LASTCONTACTS = Blueprint('LASTCONTACTS', __name__)
+
+
+@LASTCONTACTS.route('/lastcontacts')
+def lastcontacts():
+    """Return a response for a time window."""
+    return jsonify(ITEMS)
+
+
+APP.register_blueprint(DEVICES)
+APP.register_blueprint(LASTCONTACTS)
+APP.before_request(responses.not_modified)
+APP.after_request(responses.finalize)
+
+
+class TestFunctions(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    # Create test client
+    client = APP.test_client()
+
+    def test_not_modified(self):
+        """Testing function not_modified."""
+        # The first response has an ETag
+        response = self.client.get('/devices/1')
+        self.assertEqual(response.status_code, 200)
+        tag = response.headers['ETag']
+        self.assertTrue(tag.startswith('W/'))
+
+        # The data isn't sent again if it hasn't changed
+        response = self.client.get(
+            '/devices/1', headers={'If-None-Match': tag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(response.headers['ETag'], tag)
+
+        # The ETag changes with the request arguments
+        response = self.client.get(
+            '/devices/1?secondsago=60', headers={'If-None-Match': tag})
+        self.assertEqual(response.status_code, 200)
+
+        # The ETag changes when new data is added
+        memory.Cache(configuration.Config()).stamp([])
+        memory._LOCAL_GENERATIONS.clear()
+        response = self.client.get(
+            '/devices/1', headers={'If-None-Match': tag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], tag)
+
+    def test_etag(self):
+        """Testing function etag."""
+        # Initialize key variables
+        tags = {}
+
+        # Get the ETags of responses at two different times
+        for timestamp in [300, 600]:
+            with mock.patch.object(
+                    memory.general, 'normalized_timestamp',
+                    return_value=timestamp):
+                for url in [
+                        '/lastcontacts', '/lastcontacts?secondsago=60',
+                        '/lastcontacts?ts_start=300', '/devices/1']:
+                    response = self.client.get(url)
+                    tags.setdefault(url, set()).add(response.headers['ETag'])
+
+        # Only the ETags of windows relative to the current time change
+        self.assertEqual(len(tags['/lastcontacts']), 2)
+        self.assertEqual(len(tags['/lastcontacts?secondsago=60']), 2)
+        self.assertEqual(len(tags['/lastcontacts?ts_start=300']), 1)
+        self.assertEqual(len(tags['/devices/1']), 1)
+
+    def test_compress(self):
+        """Testing function compress."""
+        # Test gzip
+        response = self.client.get(
+            '/devices/1', headers={'Accept-Encoding': 'gzip, deflate'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(response.data)), ITEMS)
+
+        # Test deflate
+        response = self.client.get(
+            '/devices/1', headers={'Accept-Encoding': 'deflate'})
+        self.assertEqual(response.headers['Content-Encoding'], 'deflate')
+        self.assertEqual(json.loads(zlib.decompress(response.data)), ITEMS)
+
+        # Test without compression
+        for headers in [{}, {'Accept-Encoding': 'br'}]:
+            response = self.client.get('/devices/1', headers=headers)
+            self.assertFalse('Content-Encoding' in response.headers)
+            self.assertEqual(json.loads(response.data), ITEMS)
+            self.assertTrue('Accept-Encoding' in response.headers['Vary'])
+
+        # Small responses are not compressed
+        response = self.client.get(
+            '/devices/small', headers={'Accept-Encoding': 'gzip'})
+        self.assertFalse('Content-Encoding' in response.headers)
+
+        # Test streamed responses
+        response = self.client.get(
+            '/devices/stream', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(response.data)), ITEMS)
+
+
+if __name__ == '__main__':
+    # Test the environment variables
+    unittest_setup.ready()
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Test the scheduler library in the infoset.agents module."""
+
+import unittest
+from unittest import mock
+import tempfile
+import shutil
+import json
+import time
+import os
+import sys
+from urllib.parse import urlparse
+
+# Try to create a working PYTHONPATH
+_TEST_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+_LIB_DIRECTORY = os.path.abspath(os.path.join(_TEST_DIRECTORY, os.pardir))
+_ROOT_DIRECTORY = os.path.abspath(os.path.join(_LIB_DIRECTORY, os.pardir))
+if _TEST_DIRECTORY.endswith('/infoset-ng/infoset/test') is True:
+    sys.path.append(_ROOT_DIRECTORY)
+else:
+    print(
+        'This script is not installed in the "infoset-ng/bin" directory. '
+        'Please fix.')
+    sys.exit(2)
+
+from infoset.agents import scheduler
+from infoset.api import API, CONFIG
+from infoset.reference.reference import ReferenceSampleConfig
+from infoset.test import unittest_setup
+
+
+class _Config(ReferenceSampleConfig):
+    """Configuration with a fixed agent cache directory."""
+
+    def __init__(self, directory):
+        """Initialize the class."""
+        ReferenceSampleConfig.__init__(self)
+        self.directory = directory
+
+    def agent_cache_directory(self):
+        """Return the agent cache directory."""
+        return self.directory
+
+
+class _Scheduler(scheduler.Scheduler):
+    """Scheduler polling test devices."""
+
+    def poll(self, devicename, sample):
+        """Poll a device."""
+        if devicename == 'bad':
+            raise OSError('No response')
+        if devicename == 'slow':
+            time.sleep(0.5)
+        sample.populate_single('label', len(devicename), base_type=1)
+
+
+class TestScheduler(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def setUp(self):
+        """Setup the environment prior to testing."""
+        # Initialize key variables
+        self.directory = tempfile.mkdtemp()
+        self.posted = []
+        self.status = 200
+        self.scheduler = _Scheduler(
+            _Config(self.directory), ['device_1', 'bad', 'slow', 'device_2'],
+            jitter=0, timeout=0.2)
+
+        def _post(url, data=None, headers=None, timeout=None):
+            """Record the post and respond."""
+            self.posted.append(json.loads(data.decode()))
+            response = mock.Mock()
+            response.status_code = self.status
+            response.headers = {}
+            return response
+
+        self.scheduler._session.post = _post
+
+    def tearDown(self):
+        """Cleanup the environment after testing."""
+        self.scheduler._executor.shutdown()
+        shutil.rmtree(self.directory)
+
+    def test_cycle(self):
+        """Testing method cycle."""
+        # Failed and slow polls are not posted
+        self.assertEqual(self.scheduler.cycle(), 2)
+        self.assertEqual(len(self.posted), 1)
+        self.assertEqual(
+            sorted(data['devicename'] for data in self.posted[0]),
+            ['device_1', 'device_2'])
+
+        # Devices still being polled are skipped
+        self.posted = []
+        self.assertEqual(self.scheduler.cycle(), 2)
+        self.assertNotIn(
+            'slow', [data['devicename'] for data in self.posted[0]])
+
+        # Devices are polled again once their poll finishes
+        time.sleep(0.5)
+        self.scheduler.timeout = 1
+        self.assertEqual(self.scheduler.cycle(), 3)
+
+    def test_cycle_backlog(self):
+        """Testing method cycle when the API can't be contacted."""
+        # Data that can't be posted is kept
+        self.scheduler.devicenames = ['device_1']
+        self.status = 503
+        self.scheduler.cycle()
+        self.assertEqual(len(self.scheduler._backlog.get(10)), 1)
+
+        # The backlog is posted before new data
+        self.status = 200
+        self.posted = []
+        self.scheduler.cycle()
+        self.assertEqual([len(items) for items in self.posted], [1, 1])
+        self.assertEqual(self.scheduler._backlog.get(10), [])
+
+    def test_get_id_agent(self):
+        """Testing method get_id_agent."""
+        # The ID is permanent and used by the samples and the backlog
+        result = self.scheduler.id_agent
+        self.assertEqual(len(result), 64)
+        self.assertEqual(self.scheduler.get_id_agent(), result)
+        self.assertEqual(
+            self.scheduler._sample('device_1', 300).data['id_agent'], result)
+        self.assertEqual(
+            self.scheduler._backlog.directory,
+            os.path.join(self.directory, result))
+
+    def test_cycle_api(self):
+        """Testing method cycle posting to the API."""
+        # Initialize key variables
+        API.config['TESTING'] = True
+        client = API.test_client()
+        cache_dir = CONFIG.ingest_cache_directory()
+        before = set(os.listdir(cache_dir))
+
+        def _post(url, data=None, headers=None, timeout=None):
+            """Post to the API."""
+            return client.post(urlparse(url).path, data=data, headers=headers)
+
+        # The API accepts the data of the devices
+        self.scheduler._session.post = _post
+        self.scheduler.devicenames = ['device_1', 'device_2']
+        try:
+            self.assertEqual(self.scheduler.cycle(), 2)
+            created = sorted(set(os.listdir(cache_dir)) - before)
+            self.assertEqual(len(created), 2)
+            for filename in created:
+                self.assertIn(self.scheduler.id_agent, filename)
+            self.assertEqual(self.scheduler._backlog.size(), 0)
+        finally:
+            for filename in set(os.listdir(cache_dir)) - before:
+                filepath = os.path.join(cache_dir, filename)
+                if os.path.isfile(filepath) is True:
+                    os.remove(filepath)
+
+    def test_offset(self):
+        """Testing method _offset."""
+        # Test
+        self.scheduler.jitter = 0.5
+        result = self.scheduler._offset('device_1', 300)
+        self.assertEqual(self.scheduler._offset('device_1', 300), result)
+        self.assertTrue(0 <= result <= 150)
+        self.assertNotEqual(self.scheduler._offset('device_2', 300), result)
+
+
+if __name__ == '__main__':
+    # Test the environment variables
+    unittest_setup.ready()
+
+    # Do the unit test
+    unittest.main()
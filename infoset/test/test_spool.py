@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Test the spool library in the infoset.cache module."""
+
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+
+# Try to create a working PYTHONPATH
+_TEST_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+_LIB_DIRECTORY = os.path.abspath(os.path.join(_TEST_DIRECTORY, os.pardir))
+_ROOT_DIRECTORY = os.path.abspath(os.path.join(_LIB_DIRECTORY, os.pardir))
+if _TEST_DIRECTORY.endswith('/infoset-ng/infoset/test') is True:
+    sys.path.append(_ROOT_DIRECTORY)
+else:
+    print(
+        'This script is not installed in the "infoset-ng/bin" directory. '
+        'Please fix.')
+    sys.exit(2)
+
+from infoset.cache import spool
+from infoset.test import unittest_setup
+
+
+class _Config(object):
+    """Configuration with spool limits."""
+
+    def __init__(self, directory, max_files, max_bytes):
+        """Initialize the class."""
+        self.directory = directory
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+
+    def ingest_cache_directory(self):
+        """Return the ingest cache directory."""
+        return self.directory
+
+    def api_spool_max_files(self):
+        """Return the maximum number of files."""
+        return self.max_files
+
+    def api_spool_max_bytes(self):
+        """Return the maximum number of bytes."""
+        return self.max_bytes
+
+
+class TestFunctions(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def setUp(self):
+        """Setup the environment prior to testing."""
+        self.directory = tempfile.mkdtemp()
+        for timestamp in [600, 300]:
+            filepath = os.path.join(
+                self.directory, '{}_abc_def.json'.format(timestamp))
+            with open(filepath, 'w') as f_handle:
+                f_handle.write('x' * 100)
+
+        # Files that aren't cache files are ignored
+        os.mkdir(os.path.join(self.directory, 'snapshots'))
+        with open(os.path.join(self.directory, '.receive_1.tmp'), 'w'):
+            pass
+
+    def tearDown(self):
+        """Cleanup the environment after testing."""
+        shutil.rmtree(self.directory)
+        spool._USAGE['checked'] = 0
+
+    def test_usage(self):
+        """Testing function usage."""
+        # Test
+        result = spool.usage(self.directory)
+        self.assertEqual(result, {'files': 2, 'bytes': 200, 'oldest': 300})
+
+    def test_cached_usage(self):
+        """Testing function cached_usage."""
+        # Measurements are reused for CHECK_INTERVAL seconds
+        expected = {'files': 2, 'bytes': 200, 'oldest': 300}
+        self.assertEqual(spool.cached_usage(self.directory), expected)
+        os.remove(os.path.join(self.directory, '300_abc_def.json'))
+        self.assertEqual(spool.cached_usage(self.directory), expected)
+        spool._USAGE['checked'] = 0
+        self.assertEqual(
+            spool.cached_usage(self.directory),
+            {'files': 1, 'bytes': 100, 'oldest': 600})
+
+    def test_full(self):
+        """Testing function full."""
+        # Test
+        for (max_files, max_bytes, expected) in [
+                (0, 0, False), (3, 0, False), (2, 0, True), (0, 201, False),
+                (0, 200, True), (3, 100, True)]:
+            spool._USAGE['checked'] = 0
+            config = _Config(self.directory, max_files, max_bytes)
+            self.assertEqual(spool.full(config), expected)
+
+        # Measurements are reused for CHECK_INTERVAL seconds
+        os.remove(os.path.join(self.directory, '300_abc_def.json'))
+        config = _Config(self.directory, 2, 0)
+        self.assertEqual(spool.full(config), True)
+        spool._USAGE['checked'] = 0
+        self.assertEqual(spool.full(config), False)
+
+
+if __name__ == '__main__':
+    # Test the environment variables
+    unittest_setup.ready()
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Test the streaming library in the infoset.utils module."""
+
+import unittest
+import json
+import os
+import sys
+
+# Try to create a working PYTHONPATH
+_TEST_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+_LIB_DIRECTORY = os.path.abspath(os.path.join(_TEST_DIRECTORY, os.pardir))
+_ROOT_DIRECTORY = os.path.abspath(os.path.join(_LIB_DIRECTORY, os.pardir))
+if _TEST_DIRECTORY.endswith('/infoset-ng/infoset/test') is True:
+    sys.path.append(_ROOT_DIRECTORY)
+else:
+    print(
+        'This script is not installed in the "infoset-ng/bin" directory. '
+        'Please fix.')
+    sys.exit(2)
+
+from flask import Flask
+
+from infoset.utils import streaming
+from infoset.test import unittest_setup
+
+
+class TestFunctions(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    # Data to encode
+    items = [{'idx': idx, 'value': idx * 1.5} for idx in range(7)]
+
+    # Application used to create request contexts
+    app = Flask(__name__)
+
+    def test_mode(self):
+        """Testing function mode."""
+        # Test valid modes
+        for value in ['json', 'ndjson']:
+            uri = '/?stream={}'.format(value)
+            with self.app.test_request_context(uri):
+                self.assertEqual(streaming.mode(), value)
+
+        # Test invalid modes
+        for uri in ['/', '/?stream=', '/?stream=xml']:
+            with self.app.test_request_context(uri):
+                self.assertEqual(streaming.mode(), None)
+
+    def test_requested(self):
+        """Testing function requested."""
+        # Test
+        with self.app.test_request_context('/?stream=ndjson'):
+            self.assertEqual(streaming.requested(), True)
+        with self.app.test_request_context('/'):
+            self.assertEqual(streaming.requested(), False)
+
+    def test_response(self):
+        """Testing function response."""
+        # Test JSON array
+        with self.app.test_request_context('/?stream=json'):
+            result = streaming.response(iter(self.items))
+            self.assertEqual(result.mimetype, 'application/json')
+            data = result.get_data(as_text=True)
+            self.assertEqual(json.loads(data), self.items)
+
+        # Test NDJSON
+        with self.app.test_request_context('/?stream=ndjson'):
+            result = streaming.response(iter(self.items))
+            self.assertEqual(result.mimetype, 'application/x-ndjson')
+            data = result.get_data(as_text=True)
+            lines = data.splitlines()
+            self.assertEqual(
+                [json.loads(line) for line in lines], self.items)
+
+    def test_encode(self):
+        """Testing function encode."""
+        # Test JSON array in chunks
+        chunks = list(streaming.encode(self.items, chunk_size=3))
+        self.assertEqual(json.loads(''.join(chunks)), self.items)
+        self.assertEqual(chunks[0], '[')
+        self.assertEqual(chunks[-1], ']')
+        self.assertEqual(len(chunks), 5)
+
+        # Test NDJSON in chunks
+        chunks = list(
+            streaming.encode(self.items, ndjson=True, chunk_size=3))
+        self.assertEqual(len(chunks), 3)
+        lines = ''.join(chunks).splitlines()
+        self.assertEqual([json.loads(line) for line in lines], self.items)
+
+        # Test empty iterables
+        self.assertEqual(json.loads(''.join(streaming.encode([]))), [])
+        self.assertEqual(''.join(streaming.encode([], ndjson=True)), '')
+
+
+if __name__ == '__main__':
+    # Test the environment variables
+    unittest_setup.ready()
+
+    # Do the unit test
+    unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Test the timing library in the infoset.cache module."""
+
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+
+# Try to create a working PYTHONPATH
+_TEST_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
+_LIB_DIRECTORY = os.path.abspath(os.path.join(_TEST_DIRECTORY, os.pardir))
+_ROOT_DIRECTORY = os.path.abspath(os.path.join(_LIB_DIRECTORY, os.pardir))
+if _TEST_DIRECTORY.endswith('/infoset-ng/infoset/test') is True:
+    sys.path.append(_ROOT_DIRECTORY)
+else:
+    print(
+        'This script is not installed in the "infoset-ng/bin" directory. '
+        'Please fix.')
+    sys.exit(2)
+
+from infoset.cache import timing
+from infoset.test import unittest_setup
+
+
+class TestTiming(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def setUp(self):
+        """Setup the environment prior to testing."""
+        # Initialize key variables
+        self.directory = tempfile.mkdtemp()
+        timing.collect()
+
+    def tearDown(self):
+        """Cleanup the environment after testing."""
+        shutil.rmtree(self.directory)
+
+    def test_record(self):
+        """Testing function record."""
+        # Test
+        timing.record('read', 0.002)
+        timing.record('read', 100)
+        result = timing.collect()['read']
+        self.assertEqual(result['count'], 2)
+        self.assertEqual(result['seconds'], 100.002)
+        self.assertEqual(result['max'], 100)
+        self.assertEqual(result['buckets'][1], 1)
+        self.assertEqual(result['buckets'][-1], 1)
+        self.assertEqual(sum(result['buckets']), 2)
+
+    def test_stage(self):
+        """Testing function stage."""
+        # Durations are recorded even if there is an exception
+        with self.assertRaises(ValueError):
+            with timing.stage('drain'):
+                raise ValueError()
+        self.assertEqual(timing.collect()['drain']['count'], 1)
+
+    def test_collect(self):
+        """Testing function collect."""
+        # Test
+        timing.record('purge', 1)
+        self.assertEqual(timing.collect()['purge']['count'], 1)
+        self.assertEqual(timing.collect(), timing.empty())
+
+    def test_merge(self):
+        """Testing function merge."""
+        # Test
+        timing.record('scan', 2)
+        other = timing.collect()
+        timings = timing.empty()
+        timing.merge(timings, other)
+        timing.merge(timings, other)
+        self.assertEqual(timings['scan']['count'], 2)
+        self.assertEqual(timings['scan']['seconds'], 4)
+        self.assertEqual(timings['scan']['max'], 2)
+        self.assertEqual(timings['read'], timing.empty()['read'])
+
+    def test_write(self):
+        """Testing function write."""
+        # Nothing has been written yet
+        result = timing.read(self.directory)
+        self.assertIsNone(result['last_cycle'])
+        self.assertEqual(result['totals']['cycles'], 0)
+
+        # Write two cycles
+        timing.record('insert_timeseries', 0.5)
+        cycle = {
+            'timestamp': 300, 'duration': 1, 'agents': 2, 'files': 3,
+            'datapoints': 4, 'stages': timing.collect()}
+        timing.write(self.directory, cycle)
+        timing.write(self.directory, cycle)
+        result = timing.read(self.directory)
+        self.assertEqual(result['last_cycle'], cycle)
+        self.assertEqual(result['totals']['cycles'], 2)
+        self.assertEqual(result['totals']['datapoints'], 8)
+        self.assertEqual(
+            result['totals']['stages']['insert_timeseries']['count'], 2)
+        self.assertEqual(os.listdir(self.directory), [timing.FILENAME])
+
+    def test_profile(self):
+        """Testing function profile."""
+        # Test
+        with timing.profile(self.directory, 'agent'):
+            sum(range(10))
+        self.assertEqual(os.listdir(self.directory), ['agent.prof'])
+
+        # Nothing is profiled without a directory
+        with timing.profile(None, 'agent'):
+            sum(range(10))
+        self.assertEqual(os.listdir(self.directory), ['agent.prof'])
+
+
+if __name__ == '__main__':
+    # Test the environment variables
+    unittest_setup.ready()
+
+    # Do the unit test
+    unittest.main()
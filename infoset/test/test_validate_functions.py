@@ -89,6 +89,24 @@ class TestGeneral(unittest.TestCase):
         result = validate._valid_filename(filename)
         self.assertEqual(result, True)
 
+        # Test good filenames of binary formats
+        for extension in ['msgpack', 'cbor']:
+            filename = ('%s_%s_%s.%s') % (
+                int(time.time()),
+                general.hashstring(general.randomstring()),
+                general.hashstring(general.randomstring()),
+                extension)
+            result = validate._valid_filename(filename)
+            self.assertEqual(result, True)
+
+        # Test bad filename (Unknown format)
+        filename = ('%s_%s_%s.json.tmp') % (
+            int(time.time()),
+            general.hashstring(general.randomstring()),
+            general.hashstring(general.randomstring()))
+        result = validate._valid_filename(filename)
+        self.assertEqual(result, False)
+
     def test__read_data_from_file(self):
         """Testing function _read_data_from_file."""
         # Create filename
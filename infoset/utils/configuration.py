@@ -3,11 +3,28 @@
 
 import os.path
 import os
+import signal
+import time
 
 # Import project libraries
+from infoset.constants import DATA_STORAGES
 from infoset.utils import general
 from infoset.utils import log
 
+# Minimum number of seconds between checks for modified configuration files
+RELOAD_CHECK_INTERVAL = 5
+
+# Gunicorn worker classes the API can use. 'gevent' and 'eventlet' serve
+# many requests per process using cooperative sockets
+WORKER_CLASSES = ['sync', 'gevent', 'eventlet']
+
+# Process wide configuration cache used by cached()
+_CACHED_CONFIG = None
+_CACHED_SIGNATURE = None
+_CACHED_DIRECTORIES = None
+_LAST_CHECK = 0
+_RELOAD_REQUESTED = False
+
 
 class Config(object):
     """Class gathers all configuration information."""
@@ -102,6 +119,126 @@ class Config(object):
         # Return
         return value
 
+    def ingest_snapshot_directory(self):
+        """Determine the ingest_snapshot_directory.
+
+        Args:
+            None
+
+        Returns:
+            value: configured ingest_snapshot_directory
+
+        """
+        # Get parameter
+        value = ('%s/snapshots') % (self.ingest_cache_directory())
+
+        # Check if value exists
+        if os.path.exists(value) is False:
+            os.makedirs(value, mode=0o755)
+
+        # Return
+        return value
+
+    def ingest_schema_directory(self):
+        """Determine the ingest_schema_directory.
+
+        Args:
+            None
+
+        Returns:
+            value: configured ingest_schema_directory
+
+        """
+        # Get parameter
+        value = ('%s/schemas') % (self.ingest_cache_directory())
+
+        # Check if value exists
+        if os.path.exists(value) is False:
+            os.makedirs(value, mode=0o755)
+
+        # Return
+        return value
+
+    def pool_statistics_directory(self):
+        """Determine the pool_statistics_directory.
+
+        Args:
+            None
+
+        Returns:
+            value: configured pool_statistics_directory
+
+        """
+        # Get parameter
+        value = ('%s/pool_statistics') % (self.ingest_cache_directory())
+
+        # Check if value exists
+        if os.path.exists(value) is False:
+            os.makedirs(value, mode=0o755)
+
+        # Return
+        return value
+
+    def ingest_statistics_directory(self):
+        """Determine the ingest_statistics_directory.
+
+        Args:
+            None
+
+        Returns:
+            value: configured ingest_statistics_directory
+
+        """
+        # Get parameter
+        value = ('%s/ingest_statistics') % (self.ingest_cache_directory())
+
+        # Check if value exists
+        if os.path.exists(value) is False:
+            os.makedirs(value, mode=0o755)
+
+        # Return
+        return value
+
+    def ingest_profile_directory(self):
+        """Determine the ingest_profile_directory.
+
+        Args:
+            None
+
+        Returns:
+            value: configured ingest_profile_directory
+
+        """
+        # Get parameter
+        value = ('%s/profiles') % (self.ingest_statistics_directory())
+
+        # Check if value exists
+        if os.path.exists(value) is False:
+            os.makedirs(value, mode=0o755)
+
+        # Return
+        return value
+
+    def metrics_directory(self):
+        """Determine the metrics_directory.
+
+        Args:
+            None
+
+        Returns:
+            value: configured metrics_directory
+
+        """
+        # Get parameter
+        value = ('%s/metrics') % (self.ingest_cache_directory())
+
+        # Check if value exists
+        if os.path.exists(value) is False:
+            os.makedirs(value, mode=0o755)
+
+        # Return
+        return value
+
     def db_name(self):
         """Get db_name.
 
@@ -182,6 +319,56 @@ class Config(object):
         # Get result
         return result
 
+    def db_storage(self):
+        """Get db_storage.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'main'
+        sub_key = 'db_storage'
+        result = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to the original layout
+        if result is None:
+            result = 'standard'
+        result = str(result).lower()
+
+        # Only accept supported layouts
+        if result not in DATA_STORAGES:
+            log_message = (
+                'db_storage: "{}" in configuration must be one of {}'
+                ''.format(result, ', '.join(sorted(DATA_STORAGES))))
+            log.log2die(1171, log_message)
+        return result
+
+    def db_compression(self):
+        """Get db_compression.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'main'
+        sub_key = 'db_compression'
+        intermediate = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Set default
+        if intermediate is None:
+            result = False
+        else:
+            result = bool(intermediate)
+        return result
+
     def listen_address(self):
         """Get listen_address.
 
@@ -352,6 +539,343 @@ class Config(object):
             result = 'localhost'
         return result
 
+    def api_cache_timeout(self):
+        """Get api_cache_timeout.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'main'
+        sub_key = 'api_cache_timeout'
+        intermediate = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to 3600
+        if intermediate is None:
+            result = 3600
+        else:
+            result = int(intermediate)
+        return result
+
+    def api_local_cache_size(self):
+        """Get api_local_cache_size.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'main'
+        sub_key = 'api_local_cache_size'
+        intermediate = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to 16777216
+        if intermediate is None:
+            result = 16777216
+        else:
+            result = int(intermediate)
+        return result
+
+    def api_local_cache_timeout(self):
+        """Get api_local_cache_timeout.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'main'
+        sub_key = 'api_local_cache_timeout'
+        intermediate = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to 60
+        if intermediate is None:
+            result = 60
+        else:
+            result = int(intermediate)
+        return result
+
+    def api_worker_class(self):
+        """Get api_worker_class.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'main'
+        sub_key = 'api_worker_class'
+        result = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to synchronous workers
+        if result is None:
+            result = 'sync'
+        result = str(result).lower()
+
+        # Only accept supported worker classes
+        if result not in WORKER_CLASSES:
+            log_message = (
+                'api_worker_class: "{}" in configuration must be one of {}'
+                ''.format(result, ', '.join(WORKER_CLASSES)))
+            log.log2die(1147, log_message)
+        return result
+
+    def api_worker_connections(self):
+        """Get api_worker_connections.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'main'
+        sub_key = 'api_worker_connections'
+        intermediate = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to 1000
+        if intermediate is None:
+            result = 1000
+        else:
+            result = int(intermediate)
+        return result
+
+    def api_workers(self):
+        """Get api_workers.
+
+        Args:
+            None
+
+        Returns:
+            result: result. None if the number of workers should be based
+                on the number of CPU cores
+
+        """
+        # Get result
+        key = 'main'
+        sub_key = 'api_workers'
+        intermediate = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to None
+        if intermediate is None:
+            result = None
+        else:
+            result = int(intermediate)
+        return result
+
+    def api_threads(self):
+        """Get api_threads.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'main'
+        sub_key = 'api_threads'
+        intermediate = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to 1
+        if intermediate is None:
+            result = 1
+        else:
+            result = int(intermediate)
+        return result
+
+    def api_keepalive(self):
+        """Get api_keepalive.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'main'
+        sub_key = 'api_keepalive'
+        intermediate = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to 2
+        if intermediate is None:
+            result = 2
+        else:
+            result = int(intermediate)
+        return result
+
+    def api_max_requests(self):
+        """Get api_max_requests.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'main'
+        sub_key = 'api_max_requests'
+        intermediate = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to 0, never restart workers
+        if intermediate is None:
+            result = 0
+        else:
+            result = int(intermediate)
+        return result
+
+    def api_max_requests_jitter(self):
+        """Get api_max_requests_jitter.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'main'
+        sub_key = 'api_max_requests_jitter'
+        intermediate = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to 0
+        if intermediate is None:
+            result = 0
+        else:
+            result = int(intermediate)
+        return result
+
+    def api_preload_app(self):
+        """Get api_preload_app.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'main'
+        sub_key = 'api_preload_app'
+        intermediate = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to False
+        if intermediate is None:
+            result = False
+        else:
+            result = bool(intermediate)
+        return result
+
+    def ingest_profile(self):
+        """Get ingest_profile.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'main'
+        sub_key = 'ingest_profile'
+        intermediate = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to False
+        if intermediate is None:
+            result = False
+        else:
+            result = bool(intermediate)
+        return result
+
+    def api_spool_max_files(self):
+        """Get api_spool_max_files.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'main'
+        sub_key = 'api_spool_max_files'
+        intermediate = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to 100000
+        if intermediate is None:
+            result = 100000
+        else:
+            result = int(intermediate)
+        return result
+
+    def api_spool_max_bytes(self):
+        """Get api_spool_max_bytes.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'main'
+        sub_key = 'api_spool_max_bytes'
+        intermediate = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to 1073741824
+        if intermediate is None:
+            result = 1073741824
+        else:
+            result = int(intermediate)
+        return result
+
+    def api_spool_retry_after(self):
+        """Get api_spool_retry_after.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'main'
+        sub_key = 'api_spool_retry_after'
+        intermediate = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Default to 60
+        if intermediate is None:
+            result = 60
+        else:
+            result = int(intermediate)
+        return result
+
     def sqlalchemy_max_overflow(self):
         """Get sqlalchemy_max_overflow.
 
@@ -374,6 +898,72 @@ class Config(object):
             result = int(intermediate)
         return result
 
+    def sqlalchemy_pool_timeout(self):
+        """Get sqlalchemy_pool_timeout.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'main'
+        sub_key = 'sqlalchemy_pool_timeout'
+        intermediate = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Set default
+        if intermediate is None:
+            result = 30
+        else:
+            result = int(intermediate)
+        return result
+
+    def sqlalchemy_pool_recycle(self):
+        """Get sqlalchemy_pool_recycle.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'main'
+        sub_key = 'sqlalchemy_pool_recycle'
+        intermediate = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Set default
+        if intermediate is None:
+            result = 600
+        else:
+            result = int(intermediate)
+        return result
+
+    def sqlalchemy_pool_pre_ping(self):
+        """Get sqlalchemy_pool_pre_ping.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Get result
+        key = 'main'
+        sub_key = 'sqlalchemy_pool_pre_ping'
+        intermediate = _key_sub_key(key, sub_key, self.config_dict, die=False)
+
+        # Set default
+        if intermediate is None:
+            result = False
+        else:
+            result = bool(intermediate)
+        return result
+
     def log_directory(self):
         """Determine the log_directory.
 
@@ -455,6 +1045,117 @@ class Config(object):
         return result
 
 
+def cached():
+    """Get the process wide Config object without re-reading YAML files.
+
+    The configuration files are only parsed again when reload() has been
+    called, the configuration directory has changed, or the modification
+    times of the files have changed. File modification times are checked
+    at most every RELOAD_CHECK_INTERVAL seconds.
+
+    Args:
+        None
+
+    Returns:
+        result: Config object
+
+    """
+    # Initialize key variables
+    global _CACHED_CONFIG
+    global _CACHED_SIGNATURE
+    global _CACHED_DIRECTORIES
+    global _LAST_CHECK
+    global _RELOAD_REQUESTED
+    now = time.time()
+    directories = general.config_directories()
+
+    # Determine whether the files need to be checked
+    check = bool(
+        _CACHED_CONFIG is None or
+        _RELOAD_REQUESTED is True or
+        directories != _CACHED_DIRECTORIES or
+        now - _LAST_CHECK >= RELOAD_CHECK_INTERVAL)
+
+    # Re-read the configuration only if it has changed
+    if check is True:
+        signature = _signature(directories)
+        if (_CACHED_CONFIG is None or _RELOAD_REQUESTED is True or
+                signature != _CACHED_SIGNATURE):
+            _RELOAD_REQUESTED = False
+            _CACHED_CONFIG = Config()
+            _CACHED_SIGNATURE = signature
+        _CACHED_DIRECTORIES = directories
+        _LAST_CHECK = now
+
+    # Return
+    result = _CACHED_CONFIG
+    return result
+
+
+def reload(signum=None, frame=None):
+    """Force cached() to re-read the configuration on its next call.
+
+    The arguments allow this function to be used as a signal handler.
+
+    Args:
+        signum: Signal number
+        frame: Stack frame
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    global _RELOAD_REQUESTED
+    _RELOAD_REQUESTED = True
+
+
+def install_reload_handler():
+    """Reload the cached configuration when SIGHUP is received.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    """
+    # Set the handler
+    signal.signal(signal.SIGHUP, reload)
+
+
+def _signature(directories):
+    """Get a value that changes whenever the configuration files change.
+
+    Args:
+        directories: List of configuration directories
+
+    Returns:
+        result: Tuple of (filepath, mtime, size) tuples
+
+    """
+    # Initialize key variables
+    result = []
+
+    # Stat each YAML file
+    for config_directory in directories:
+        if os.path.isdir(config_directory) is False:
+            continue
+        for filename in sorted(os.listdir(config_directory)):
+            if filename.endswith('.yaml') is False:
+                continue
+            filepath = ('%s/%s') % (config_directory, filename)
+            try:
+                stat = os.stat(filepath)
+            except OSError:
+                continue
+            result.append((filepath, stat.st_mtime_ns, stat.st_size))
+
+    # Return
+    result = tuple(result)
+    return result
+
+
 def _key_sub_key(key, sub_key, config_dict, die=True):
     """Get config parameter from YAML.
 
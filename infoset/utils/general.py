@@ -9,6 +9,7 @@ import locale
 import hashlib
 import random
 import string
+import importlib
 from datetime import datetime
 
 # PIP libraries
@@ -260,7 +261,7 @@ def validate_timestamp(timestamp):
     """
     # Initialize key variables
     valid = False
-    config = configuration.Config()
+    config = configuration.cached()
     interval = config.interval()
 
     # Process data
@@ -283,7 +284,7 @@ def normalized_timestamp(timestamp=None):
 
     """
     # Initialize key variables
-    config = configuration.Config()
+    config = configuration.cached()
     interval = config.interval()
 
     # Process data
@@ -576,3 +577,44 @@ def integerize(value):
 
     # Return
     return result
+
+
+def monkey_patch(worker_class):
+    """Make the standard library cooperative for asynchronous API workers.
+
+    Must be called before the API, database and memcached libraries are
+    imported so that the sockets and locks they create yield to other
+    requests instead of blocking the whole worker process.
+
+    Args:
+        worker_class: Gunicorn worker class
+
+    Returns:
+        result: True if the standard library was patched
+
+    """
+    # Initialize key variables
+    result = False
+    modules = {
+        'gevent': ('gevent.monkey', 'patch_all'),
+        'eventlet': ('eventlet', 'monkey_patch')
+    }
+
+    # Synchronous workers don't need patching
+    if worker_class not in modules:
+        return result
+
+    # Import the optional library
+    (module_name, function_name) = modules[worker_class]
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError:
+        log_message = (
+            'api_worker_class "{}" requires the "{}" package. '
+            'Please install it with pip3.'.format(worker_class, worker_class))
+        log.log2die(1148, log_message)
+
+    # Patch
+    getattr(module, function_name)()
+    result = True
+    return result
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""In-process least recently used cache.
+
+Doesn't depend on Flask, so it can be used by the database modules as
+well as the API.
+
+"""
+
+# Standard libraries
+import time
+import pickle
+import threading
+from collections import OrderedDict
+
+
+class LocalCache(object):
+    """In-process LRU cache bounded by the size of its pickled values.
+
+    Values are stored pickled so that callers never share mutable objects.
+    Values larger than an eighth of the cache size are not stored.
+
+    """
+
+    def __init__(self, size=1048576, timeout=60):
+        """Method initializing the class.
+
+        Args:
+            size: Maximum number of bytes of pickled values to store
+            timeout: Default number of seconds values are kept
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.size = size
+        self.timeout = timeout
+        self.used = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Get a value from the cache.
+
+        Args:
+            key: Key to retrieve
+
+        Returns:
+            result: Value or None if not found or expired
+
+        """
+        # Initialize key variables
+        result = None
+        now = time.time()
+
+        # Get the pickled value
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return result
+            (expiry, data) = item
+            if expiry < now:
+                self._remove(key)
+                return result
+            self._items.move_to_end(key)
+
+        # Return
+        result = pickle.loads(data)
+        return result
+
+    def set(self, key, value, timeout=None):
+        """Set the key, value pair in cache.
+
+        Args:
+            key: Key to set
+            value: Value to set
+            timeout: Number of seconds to keep the value. The default
+                timeout of the cache is used if None
+
+        Returns:
+            result: True if the value was stored
+
+        """
+        # Initialize key variables
+        result = False
+        if timeout is None or timeout <= 0:
+            timeout = self.timeout
+        timeout = min(timeout, self.timeout)
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+        # Store the value, discarding the least recently used if full
+        with self._lock:
+            self._remove(key)
+            if len(data) <= self.size // 8:
+                self._items[key] = (time.time() + timeout, data)
+                self.used += len(data)
+                while self.used > self.size:
+                    oldest = next(iter(self._items))
+                    self._remove(oldest)
+                result = True
+
+        # Return
+        return result
+
+    def delete(self, key):
+        """Delete the key, value pair from cache.
+
+        Args:
+            key: Key to delete
+
+        Returns:
+            None
+
+        """
+        # Delete
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        """Delete all values from cache.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Delete
+        with self._lock:
+            self._items.clear()
+            self.used = 0
+
+    def _remove(self, key):
+        """Remove a key. The lock must be held by the caller.
+
+        Args:
+            key: Key to delete
+
+        Returns:
+            None
+
+        """
+        # Delete
+        item = self._items.pop(key, None)
+        if item is not None:
+            self.used -= len(item[1])
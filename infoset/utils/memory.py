@@ -1,14 +1,72 @@
 #!/usr/bin/env python3
 """Code that interacts with memory cache."""
 
+# Standard libraries
+import json
+import re
+import time
+import threading
+
 # PIP3 libraries
 import memcache
-from flask import request
+from flask import request, g, has_request_context
+from flask_caching.backends.memcache import MemcachedCache
+
+# Infoset libraries
+from infoset.utils import configuration
+from infoset.utils import general
+from infoset.utils import lru
+
+# Prefix of the keys of generation counters
+GENERATION_PREFIX = 'infoset_generation'
+
+# Number of seconds generation counters are cached in each process
+GENERATION_TIMEOUT = 1
+
+# Prefix of the keys of the cache hit and miss counters
+STATISTICS_PREFIX = 'infoset_cache_statistics'
+
+# Names of the cache hit and miss counters
+STATISTICS = ['local_hits', 'memcached_hits', 'stale_hits', 'misses']
+
+# Minimum number of seconds between updates of the counters in memcached
+STATISTICS_INTERVAL = 10
+
+# Prefix of the keys created by cache_key
+FLASK_PREFIX = 'infoset_flask'
+
+# Arguments that fix the time window read by an endpoint. Without all of
+# them the window is relative to the current time
+TIME_WINDOW_ARGUMENTS = {
+    'DATAPOINTS.getdata': ['ts_start', 'ts_stop'],
+    'LASTCONTACTS.lastcontacts': ['ts_start'],
+    'LASTCONTACTS.id_agents': ['ts_start'],
+    'LASTCONTACTS.deviceagents': ['ts_start'],
+    'LASTCONTACTS.devicename_agents': ['ts_start']
+}
+
+# Number of seconds a lock to recompute a cache value is held at most
+LOCK_TIMEOUT = 30
+
+# Number of seconds to wait for another process to recompute a cache value
+# when there is no previous value to serve, and the polling interval
+LOCK_WAIT = 2
+LOCK_POLL = 0.05
+
+# Cache objects used by flask_cache_key to read generation counters
+_GENERATIONS = None
+_LOCAL_GENERATIONS = None
 
 
 def flask_cache_key(*args, **kwargs):
     """Create a key for use by Flask-Caching.
 
+    The key includes the generation counter of the data the request reads.
+    The ingester increments the counter whenever new data is added, so
+    cached responses stop being returned within GENERATION_TIMEOUT seconds
+    of becoming stale. Keys of responses for a time window relative to the
+    current time also change every interval, as the window moves.
+
     Args:
         None
 
@@ -16,20 +74,546 @@ def flask_cache_key(*args, **kwargs):
         result: Key to be used
 
     """
-    # Use the request URI as part of the key
-    path = request.path
+    # Return
+    result = cache_key(
+        request.path, request.environ['SERVER_PORT'], request_version(),
+        request.args.items(multi=True))
+    return result
+
+
+def request_generation():
+    """Get the generation counter of the data used by the current request.
+
+    Args:
+        None
+
+    Returns:
+        result: Value of the counter. None if memcached is unavailable
+
+    """
+    # Initialize key variables
+    global _GENERATIONS
+    global _LOCAL_GENERATIONS
+    if _GENERATIONS is None:
+        _GENERATIONS = Cache(configuration.cached())
+        _LOCAL_GENERATIONS = lru.LocalCache(timeout=GENERATION_TIMEOUT)
+
+    # Get the generation of the data used by the request
+    key = _request_generation_key()
+    result = _LOCAL_GENERATIONS.get(key)
+    if result is None:
+        result = _GENERATIONS.generation(key)
+        _LOCAL_GENERATIONS.set(key, result)
+
+    # Return
+    return result
+
+
+def request_version():
+    """Get the version of the data in the response to the current request.
+
+    This is the generation counter of the data. Responses for a time window
+    relative to the current time also change when the window moves, even
+    if no data is added, so the current normalized timestamp is added.
+
+    Args:
+        None
+
+    Returns:
+        result: Version. None if memcached is unavailable
+
+    """
+    # Initialize key variables
+    result = request_generation()
+    if result is None:
+        return result
+
+    # Add the time for windows that aren't fixed by the request
+    required = TIME_WINDOW_ARGUMENTS.get(request.endpoint)
+    if required is not None:
+        relative = 'secondsago' in request.args or False in [
+            argument in request.args for argument in required]
+        if relative is True:
+            result = '{}-{}'.format(result, general.normalized_timestamp())
+
+    # Return
+    return result
+
+
+def cache_key(path, server_port, generation, arguments):
+    """Create a cache key that is the same in every process.
+
+    The key ends with the generation, so stale_key() can find the previous
+    value cached for the same request.
+
+    Args:
+        path: Request URI
+        server_port: Port of the server. This helps to differentiate
+            between various instances of infoset each running on
+            different ports
+        generation: Generation counter of the data used by the request
+        arguments: Iterable of request argument (key, value) tuples
+
+    Returns:
+        result: Key to be used
+
+    """
+    # Create a canonical representation of the request
+    canonical = json.dumps([path, str(server_port), sorted(arguments)])
+
+    # Return
+    result = '{}_{}_{}'.format(
+        FLASK_PREFIX, general.hashstring(canonical), generation)
+    return result
+
 
-    # This helps to differentiate between various instances of infoset
-    # each running on different ports
-    server_port = request.environ['SERVER_PORT']
+def stale_key(key):
+    """Get the key of the previous value cached for a cache_key() key.
 
-    # Use a hash of the request arguments as part of the key
-    args = str(hash(frozenset(request.args.items())))
+    Args:
+        key: Key created by cache_key()
+
+    Returns:
+        result: Key of the previous value. None if key wasn't created
+            by cache_key()
+
+    """
+    # Initialize key variables
+    result = None
+    match = re.match(r'^({}_[0-9a-f]{{64}})_'.format(FLASK_PREFIX), key)
 
     # Return
-    result = (
-        'infoset_flask_{}_{}_{}'.format(
-            path, server_port, args)[:255].encode('utf-8'))
+    if bool(match) is True:
+        result = '{}_stale'.format(match.group(1))
+    return result
+
+
+def release_locks(exception=None):
+    """Release the recompute locks still held by the current request.
+
+    Used as a Flask teardown_request function. Locks are normally released
+    when the recomputed value is cached, but not if the view failed.
+
+    Args:
+        exception: Exception raised by the request, if any
+
+    Returns:
+        None
+
+    """
+    # Release locks
+    for (cache, key) in g.pop('infoset_cache_locks', []):
+        cache.release(key)
+
+
+def generation_key(table=None, idx=None):
+    """Create the key of a generation counter.
+
+    Args:
+        table: Table whose row the counter tracks. 'datapoint' or
+            'deviceagent'. The counter tracks all data if None.
+        idx: Index of the row in the table
+
+    Returns:
+        result: Key to be used
+
+    """
+    # Return
+    if table is None:
+        result = '{}_all'.format(GENERATION_PREFIX)
+    else:
+        result = '{}_{}_{}'.format(GENERATION_PREFIX, table, idx)
+    return result
+
+
+def _request_generation_key():
+    """Get the key of the generation counter for the current request.
+
+    Args:
+        None
+
+    Returns:
+        result: Key to be used
+
+    """
+    # Initialize key variables
+    result = generation_key()
+    view_args = request.view_args
+    if bool(view_args) is False:
+        return result
+
+    # Responses about a single datapoint or DeviceAgent only
+    # change when their own data changes
+    if request.blueprint == 'DATAPOINTS':
+        if 'value' in view_args:
+            result = generation_key('datapoint', view_args['value'])
+        elif 'idx_datapoint' in view_args:
+            result = generation_key(
+                'datapoint', view_args['idx_datapoint'])
+    elif request.endpoint == 'LASTCONTACTS.deviceagents':
+        result = generation_key('deviceagent', view_args['value'])
+
+    # Return
+    return result
+
+
+class TieredCache(MemcachedCache):
+    """Flask-Caching backend with a per-process LocalCache before memcached.
+
+    Values read from or written to memcached are also stored locally for up
+    to CACHE_LOCAL_TIMEOUT seconds. Cache keys include generation counters,
+    so values invalidated in memcached are never read from the local tier.
+
+    """
+
+    def __init__(self, servers=None, default_timeout=300, key_prefix=None,
+                 local_size=0, local_timeout=60):
+        """Method initializing the class.
+
+        Args:
+            servers: List of memcached servers
+            default_timeout: Default cache timeout
+            key_prefix: Prefix added to all keys
+            local_size: Size of the local tier in bytes. 0 disables it
+            local_timeout: Maximum seconds values are kept locally
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        MemcachedCache.__init__(
+            self, servers=servers, default_timeout=default_timeout,
+            key_prefix=key_prefix)
+        self.local = lru.LocalCache(size=local_size, timeout=local_timeout)
+        self.statistics = dict.fromkeys(STATISTICS, 0)
+        self._statistics_updated = time.time()
+        self._statistics_lock = threading.Lock()
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        """Create the cache from the Flask-Caching configuration.
+
+        Args:
+            app: Flask application
+            config: Flask-Caching configuration
+            args: Positional arguments for the class
+            kwargs: Keyword arguments for the class
+
+        Returns:
+            result: TieredCache object
+
+        """
+        # Initialize key variables
+        args.append(config['CACHE_MEMCACHED_SERVERS'])
+        kwargs.update(dict(
+            key_prefix=config['CACHE_KEY_PREFIX'],
+            local_size=config.get('CACHE_LOCAL_SIZE', 0),
+            local_timeout=config.get('CACHE_LOCAL_TIMEOUT', 60)))
+
+        # Return
+        result = cls(*args, **kwargs)
+        return result
+
+    def get(self, key):
+        """Get a value, reading memcached only if not found locally.
+
+        Args:
+            key: Key to retrieve
+
+        Returns:
+            result: Value or None if not found
+
+        """
+        # Initialize key variables
+        result = self.local.get(key)
+        counter = 'local_hits'
+
+        # Read from memcached
+        if result is None:
+            result = MemcachedCache.get(self, key)
+            if result is not None:
+                self.local.set(key, result)
+                counter = 'memcached_hits'
+            else:
+                (result, counter) = self._single_flight(key)
+
+        # Update statistics
+        self._count(counter)
+
+        # Return
+        return result
+
+    def _single_flight(self, key):
+        """Make sure only one process recomputes a missing value.
+
+        The first process to request the value gets a lock and recomputes
+        it. Others return the previous value for the request if there is
+        one, or wait briefly for the recomputed value.
+
+        Args:
+            key: Key that wasn't found
+
+        Returns:
+            (result, counter): Tuple of the value or None if it must be
+                recomputed, and the name of the statistics counter
+
+        """
+        # Initialize key variables
+        result = None
+        counter = 'misses'
+        previous = stale_key(key)
+
+        # Only applies to keys created by cache_key()
+        if previous is None:
+            return (result, counter)
+
+        # Get the lock to recompute the value
+        if self.acquire(key) is True:
+            return (result, counter)
+
+        # Return the previous value while another process recomputes it
+        result = MemcachedCache.get(self, previous)
+        if result is not None:
+            counter = 'stale_hits'
+            return (result, counter)
+
+        # Wait for the value
+        deadline = time.time() + LOCK_WAIT
+        while time.time() < deadline:
+            time.sleep(LOCK_POLL)
+            result = MemcachedCache.get(self, key)
+            if result is not None:
+                self.local.set(key, result)
+                counter = 'memcached_hits'
+                break
+
+        # Return
+        return (result, counter)
+
+    def acquire(self, key):
+        """Get the lock to recompute the value of a key.
+
+        Args:
+            key: Key
+
+        Returns:
+            result: True if the lock was acquired
+
+        """
+        # Initialize key variables
+        result = bool(MemcachedCache.add(
+            self, '{}_lock'.format(key), 1, timeout=LOCK_TIMEOUT))
+
+        # Make sure the lock is released when the request ends
+        if result is True and has_request_context() is True:
+            g.setdefault('infoset_cache_locks', []).append((self, key))
+
+        # Return
+        return result
+
+    def release(self, key):
+        """Release the lock to recompute the value of a key.
+
+        Args:
+            key: Key
+
+        Returns:
+            None
+
+        """
+        # Release
+        MemcachedCache.delete(self, '{}_lock'.format(key))
+
+    def _count(self, counter):
+        """Update a hit or miss counter.
+
+        Counts are periodically added to the counters in memcached that are
+        shared by all processes.
+
+        Args:
+            counter: Name of the counter
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        deltas = {}
+        now = time.time()
+
+        # Update the counter
+        with self._statistics_lock:
+            self.statistics[counter] += 1
+            if now - self._statistics_updated >= STATISTICS_INTERVAL:
+                deltas = self.statistics
+                self.statistics = dict.fromkeys(STATISTICS, 0)
+                self._statistics_updated = now
+
+        # Update memcached
+        for (name, delta) in deltas.items():
+            if bool(delta) is False:
+                continue
+            key = statistics_key(name)
+            if self._client.incr(key, delta) is None:
+                if self._client.add(key, delta) is False:
+                    self._client.incr(key, delta)
+
+    def get_many(self, *keys):
+        """Get many values.
+
+        Args:
+            keys: Keys to retrieve
+
+        Returns:
+            result: List of values
+
+        """
+        # Return
+        result = [self.get(key) for key in keys]
+        return result
+
+    def set(self, key, value, timeout=None):
+        """Set a value in both tiers.
+
+        Args:
+            key: Key to set
+            value: Value to set
+            timeout: Cache timeout
+
+        Returns:
+            result: Result of the set
+
+        """
+        # Initialize key variables
+        result = MemcachedCache.set(self, key, value, timeout=timeout)
+        self.local.set(key, value, timeout=timeout)
+
+        # Keep a copy to serve while the value is being recomputed
+        previous = stale_key(key)
+        if previous is not None:
+            MemcachedCache.set(self, previous, value, timeout=0)
+
+        # Release the lock if this request holds it. A request that gave
+        # up waiting for another process mustn't release its lock
+        if has_request_context() is True:
+            locks = g.get('infoset_cache_locks', [])
+            if (self, key) in locks:
+                locks.remove((self, key))
+                self.release(key)
+
+        # Return
+        return result
+
+    def add(self, key, value, timeout=None):
+        """Add a value to both tiers if it doesn't exist in memcached.
+
+        Args:
+            key: Key to add
+            value: Value to add
+            timeout: Cache timeout
+
+        Returns:
+            result: True if added
+
+        """
+        # Initialize key variables
+        result = MemcachedCache.add(self, key, value, timeout=timeout)
+        if bool(result) is True:
+            self.local.set(key, value, timeout=timeout)
+        return result
+
+    def delete(self, key):
+        """Delete a value from both tiers.
+
+        Args:
+            key: Key to delete
+
+        Returns:
+            result: Result of the delete
+
+        """
+        # Initialize key variables
+        self.local.delete(key)
+        result = MemcachedCache.delete(self, key)
+        return result
+
+    def delete_many(self, *keys):
+        """Delete many values from both tiers.
+
+        Args:
+            keys: Keys to delete
+
+        Returns:
+            result: Result of the delete
+
+        """
+        # Initialize key variables
+        for key in keys:
+            self.local.delete(key)
+        result = MemcachedCache.delete_many(self, *keys)
+        return result
+
+    def clear(self):
+        """Delete all values from both tiers.
+
+        Args:
+            None
+
+        Returns:
+            result: Result of the clear
+
+        """
+        # Initialize key variables
+        self.local.clear()
+        result = MemcachedCache.clear(self)
+        return result
+
+    def inc(self, key, delta=1):
+        """Increment a value in memcached.
+
+        Args:
+            key: Key to increment
+            delta: Amount to add
+
+        Returns:
+            result: New value
+
+        """
+        # Initialize key variables
+        self.local.delete(key)
+        result = MemcachedCache.inc(self, key, delta=delta)
+        return result
+
+    def dec(self, key, delta=1):
+        """Decrement a value in memcached.
+
+        Args:
+            key: Key to decrement
+            delta: Amount to subtract
+
+        Returns:
+            result: New value
+
+        """
+        # Initialize key variables
+        self.local.delete(key)
+        result = MemcachedCache.dec(self, key, delta=delta)
+        return result
+
+
+def statistics_key(name):
+    """Create the key of a cache hit or miss counter.
+
+    Args:
+        name: Name of the counter
+
+    Returns:
+        result: Key to be used
+
+    """
+    # Return
+    result = '{}_{}'.format(STATISTICS_PREFIX, name)
     return result
 
 
@@ -100,3 +684,110 @@ class Cache(object):
 
         # Return
         return result
+
+    def statistics(self):
+        """Get the API cache hit and miss counters of all processes.
+
+        Args:
+            None
+
+        Returns:
+            result: Dict of counters, including the hit rate
+
+        """
+        # Initialize key variables
+        result = dict.fromkeys(STATISTICS, 0)
+        keys = [statistics_key(name) for name in STATISTICS]
+        values = self.cache.get_multi(keys)
+
+        # Get the counter values
+        for name in STATISTICS:
+            value = values.get(statistics_key(name))
+            if value is not None:
+                result[name] = int(value)
+
+        # Calculate the hit rate
+        hits = (
+            result['local_hits'] + result['memcached_hits'] +
+            result['stale_hits'])
+        total = hits + result['misses']
+        if bool(total) is True:
+            result['hit_rate'] = round(hits / total, 4)
+        else:
+            result['hit_rate'] = 0
+
+        # Return
+        return result
+
+    def generation(self, key):
+        """Get the value of a generation counter, creating it if needed.
+
+        Args:
+            key: Key of the counter
+
+        Returns:
+            result: Value of the counter
+
+        """
+        # Initialize key variables
+        result = self.cache.get(key)
+        overall = generation_key()
+
+        # Create the counter if it doesn't exist. Counters other than the
+        # overall counter start at its value, as stamp() only gives them
+        # values the overall counter had later
+        if result is None:
+            if key == overall:
+                initial = _initial_generation()
+            else:
+                initial = self.generation(overall)
+            self.cache.add(key, initial)
+            result = self.cache.get(key)
+
+        # Return
+        return result
+
+    def stamp(self, keys):
+        """Give generation counters a new value with a single write.
+
+        The overall generation counter is incremented and its new value is
+        copied to the counters. Each value of the overall counter is only
+        used once, so the counters still change whenever they are stamped.
+
+        Args:
+            keys: List of counter keys
+
+        Returns:
+            None
+
+        """
+        # Increment the overall counter
+        overall = generation_key()
+        value = self.cache.incr(overall)
+        if value is None:
+            # The counter doesn't exist or was evicted
+            value = _initial_generation()
+            if bool(self.cache.add(overall, value)) is False:
+                value = self.cache.incr(overall)
+
+        # Copy its value to the counters
+        if value is not None and bool(keys) is True:
+            self.cache.set_multi(dict.fromkeys(keys, value))
+
+
+def _initial_generation():
+    """Get the starting value of a new generation counter.
+
+    A millisecond timestamp is used so that a counter evicted from memcached
+    doesn't restart at a value it has already had.
+
+    Args:
+        None
+
+    Returns:
+        result: Starting value
+
+    """
+    # Return
+    result = int(time.time() * 1000)
+    return result
@@ -0,0 +1,646 @@
+#!/usr/bin/env python3
+"""Prometheus metrics shared by the API and ingester processes.
+
+Each process counts its own API requests and database queries and
+regularly writes the counts to a file named after its PID, the same way
+infoset.db.pool_metrics does. collect() adds up the files of all
+processes. The counts of processes that have stopped are added to an
+archive file before their files are deleted, so that the totals never
+decrease when Gunicorn or the ingester replaces a process.
+
+"""
+
+# Standard libraries
+import os
+import json
+import time
+import fcntl
+import tempfile
+import threading
+from contextlib import contextmanager
+
+# PIP3 libraries
+from sqlalchemy import event
+
+# Infoset libraries
+from infoset.utils import log
+
+# Upper bounds in seconds of the buckets of the duration histograms. The
+# last bucket counts everything slower
+BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+
+# Minimum number of seconds between writes of a process' metrics file
+STATISTICS_INTERVAL = 10
+
+# Name of the file containing the counts of processes that have stopped
+ARCHIVE = 'archive.json'
+
+# Type and description of each metric
+METRICS = {
+    'infoset_api_request_duration_seconds': (
+        'histogram', 'Time taken to respond to API requests'),
+    'infoset_db_query_duration_seconds': (
+        'histogram', 'Time taken by database queries'),
+    'infoset_db_query_errors_total': (
+        'counter', 'Database queries that failed'),
+    'infoset_api_cache_requests_total': (
+        'counter', 'API cache lookups by result'),
+    'infoset_api_cache_hit_ratio': (
+        'gauge', 'Fraction of API cache lookups that were hits'),
+    'infoset_db_pool_connections': (
+        'gauge', 'Database connections of all processes by state'),
+    'infoset_db_pool_checkout_timeouts_total': (
+        'counter', 'Times no database connection became available'),
+    'infoset_spool_files': (
+        'gauge', 'Cache files waiting in the ingest cache directory'),
+    'infoset_spool_bytes': (
+        'gauge', 'Size of the cache files in the ingest cache directory'),
+    'infoset_ingest_lag_seconds': (
+        'gauge', 'Age of the oldest cache file waiting to be ingested'),
+    'infoset_ingest_cycles_total': (
+        'counter', 'Ingest cycles completed'),
+    'infoset_ingest_files_total': (
+        'counter', 'Cache files ingested'),
+    'infoset_ingest_datapoints_total': (
+        'counter', 'Datapoints ingested'),
+    'infoset_ingest_datapoints_per_second': (
+        'gauge', 'Datapoints ingested per second in the last ingest cycle'),
+    'infoset_ingest_stage_duration_seconds': (
+        'histogram', 'Time taken by each stage of the ingester')
+}
+
+# Per process state
+_LOCK = threading.Lock()
+_STATE = {
+    'pid': None,
+    'written': 0,
+    'directory': None,
+    'counters': None,
+    'histograms': None
+}
+
+
+def configure(directory):
+    """Set the directory in which this process writes its metrics file.
+
+    Args:
+        directory: Directory
+
+    Returns:
+        None
+
+    """
+    # Set
+    _STATE['directory'] = directory
+
+
+def increment(name, labels=None, value=1):
+    """Add a value to a counter of this process.
+
+    Args:
+        name: Name of the counter
+        labels: Dict of labels
+        value: Value to add
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    key = series(name, labels)
+
+    # Update
+    with _LOCK:
+        _reset_if_forked()
+        counters = _STATE['counters']
+        counters[key] = counters.get(key, 0) + value
+
+
+def observe(name, seconds, labels=None):
+    """Add a duration to a histogram of this process.
+
+    Args:
+        name: Name of the histogram
+        seconds: Duration
+        labels: Dict of labels
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    key = series(name, labels)
+
+    # Find the bucket
+    bucket = len(BUCKETS)
+    for (position, limit) in enumerate(BUCKETS):
+        if seconds <= limit:
+            bucket = position
+            break
+
+    # Update
+    with _LOCK:
+        _reset_if_forked()
+        histogram = _STATE['histograms'].setdefault(key, _histogram())
+        histogram['count'] += 1
+        histogram['sum'] += seconds
+        histogram['buckets'][bucket] += 1
+
+
+def write(force=False):
+    """Write the metrics file of this process.
+
+    Args:
+        force: Write even if the file was written less than
+            STATISTICS_INTERVAL seconds ago
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    now = time.time()
+    directory = _STATE['directory']
+    if directory is None:
+        return
+
+    # Get the data to write
+    with _LOCK:
+        _reset_if_forked()
+        if force is False and now - _STATE['written'] < STATISTICS_INTERVAL:
+            return
+        first = bool(_STATE['written']) is False
+        _STATE['written'] = now
+        data = {
+            'pid': _STATE['pid'],
+            'counters': dict(_STATE['counters']),
+            'histograms': json.loads(json.dumps(_STATE['histograms']))
+        }
+
+    # The file may have been left by a stopped process with the same PID
+    filepath = os.path.join(directory, '{}.json'.format(data['pid']))
+    if first is True and os.path.exists(filepath) is True:
+        with _archive_lock(directory):
+            _archive(directory, filepath)
+
+    # Write the file. Readers never see a partially written file
+    try:
+        (handle, temporary) = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(handle, 'w') as f_handle:
+            json.dump(data, f_handle)
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, filepath)
+    except OSError as exception:
+        log_message = (
+            'Unable to write metrics file {}: {}'
+            ''.format(filepath, exception))
+        log.log2debug(1169, log_message)
+
+
+def collect(directory):
+    """Get the counters and histograms of all processes.
+
+    The files of processes that no longer exist are added to the archive
+    file and deleted.
+
+    Args:
+        directory: Directory containing metrics files
+
+    Returns:
+        result: Dict with these keys:
+            counters: Dict of counter values keyed by series
+            histograms: Dict of histograms keyed by series
+
+    """
+    # Read the files
+    with _archive_lock(directory):
+        # Archive the files of stopped processes
+        filenames = [
+            filename for filename in sorted(os.listdir(directory))
+            if filename.endswith('.json') is True and filename != ARCHIVE]
+        for filename in filenames:
+            pid = int(filename.split('.')[0])
+            if _running(pid) is False:
+                _archive(directory, os.path.join(directory, filename))
+
+        # Add up the files
+        result = _read(os.path.join(directory, ARCHIVE))
+        for filename in sorted(os.listdir(directory)):
+            if filename.endswith('.json') is False or filename == ARCHIVE:
+                continue
+            _merge(result, _read(os.path.join(directory, filename)))
+
+    # Return
+    return result
+
+
+def render(counters, histograms, gauges=None):
+    """Create the Prometheus text format of metrics.
+
+    Args:
+        counters: Dict of counter values keyed by series
+        histograms: Dict of histograms keyed by series. Each histogram is
+            a dict with these keys:
+                count: Number of durations
+                sum: Total of the durations
+                buckets: Number of durations in each bucket. One count per
+                    item of BUCKETS, followed by the count of slower ones
+                limits: Upper bounds of the buckets. BUCKETS if missing
+        gauges: Dict of gauge values keyed by series
+
+    Returns:
+        result: Text
+
+    """
+    # Initialize key variables
+    lines = []
+    samples = {}
+
+    # Create the samples of each metric
+    for (key, value) in sorted(counters.items()):
+        samples.setdefault(_name(key), []).append(
+            '{} {}'.format(key, _number(value)))
+    for (key, value) in sorted((gauges or {}).items()):
+        samples.setdefault(_name(key), []).append(
+            '{} {}'.format(key, _number(value)))
+    for (key, histogram) in sorted(histograms.items()):
+        samples.setdefault(_name(key), []).extend(
+            _histogram_samples(key, histogram))
+
+    # Add the descriptions
+    for (name, items) in sorted(samples.items()):
+        (kind, description) = METRICS.get(name, ('untyped', name))
+        lines.append('# HELP {} {}'.format(name, description))
+        lines.append('# TYPE {} {}'.format(name, kind))
+        lines.extend(items)
+
+    # Return
+    result = '\n'.join(lines) + '\n'
+    return result
+
+
+def series(name, labels=None):
+    """Create the Prometheus name of a series.
+
+    Args:
+        name: Name of the metric
+        labels: Dict of labels
+
+    Returns:
+        result: Name and labels of the series
+
+    """
+    # Return
+    result = name
+    if bool(labels) is True:
+        result = '{}{{{}}}'.format(name, ','.join(
+            '{}="{}"'.format(label, _escape(value))
+            for (label, value) in sorted(labels.items())))
+    return result
+
+
+def add_engine_metrics(engine):
+    """Time the queries of an engine.
+
+    Args:
+        engine: SQLalchemy engine instance
+
+    Returns:
+        None
+
+    """
+    # Time each query
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+
+
+def _before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany):
+    """Note the time a query started.
+
+    Args:
+        conn: Connection object
+        cursor: DBAPI cursor object
+        statement: SQL statement
+        parameters: Parameters of the statement
+        context: Execution context
+        executemany: True if executing many sets of parameters
+
+    Returns:
+        None
+
+    """
+    # Note the time
+    conn.info.setdefault('infoset_query_start', []).append(time.time())
+
+
+def _after_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany):
+    """Add the duration of a query to the histogram of its statement type.
+
+    Args:
+        conn: Connection object
+        cursor: DBAPI cursor object
+        statement: SQL statement
+        parameters: Parameters of the statement
+        context: Execution context
+        executemany: True if executing many sets of parameters
+
+    Returns:
+        None
+
+    """
+    # Record the duration
+    start = conn.info['infoset_query_start'].pop()
+    observe(
+        'infoset_db_query_duration_seconds', time.time() - start,
+        labels={'statement': _statement(statement)})
+    write()
+
+
+def _handle_error(context):
+    """Count queries that failed.
+
+    Args:
+        context: Exception context
+
+    Returns:
+        None
+
+    """
+    # Discard the start time of the query
+    starts = context.connection.info.get('infoset_query_start')
+    if bool(starts) is True:
+        starts.pop()
+
+    # Count the error
+    increment(
+        'infoset_db_query_errors_total',
+        labels={'statement': _statement(context.statement)})
+
+
+def _statement(statement):
+    """Get the type of an SQL statement.
+
+    Args:
+        statement: SQL statement
+
+    Returns:
+        result: First keyword of the statement in upper case
+
+    """
+    # Return
+    words = (statement or '').split(None, 1)
+    if bool(words) is True:
+        result = words[0].upper()
+    else:
+        result = 'UNKNOWN'
+    return result
+
+
+def _histogram(limits=None):
+    """Create an empty histogram.
+
+    Args:
+        limits: Upper bounds of the buckets. BUCKETS if None
+
+    Returns:
+        result: Histogram
+
+    """
+    # Return
+    result = {
+        'count': 0, 'sum': 0,
+        'buckets': [0] * (len(limits or BUCKETS) + 1)}
+    return result
+
+
+def _histogram_samples(key, histogram):
+    """Create the Prometheus samples of a histogram.
+
+    Args:
+        key: Series of the histogram
+        histogram: Histogram
+
+    Returns:
+        result: List of samples
+
+    """
+    # Initialize key variables
+    result = []
+    (name, _, labels) = key.partition('{')
+    labels = labels.rstrip('}')
+    limits = [_number(limit) for limit in histogram.get('limits', BUCKETS)]
+    cumulative = 0
+
+    # Buckets count all durations up to their limit
+    for (limit, count) in zip(limits + ['+Inf'], histogram['buckets']):
+        cumulative += count
+        result.append('{}_bucket{{{}le="{}"}} {}'.format(
+            name, labels + ',' if bool(labels) is True else '', limit,
+            cumulative))
+
+    # Add the totals
+    suffix = '{{{}}}'.format(labels) if bool(labels) is True else ''
+    result.append('{}_sum{} {}'.format(
+        name, suffix, _number(histogram['sum'])))
+    result.append('{}_count{} {}'.format(name, suffix, histogram['count']))
+    return result
+
+
+def _merge(totals, data):
+    """Add the counters and histograms of a process to totals.
+
+    Args:
+        totals: Dict of counters and histograms to update
+        data: Dict of counters and histograms to add
+
+    Returns:
+        None
+
+    """
+    # Add the counters
+    counters = totals['counters']
+    for (key, value) in data['counters'].items():
+        counters[key] = counters.get(key, 0) + value
+
+    # Add the histograms
+    for (key, histogram) in data['histograms'].items():
+        total = totals['histograms'].setdefault(key, _histogram())
+        total['count'] += histogram['count']
+        total['sum'] += histogram['sum']
+        total['buckets'] = [
+            sum(counts) for counts in zip(
+                total['buckets'], histogram['buckets'])]
+
+
+def _read(filepath):
+    """Read a metrics file.
+
+    Args:
+        filepath: Filepath
+
+    Returns:
+        result: Dict of counters and histograms. Empty if the file can't
+            be read
+
+    """
+    # Read the file
+    result = {'counters': {}, 'histograms': {}}
+    try:
+        with open(filepath, 'r') as f_handle:
+            data = json.load(f_handle)
+        result['counters'] = data['counters']
+        result['histograms'] = data['histograms']
+    except (OSError, ValueError, KeyError):
+        pass
+    return result
+
+
+def _archive(directory, filepath):
+    """Add the metrics file of a stopped process to the archive file.
+
+    Must be called while holding the archive lock.
+
+    Args:
+        directory: Directory containing metrics files
+        filepath: Metrics file of the process
+
+    Returns:
+        None
+
+    """
+    # Add the file to the archive
+    archive = os.path.join(directory, ARCHIVE)
+    data = _read(archive)
+    _merge(data, _read(filepath))
+
+    # Replace the archive, then delete the file
+    try:
+        (handle, temporary) = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(handle, 'w') as f_handle:
+            json.dump(data, f_handle)
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, archive)
+        os.remove(filepath)
+    except OSError as exception:
+        log_message = (
+            'Unable to archive metrics file {}: {}'
+            ''.format(filepath, exception))
+        log.log2debug(1170, log_message)
+
+
+@contextmanager
+def _archive_lock(directory):
+    """Lock the archive file against changes by other processes.
+
+    Args:
+        directory: Directory containing metrics files
+
+    Returns:
+        None
+
+    """
+    # Lock
+    with open(os.path.join(directory, 'lock'), 'w') as f_handle:
+        fcntl.flock(f_handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f_handle, fcntl.LOCK_UN)
+
+
+def _reset_if_forked():
+    """Start new metrics in processes forked after they were created.
+
+    Must be called while holding _LOCK.
+
+    Args:
+        None
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    pid = os.getpid()
+
+    # Reset
+    if _STATE['pid'] != pid:
+        _STATE['pid'] = pid
+        _STATE['written'] = 0
+        _STATE['counters'] = {}
+        _STATE['histograms'] = {}
+
+
+def _running(pid):
+    """Determine whether a process is running.
+
+    Args:
+        pid: Process ID
+
+    Returns:
+        result: True if running
+
+    """
+    # Initialize key variables
+    result = True
+
+    # Signal 0 only checks whether the process exists
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        result = False
+    except PermissionError:
+        pass
+    return result
+
+
+def _name(key):
+    """Get the name of the metric of a series.
+
+    Args:
+        key: Series
+
+    Returns:
+        result: Name
+
+    """
+    # Return
+    result = key.partition('{')[0]
+    return result
+
+
+def _escape(value):
+    """Escape a label value.
+
+    Args:
+        value: Value
+
+    Returns:
+        result: Escaped value
+
+    """
+    # Return
+    result = str(value).replace('\\', '\\\\').replace(
+        '"', '\\"').replace('\n', '\\n')
+    return result
+
+
+def _number(value):
+    """Format a sample value.
+
+    Args:
+        value: Value
+
+    Returns:
+        result: Value as text
+
+    """
+    # Return
+    if isinstance(value, float) is True:
+        result = repr(round(value, 6))
+    else:
+        result = str(value)
+    return result
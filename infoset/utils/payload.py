@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""Encodings of the data posted by agents.
+
+Agents can post data as JSON or, when the optional msgpack or cbor2
+packages are installed, in the more compact MessagePack or CBOR binary
+formats. Any of them may be gzip compressed. The API saves binary posts in
+the ingest cache directory without converting them to JSON, and the
+ingester reads each cache file using the format given by its extension.
+
+"""
+
+# Standard libraries
+import os
+import re
+import json
+import zlib
+import importlib
+
+# Supported formats, their mimetypes and the optional module needed to use
+# them
+FORMATS = {
+    'json': {'mimetype': 'application/json', 'module': None},
+    'msgpack': {'mimetype': 'application/msgpack', 'module': 'msgpack'},
+    'cbor': {'mimetype': 'application/cbor', 'module': 'cbor2'}
+}
+
+# Other mimetypes commonly used for the formats
+ALIASES = {
+    'application/x-msgpack': 'msgpack',
+    'application/vnd.msgpack': 'msgpack'
+}
+
+# Maximum number of bytes in a decompressed post. Protects the API from
+# small requests that decompress to very large ones
+MAXIMUM_SIZE = 64 * 1024 * 1024
+
+# Names of cache files. They start with a numeric timestamp, followed by
+# the hex strings of the id_agent and device hash and the format
+CACHE_FILENAME = re.compile(
+    r'^\d+_[0-9a-f]+_[0-9a-f]+\.({})$'.format('|'.join(sorted(FORMATS))))
+
+
+def available(payload_format):
+    """Determine whether a format can be used.
+
+    Args:
+        payload_format: Format
+
+    Returns:
+        result: True if available. False for unknown formats
+
+    """
+    # Unknown formats can't be used
+    if payload_format not in FORMATS:
+        return False
+
+    # Return
+    result = _module(payload_format) is not None
+    return result
+
+
+def format_of_mimetype(mimetype):
+    """Get the format of a mimetype.
+
+    Args:
+        mimetype: Mimetype
+
+    Returns:
+        result: Format. None if the mimetype isn't supported
+
+    """
+    # Initialize key variables
+    result = ALIASES.get(mimetype)
+
+    # Search formats
+    for (payload_format, values) in FORMATS.items():
+        if values['mimetype'] == mimetype:
+            result = payload_format
+            break
+    return result
+
+
+def format_of_file(filepath):
+    """Get the format of a cache file.
+
+    Args:
+        filepath: Path of the cache file
+
+    Returns:
+        result: Format. 'json' if the extension isn't known
+
+    """
+    # Initialize key variables
+    result = os.path.splitext(filepath)[1].lstrip('.')
+
+    # Return
+    if result not in FORMATS:
+        result = 'json'
+    return result
+
+
+def dumps(data, payload_format='json'):
+    """Encode data.
+
+    Args:
+        data: Data to encode
+        payload_format: Format
+
+    Returns:
+        result: Encoded bytes
+
+    """
+    # Initialize key variables
+    module = _loaded(payload_format)
+
+    # Encode
+    if payload_format == 'json':
+        result = json.dumps(data).encode()
+    elif payload_format == 'msgpack':
+        result = module.packb(data, use_bin_type=True)
+    else:
+        result = module.dumps(data)
+    return result
+
+
+def loads(data, payload_format='json'):
+    """Decode data.
+
+    Args:
+        data: Bytes to decode
+        payload_format: Format
+
+    Returns:
+        result: Decoded data
+
+    """
+    # Initialize key variables
+    module = _loaded(payload_format)
+
+    # Decode
+    try:
+        if payload_format == 'json':
+            result = json.loads(data.decode())
+        elif payload_format == 'msgpack':
+            result = module.unpackb(data, raw=False)
+        else:
+            result = module.loads(data)
+    except Exception as exception:
+        raise ValueError(
+            'Invalid {} data: {}'.format(payload_format, exception))
+    return result
+
+
+def load(filepath):
+    """Read a cache file.
+
+    Args:
+        filepath: Path of the cache file
+
+    Returns:
+        result: Decoded data
+
+    """
+    # Read the file
+    with open(filepath, 'rb') as f_handle:
+        data = f_handle.read()
+
+    # Return
+    result = loads(data, format_of_file(filepath))
+    return result
+
+
+def compress(data):
+    """Gzip compress data.
+
+    Args:
+        data: Bytes
+
+    Returns:
+        result: Compressed bytes
+
+    """
+    # Return
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    result = compressor.compress(data) + compressor.flush()
+    return result
+
+
+def decompress(data, encoding):
+    """Decompress the body of a request.
+
+    Args:
+        data: Bytes
+        encoding: Value of the request's Content-Encoding header
+
+    Returns:
+        result: Decompressed bytes
+
+    """
+    # Initialize key variables
+    encoding = (encoding or 'identity').lower()
+
+    # Data that isn't compressed
+    if encoding == 'identity':
+        return data
+    if encoding not in ['gzip', 'x-gzip', 'deflate']:
+        raise ValueError('Unsupported content encoding {}'.format(encoding))
+
+    # Decompress, refusing data that is larger than the maximum
+    if encoding == 'deflate':
+        wbits = zlib.MAX_WBITS
+    else:
+        wbits = 16 + zlib.MAX_WBITS
+    decompressor = zlib.decompressobj(wbits)
+    try:
+        result = decompressor.decompress(data, MAXIMUM_SIZE)
+    except zlib.error as exception:
+        raise ValueError('Invalid {} data: {}'.format(encoding, exception))
+    if bool(decompressor.unconsumed_tail) is True:
+        raise ValueError(
+            'Decompressed data is larger than {} bytes'.format(MAXIMUM_SIZE))
+    return result
+
+
+def _module(payload_format):
+    """Import the module needed by a format.
+
+    Args:
+        payload_format: Format
+
+    Returns:
+        result: Module. None if it isn't installed. json if no module is
+            needed
+
+    """
+    # Initialize key variables
+    result = json
+    name = FORMATS[payload_format]['module']
+
+    # Import
+    if name is not None:
+        try:
+            result = importlib.import_module(name)
+        except ImportError:
+            result = None
+    return result
+
+
+def _loaded(payload_format):
+    """Import the module needed by a format, raising an error if missing.
+
+    Args:
+        payload_format: Format
+
+    Returns:
+        result: Module
+
+    """
+    # Initialize key variables
+    if payload_format not in FORMATS:
+        raise ValueError('Unsupported format {}'.format(payload_format))
+    result = _module(payload_format)
+
+    # Return
+    if result is None:
+        raise ValueError(
+            'The python {} package is needed to use the {} format'.format(
+                FORMATS[payload_format]['module'], payload_format))
+    return result
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Code that reduces the cost of sending API responses to clients.
+
+Responses are compressed when the client accepts gzip or deflate encoding.
+Responses also carry an ETag based on the ingester's generation counters,
+so clients polling for unchanged data receive an empty "304 Not Modified"
+response without the data being read again.
+
+"""
+
+# Standard libraries
+import gzip
+import zlib
+
+# PIP3 libraries
+from flask import request, g, Response
+
+# Infoset libraries
+from infoset.utils import memory
+
+# Blueprints whose responses only change when the ingester adds data
+ETAG_BLUEPRINTS = [
+    'AGENTS', 'DATAPOINTS', 'DEVICEAGENTS', 'DEVICES', 'LASTCONTACTS']
+
+# Supported content encodings, in order of preference, and the zlib
+# window bits used to create them
+ENCODINGS = {
+    'gzip': 16 + zlib.MAX_WBITS,
+    'deflate': zlib.MAX_WBITS
+}
+
+# Responses smaller than this number of bytes are not compressed
+MINIMUM_SIZE = 500
+
+# zlib compression level. Higher values use much more CPU for little gain
+COMPRESSION_LEVEL = 6
+
+
+def etag():
+    """Get the ETag of the response to the current request.
+
+    Args:
+        None
+
+    Returns:
+        result: ETag. None if the response doesn't have one
+
+    """
+    # Initialize key variables
+    result = None
+
+    # Only GET requests for data from the ingester have ETags
+    if request.method != 'GET' or request.blueprint not in ETAG_BLUEPRINTS:
+        return result
+
+    # Responses can't be tracked without a generation counter
+    version = memory.request_version()
+    if version is None:
+        return result
+
+    # Return
+    key = memory.cache_key(
+        request.path, request.environ['SERVER_PORT'], version,
+        request.args.items(multi=True))
+    result = key[len(memory.FLASK_PREFIX) + 1:]
+    return result
+
+
+def not_modified():
+    """Return "304 Not Modified" if the client already has the response.
+
+    Used as a Flask before_request function.
+
+    Args:
+        None
+
+    Returns:
+        result: Flask Response object. None if the request must be
+            processed
+
+    """
+    # Initialize key variables
+    result = None
+    g.infoset_etag = etag()
+
+    # Check the ETags sent by the client
+    if g.infoset_etag is not None:
+        if request.if_none_match.contains_weak(g.infoset_etag) is True:
+            result = Response(status=304)
+
+    # Return
+    return result
+
+
+def finalize(response):
+    """Add the ETag to a response and compress it.
+
+    Used as a Flask after_request function.
+
+    Args:
+        response: Flask Response object
+
+    Returns:
+        response: Flask Response object
+
+    """
+    # Add the ETag. It is weak as the compressed and uncompressed
+    # representations of the response are different
+    tag = g.get('infoset_etag')
+    if tag is not None and response.status_code in [200, 304]:
+        response.set_etag(tag, weak=True)
+
+    # Return
+    response = compress(response)
+    return response
+
+
+def compress(response):
+    """Compress a response using the best encoding accepted by the client.
+
+    Args:
+        response: Flask Response object
+
+    Returns:
+        response: Flask Response object
+
+    """
+    # Only compress complete JSON responses
+    if (response.status_code != 200 or
+            response.direct_passthrough is True or
+            'Content-Encoding' in response.headers or
+            response.mimetype not in ['application/json',
+                                      'application/x-ndjson']):
+        return response
+
+    # The response depends on the encodings accepted by the client
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(list(ENCODINGS.keys()))
+    if encoding is None:
+        return response
+
+    # Compress
+    if response.is_streamed is True:
+        response.response = _compress_stream(
+            response.iter_encoded(), encoding)
+    else:
+        data = response.get_data()
+        if len(data) < MINIMUM_SIZE:
+            return response
+        if encoding == 'gzip':
+            data = gzip.compress(data, compresslevel=COMPRESSION_LEVEL)
+        else:
+            data = zlib.compress(data, COMPRESSION_LEVEL)
+        response.set_data(data)
+
+    # Return
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def _compress_stream(iterable, encoding):
+    """Compress a streamed response.
+
+    Args:
+        iterable: Iterable of bytes
+        encoding: Content encoding
+
+    Returns:
+        None. Yields compressed bytes
+
+    """
+    # Initialize key variables
+    compressor = zlib.compressobj(
+        COMPRESSION_LEVEL, zlib.DEFLATED, ENCODINGS[encoding])
+
+    # Compress each chunk
+    try:
+        for chunk in iterable:
+            # Flush so that the client receives each chunk immediately
+            yield (
+                compressor.compress(chunk) +
+                compressor.flush(zlib.Z_SYNC_FLUSH))
+        yield compressor.flush()
+    finally:
+        if hasattr(iterable, 'close') is True:
+            iterable.close()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Code that streams large JSON responses to API clients.
+
+Responses are encoded incrementally from an iterable of dicts so that the
+memory used by the API worker stays bounded regardless of the number of
+rows being returned.
+
+"""
+
+# Standard libraries
+import json
+
+# PIP3 libraries
+from flask import Response, request, stream_with_context
+
+# Number of items JSON encoded into each chunk sent to the client
+CHUNK_SIZE = 500
+
+# Valid values of the 'stream' query string and their mimetypes
+MIMETYPES = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson'
+}
+
+
+def mode():
+    """Get the streaming mode requested by the client.
+
+    Args:
+        None
+
+    Returns:
+        result: 'json', 'ndjson' or None if streaming was not requested
+
+    """
+    # Initialize key variables
+    result = None
+    value = request.args.get('stream')
+
+    # Only accept known modes
+    if value in MIMETYPES:
+        result = value
+
+    # Return
+    return result
+
+
+def requested():
+    """Determine whether the client requested a streamed response.
+
+    Args:
+        None
+
+    Returns:
+        result: True if streaming was requested
+
+    """
+    # Return
+    result = mode() is not None
+    return result
+
+
+def response(iterable):
+    """Create a streamed Flask response.
+
+    Args:
+        iterable: Iterable of dicts to return to the client
+
+    Returns:
+        result: Flask Response object
+
+    """
+    # Initialize key variables
+    stream_mode = mode()
+    if stream_mode is None:
+        stream_mode = 'json'
+    ndjson = bool(stream_mode == 'ndjson')
+
+    # Return
+    generator = encode(iterable, ndjson=ndjson)
+    result = Response(
+        stream_with_context(generator), mimetype=MIMETYPES[stream_mode])
+    return result
+
+
+def encode(iterable, ndjson=False, chunk_size=CHUNK_SIZE):
+    """Incrementally encode an iterable of dicts as JSON.
+
+    Args:
+        iterable: Iterable of dicts to encode
+        ndjson: Encode as newline delimited JSON if True, else as a
+            JSON array
+        chunk_size: Number of items to encode in each chunk
+
+    Returns:
+        None. Yields strings of encoded data
+
+    """
+    # Initialize key variables
+    count = 0
+    chunk = []
+
+    # Start the JSON array
+    if ndjson is False:
+        yield '['
+
+    # Encode each item
+    for item in iterable:
+        encoded = json.dumps(item)
+        if ndjson is True:
+            chunk.append('{}\n'.format(encoded))
+        else:
+            if count > 0:
+                chunk.append(',')
+            chunk.append(encoded)
+        count += 1
+
+        # Send the chunk when it is full
+        if count % chunk_size == 0:
+            yield ''.join(chunk)
+            chunk = []
+
+    # Send the remainder
+    if bool(chunk) is True:
+        yield ''.join(chunk)
+
+    # Terminate the JSON array
+    if ndjson is False:
+        yield ']'
@@ -13,6 +13,7 @@ import os
 try:
     import yaml
     from sqlalchemy import create_engine
+    from sqlalchemy import inspect
     import pymysql
 except ImportError:
     import pip
@@ -53,6 +54,7 @@ from infoset.db import db_agentname
 from infoset.db import db_deviceagent
 from infoset.db import db_datapoint
 from infoset.db import db
+from infoset.db import data_storage
 from maintenance import shared
 
 
@@ -200,6 +202,56 @@ class _DatabaseSetup(object):
                 database = db.Database()
                 database.add(record, 1108)
 
+    def _create_indexes(self, engine):
+        """Add indexes missing from tables created by earlier versions.
+
+        create_all() does not alter tables that already exist.
+
+        Args:
+            engine: SQLAlchemy engine
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        inspector = inspect(engine)
+
+        # Create each index that isn't in the database
+        for table in BASE.metadata.sorted_tables:
+            existing = [
+                item['name'] for item in inspector.get_indexes(table.name)]
+            for index in table.indexes:
+                if index.name not in existing:
+                    shared.print_ok('Creating index {}.'.format(index.name))
+                    index.create(engine)
+
+    def _check_storage(self, engine):
+        """Report an iset_data table that doesn't have the configured layout.
+
+        create_all() does not alter tables that already exist.
+
+        Args:
+            engine: SQLAlchemy engine
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        configured = (self.config.db_storage(), self.config.db_compression())
+
+        # Compare the layouts
+        with engine.connect() as connection:
+            current = data_storage.layout(connection)
+        if current is not None and current != configured:
+            shared.print_ok(
+                'Table iset_data has the {} storage layout{}. Run '
+                'bin/tools/migrate_data_storage.py to convert it to the '
+                'configured layout.'.format(
+                    current[0],
+                    ' with compression' if current[1] is True else ''))
+
     def run(self):
         """Setup database.
 
@@ -244,6 +296,8 @@ class _DatabaseSetup(object):
             # Apply schemas
             shared.print_ok('Applying Schemas.')
             BASE.metadata.create_all(engine)
+            self._create_indexes(engine)
+            self._check_storage(engine)
 
             # Insert database entries
             self._insert_agent_device()